@@ -0,0 +1,222 @@
+"""Batch conversion with a pipelined extract → structurize scheduler."""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .cli import SUPPORTED_SUFFIXES, _reject_claude_share_link, extract_content, save_markdown
+from .incremental import record_conversion
+from .markdown_converter import convert_to_markdown
+from .structurizer import structurize_content
+
+
+def collect_inputs(inputs: List[str], list_file: Optional[str] = None) -> List[str]:
+    """
+    Expand batch inputs into an ordered list of URLs and file paths.
+
+    Args:
+        inputs: URLs, file paths, or directories from the command line
+        list_file: Optional file with one URL or path per line ('#' starts a comment)
+
+    Returns:
+        Deduplicated list of inputs, in order of first appearance
+
+    Raises:
+        FileNotFoundError: If list_file doesn't exist
+    """
+    candidates = list(inputs)
+
+    if list_file:
+        path = Path(list_file).expanduser()
+        if not path.exists():
+            raise FileNotFoundError(f"Input list not found: {list_file}")
+        for line in path.read_text(encoding='utf-8').splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                candidates.append(line)
+
+    collected = []
+    seen = set()
+    for item in candidates:
+        if item.startswith('http'):
+            expanded = [item]
+        else:
+            path = Path(item).expanduser()
+            if path.is_dir():
+                # Only pick up supported exports, never our own .md output
+                expanded = [
+                    str(child) for child in sorted(path.iterdir())
+                    if child.is_file() and child.suffix.lower() in SUPPORTED_SUFFIXES
+                ]
+            else:
+                expanded = [str(path)]
+
+        for entry in expanded:
+            if entry not in seen:
+                seen.add(entry)
+                collected.append(entry)
+
+    return collected
+
+
+def run_batch(
+    inputs: List[str],
+    config: Dict[str, Any],
+    extract_workers: int = 4,
+    structurize_workers: int = 2,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Convert many inputs with overlapping extraction and structurization.
+
+    Each stage has its own thread pool. As soon as an item is extracted it is
+    queued for structurization, so the extraction pool moves on to the next
+    item while earlier ones are still waiting on the API. With config['raw']
+    each item is converted locally in the extraction pool and there is no
+    structurize stage.
+
+    Args:
+        inputs: URLs or file paths (see collect_inputs)
+        config: Configuration dict with API credentials
+        extract_workers: Maximum concurrent extractions
+        structurize_workers: Maximum concurrent API calls
+        on_result: Optional callback invoked with each finished result
+
+    Returns:
+        One result dict per input, in input order, with keys: input, status
+        ('ok' or 'failed'), stage, output, error, chars, extract_seconds,
+        structurize_seconds
+    """
+    results = [
+        {
+            'input': item,
+            'status': 'pending',
+            'stage': 'extract',
+            'output': None,
+            'error': None,
+            'chars': 0,
+            'extract_seconds': 0.0,
+            'structurize_seconds': 0.0,
+        }
+        for item in inputs
+    ]
+
+    # Output paths are chosen by probing for conflicts, so writes must not interleave
+    save_lock = threading.Lock()
+    done_count = [0]
+    done_lock = threading.Lock()
+
+    def finish(result: Dict[str, Any]):
+        with done_lock:
+            done_count[0] += 1
+            position = done_count[0]
+        if result['status'] == 'ok':
+            print(f"✓ [{position}/{len(inputs)}] {result['input']} → {result['output']}")
+        else:
+            print(f"✗ [{position}/{len(inputs)}] {result['input']} ({result['stage']}): {result['error']}")
+        if on_result:
+            on_result(result)
+
+    def fail(result: Dict[str, Any], error: Exception):
+        result['status'] = 'failed'
+        result['error'] = str(error) or error.__class__.__name__
+        finish(result)
+
+    def structurize_stage(result: Dict[str, Any], raw_text: str, source: str):
+        result['stage'] = 'structurize'
+        start = time.time()
+        try:
+            markdown = structurize_content(raw_text, config, source)
+        except Exception as e:
+            result['structurize_seconds'] = round(time.time() - start, 2)
+            fail(result, e)
+            return
+        result['structurize_seconds'] = round(time.time() - start, 2)
+        save_stage(result, markdown, raw_text)
+
+    def save_stage(result: Dict[str, Any], markdown: str, raw_text: Optional[str] = None):
+        result['stage'] = 'save'
+        try:
+            with save_lock:
+                output_path = save_markdown(result['input'], markdown, config)
+        except Exception as e:
+            fail(result, e)
+            return
+        if raw_text is not None:
+            record_conversion(result['input'], raw_text, output_path, config)
+
+        result['status'] = 'ok'
+        result['output'] = str(output_path)
+        finish(result)
+
+    with ThreadPoolExecutor(max_workers=max(1, structurize_workers)) as structurize_pool:
+        structurize_futures = []
+        futures_lock = threading.Lock()
+
+        def extract_stage(result: Dict[str, Any]):
+            start = time.time()
+            if config.get('raw'):
+                try:
+                    _reject_claude_share_link(result['input'], quiet=True)
+                    markdown, _ = convert_to_markdown(result['input'], config)
+                except Exception as e:
+                    result['extract_seconds'] = round(time.time() - start, 2)
+                    fail(result, e)
+                    return
+                result['extract_seconds'] = round(time.time() - start, 2)
+                result['chars'] = len(markdown)
+                save_stage(result, markdown)
+                return
+
+            try:
+                raw_text, source = extract_content(result['input'], config, quiet=True)
+            except Exception as e:
+                result['extract_seconds'] = round(time.time() - start, 2)
+                fail(result, e)
+                return
+            result['extract_seconds'] = round(time.time() - start, 2)
+            result['chars'] = len(raw_text)
+
+            # Hand off and return immediately so this worker can start the next extraction
+            future = structurize_pool.submit(structurize_stage, result, raw_text, source)
+            with futures_lock:
+                structurize_futures.append(future)
+
+        with ThreadPoolExecutor(max_workers=max(1, extract_workers)) as extract_pool:
+            for result in results:
+                extract_pool.submit(extract_stage, result)
+
+        # Extraction pool has drained; every structurize job is now queued
+        for future in structurize_futures:
+            future.result()
+
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]]):
+    """Print a per-item status table followed by totals."""
+    ok = [r for r in results if r['status'] == 'ok']
+    failed = [r for r in results if r['status'] != 'ok']
+
+    print("\n" + "=" * 60)
+    print(f"Batch summary: {len(ok)} succeeded, {len(failed)} failed")
+    print("=" * 60)
+    for result in results:
+        timing = f"{result['extract_seconds']}s + {result['structurize_seconds']}s"
+        if result['status'] == 'ok':
+            print(f"  ✓ {result['input']} ({timing})")
+        else:
+            print(f"  ✗ {result['input']} [{result['stage']}] {result['error']}")
+
+
+def write_summary(results: List[Dict[str, Any]], path: str):
+    """Write batch results as JSON."""
+    summary_path = Path(path).expanduser()
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(
+        json.dumps(results, indent=2, ensure_ascii=False),
+        encoding='utf-8'
+    )
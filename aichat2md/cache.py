@@ -0,0 +1,282 @@
+"""On-disk caches for extracted conversation text and API responses."""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Default cache location (cross-platform)
+CACHE_DIR = Path.home() / ".cache" / "aichat2md"
+
+# Bump when extractor output changes so stale extractions are not reused
+EXTRACTION_CACHE_VERSION = 3
+
+# Puts between full directory scans, which pick up other processes' writes
+RESCAN_PUTS = 100
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'ref_src', 'si'}
+
+
+class DiskCache:
+    """
+    Size-bounded on-disk string cache with TTL and LRU eviction.
+
+    Each entry is one file named by the SHA-256 of its key. Reads refresh the
+    file's mtime, so eviction removes the least recently used entries first.
+    Writes go through a temp file and os.replace, so concurrent readers never
+    see partial entries. The total size is tracked as entries are written;
+    the directory is only scanned on the first write, when the tracked size
+    exceeds max_bytes, and every RESCAN_PUTS writes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 200 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        compress: bool = True
+    ):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Tracked total size of entries; None until the first scan
+        self._size: Optional[int] = None
+        self._puts_since_scan = 0
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached string, or None if missing, expired, or unreadable
+        """
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+            if raw[:2] == b'\x1f\x8b':
+                raw = gzip.decompress(raw)
+            entry = json.loads(raw.decode('utf-8'))
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        if entry.get('key') != key or (self.ttl is not None and time.time() - entry.get('created', 0) > self.ttl):
+            self._count(hit=False)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(hit=True)
+        return entry.get('value')
+
+    def put(self, key: str, value: str):
+        """
+        Store value and evict least recently used entries over the size limit.
+
+        Args:
+            key: Cache key
+            value: String to cache
+        """
+        path = self._path(key)
+        raw = json.dumps({'key': key, 'created': time.time(), 'value': value}, ensure_ascii=False).encode('utf-8')
+        if self.compress:
+            raw = gzip.compress(raw)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(raw)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._size is not None:
+                self._size += len(raw) - replaced
+            scan = (
+                self._size is None
+                or self._size > self.max_bytes
+                or self._puts_since_scan >= RESCAN_PUTS
+            )
+        if scan:
+            self.evict()
+
+    def evict(self):
+        """Scan the directory and remove least recently used entries until under max_bytes."""
+        entries = []
+        total = 0
+        for path in self.directory.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+        with self._lock:
+            self._size = total
+            self._puts_since_scan = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+_caches: Dict[Path, DiskCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(config: Dict[str, Any], namespace: str, ttl_key: str) -> Optional[DiskCache]:
+    """Get the shared DiskCache for a namespace, or None if caching is disabled."""
+    if not config.get('cache', True):
+        return None
+
+    directory = Path(config.get('cache_dir') or CACHE_DIR).expanduser() / namespace
+    ttl_days = config.get(ttl_key)
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = DiskCache(
+                directory,
+                max_bytes=int(config.get('cache_max_mb', 200) * 1024 * 1024),
+                ttl=ttl_days * 86400 if ttl_days else None,
+                compress=config.get('cache_compress', True)
+            )
+        return _caches[directory]
+
+
+def get_extraction_cache(config: Dict[str, Any]) -> Optional[DiskCache]:
+    """
+    Get the extraction cache configured by config.
+
+    Args:
+        config: Configuration dict (cache, cache_dir, cache_max_mb,
+            cache_compress, extraction_cache_ttl_days)
+
+    Returns:
+        DiskCache, or None if caching is disabled
+    """
+    return _get_cache(config, 'extraction', 'extraction_cache_ttl_days')
+
+
+def get_response_cache(config: Dict[str, Any]) -> Optional[DiskCache]:
+    """
+    Get the API response cache configured by config.
+
+    Args:
+        config: Configuration dict (cache, cache_dir, cache_max_mb,
+            cache_compress, response_cache_ttl_days)
+
+    Returns:
+        DiskCache, or None if caching is disabled
+    """
+    return _get_cache(config, 'responses', 'response_cache_ttl_days')
+
+
+def response_cache_key(api_url: str, payload: Dict[str, Any]) -> str:
+    """
+    Fingerprint an exact /chat/completions request.
+
+    The payload carries the model, sampling parameters, the full system
+    prompt and the raw text, so editing a prompt file (or anything else that
+    is sent) changes the key and old responses are never reused.
+
+    Args:
+        api_url: Completions endpoint URL
+        payload: JSON body sent to the endpoint
+
+    Returns:
+        Cache key string
+    """
+    body = json.dumps({'url': api_url, 'payload': payload}, sort_keys=True, ensure_ascii=False)
+    return f"response:{hashlib.sha256(body.encode('utf-8')).hexdigest()}"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a share URL so equivalent links share one cache entry.
+
+    Lowercases scheme and host, drops the fragment, trailing slash and
+    tracking parameters (utm_*, fbclid, ...), and sorts the query.
+    """
+    parts = urlsplit(url.strip())
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+
+def file_fingerprint(filepath: str) -> str:
+    """
+    Fingerprint a file by content hash, size and modification time.
+
+    Args:
+        filepath: Path to file
+
+    Returns:
+        "<sha256>:<size>:<mtime_ns>"
+    """
+    path = Path(filepath)
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return f"{digest.hexdigest()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def extraction_cache_key(input_path: str) -> str:
+    """
+    Build the extraction cache key for a URL or file.
+
+    Args:
+        input_path: URL or file path
+
+    Returns:
+        Cache key string
+    """
+    if input_path.startswith('http'):
+        return f"v{EXTRACTION_CACHE_VERSION}:url:{normalize_url(input_path)}"
+    return f"v{EXTRACTION_CACHE_VERSION}:file:{file_fingerprint(input_path)}"
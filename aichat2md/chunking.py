@@ -0,0 +1,210 @@
+"""Split long conversations into token-budgeted chunks and merge the results."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .tokens import count_tokens
+
+
+# Lines that start a new speaker turn in extracted text
+TURN_MARKER_RE = re.compile(
+    r'^(?:User|Assistant|You said|ChatGPT said|Gemini said|Claude said|'
+    r'You|ChatGPT|Gemini|Claude|用户|助手|豆包)\s*[:：]?\s*$',
+    re.IGNORECASE
+)
+
+# Section headings recognized when merging chunk outputs, per language
+SECTION_NAMES = {
+    'en': {'summary': 'Summary', 'topics': 'Key Topics', 'code': 'Code Examples', 'tags': 'tags'},
+    'zh': {'summary': '摘要', 'topics': '关键主题', 'code': '代码示例', 'tags': '技术标签'}
+}
+
+
+def split_turns(text: str) -> List[str]:
+    """
+    Split extracted text at speaker turn boundaries.
+
+    Falls back to blank-line separated paragraphs when no turn markers are
+    found.
+
+    Args:
+        text: Extracted conversation text
+
+    Returns:
+        List of turn (or paragraph) strings, in order
+    """
+    lines = text.split('\n')
+    starts = [i for i, line in enumerate(lines) if TURN_MARKER_RE.match(line.strip())]
+
+    if not starts:
+        return [part for part in re.split(r'\n\s*\n', text) if part.strip()]
+
+    if starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(lines))
+    turns = ['\n'.join(lines[start:end]) for start, end in zip(starts, starts[1:])]
+    return [turn for turn in turns if turn.strip()]
+
+
+def _split_oversized(text: str, max_tokens: int, model: Optional[str]) -> List[str]:
+    """Split a single turn that exceeds the budget at paragraph, line, then character boundaries."""
+    for separator in ('\n\n', '\n'):
+        pieces = text.split(separator)
+        if len(pieces) > 1:
+            return _pack(pieces, max_tokens, separator, model)
+
+    # No structure left: hard cut, sized for the worst case of one token per character
+    return [text[i:i + max_tokens] for i in range(0, len(text), max_tokens)]
+
+
+def _pack(pieces: List[str], max_tokens: int, separator: str, model: Optional[str]) -> List[str]:
+    """Greedily pack pieces into chunks of at most max_tokens."""
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for piece in pieces:
+        tokens = count_tokens(piece, model)
+        if tokens > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(piece, max_tokens, model))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens, breaking at turn boundaries.
+
+    Tokens are counted with tokens.count_tokens, the same counter that
+    decides whether a conversation is chunked at all.
+
+    Args:
+        text: Extracted conversation text
+        max_tokens: Token budget per chunk
+        model: Model name, used to pick the tokenizer
+
+    Returns:
+        List of chunk strings, in order
+    """
+    return _pack(split_turns(text), max_tokens, '\n\n', model)
+
+
+def _parse_front_matter(markdown: str) -> Tuple[Dict[str, str], str]:
+    """Split markdown into (front matter fields, body)."""
+    if not markdown.startswith('---'):
+        return {}, markdown
+    end = markdown.find('\n---', 3)
+    if end == -1:
+        return {}, markdown
+    fields = {}
+    for line in markdown[3:end].strip().split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            fields[key.strip()] = value.strip()
+    return fields, markdown[end + 4:].lstrip('\n')
+
+
+def _parse_tags(value: Optional[str]) -> List[str]:
+    """Parse a "[a, b, c]" front matter list."""
+    if not value:
+        return []
+    return [tag.strip().strip('"\'') for tag in value.strip('[]').split(',') if tag.strip()]
+
+
+def _split_sections(body: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split a markdown body into (H1 title, [(## heading, content), ...])."""
+    title = ''
+    sections: List[Tuple[str, str]] = []
+    current_heading = None
+    current_lines: List[str] = []
+    in_code = False
+
+    for line in body.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        if not in_code and line.startswith('# ') and not title and current_heading is None:
+            title = line[2:].strip()
+            continue
+        if not in_code and line.startswith('## '):
+            if current_heading is not None or current_lines:
+                sections.append((current_heading or '', '\n'.join(current_lines).strip()))
+            current_heading = line[3:].strip()
+            current_lines = []
+            continue
+        current_lines.append(line)
+
+    if current_heading is not None or any(line.strip() for line in current_lines):
+        sections.append((current_heading or '', '\n'.join(current_lines).strip()))
+    return title, sections
+
+
+def merge_chunk_markdown(parts: List[str], language: str, front_matter_builder) -> str:
+    """
+    Deterministically merge per-chunk markdown into one document.
+
+    Keeps the first chunk's title, concatenates summaries, unions key topics
+    and tags, keeps knowledge sections in order and gathers code examples
+    into a single trailing section. Only one front matter block is emitted.
+
+    Args:
+        parts: Markdown documents produced for each chunk, in order
+        language: Prompt language ('en' or 'zh')
+        front_matter_builder: Callable(tags) returning the front matter block
+
+    Returns:
+        Merged markdown
+    """
+    names = SECTION_NAMES.get(language, SECTION_NAMES['en'])
+    title = ''
+    tags: List[str] = []
+    summaries: List[str] = []
+    topics: List[str] = []
+    sections: List[Tuple[str, str]] = []
+    code: List[str] = []
+
+    for part in parts:
+        fields, body = _parse_front_matter(part.strip())
+        for tag in _parse_tags(fields.get(names['tags']) or fields.get('tags')):
+            if tag not in tags:
+                tags.append(tag)
+
+        part_title, part_sections = _split_sections(body)
+        title = title or part_title
+        for heading, content in part_sections:
+            if heading == names['summary']:
+                if content:
+                    summaries.append(content)
+            elif heading == names['topics']:
+                for line in content.split('\n'):
+                    if line.strip() and line.strip() not in topics:
+                        topics.append(line.strip())
+            elif heading == names['code']:
+                if content:
+                    code.append(content)
+            elif heading or content:
+                sections.append((heading, content))
+
+    lines = [front_matter_builder(tags).rstrip('\n'), '', f"# {title or 'Untitled'}", '']
+    if summaries:
+        lines += [f"## {names['summary']}", '\n\n'.join(summaries), '']
+    if topics:
+        lines += [f"## {names['topics']}", '\n'.join(topics), '']
+    for heading, content in sections:
+        if heading:
+            lines.append(f"## {heading}")
+        lines += [content, '']
+    if code:
+        lines += [f"## {names['code']}", '\n\n'.join(code), '']
+
+    return '\n'.join(lines).rstrip('\n') + '\n'
@@ -8,24 +8,37 @@ Usage:
     aichat2md <file.webarchive>          # Extract from webarchive
     aichat2md <url> --lang zh            # Override language
     aichat2md <url> -o output.md         # Custom output path
+    aichat2md <url1> <url2> <dir>        # Batch conversion
+    aichat2md --input-list links.txt     # Batch conversion from list file
+    aichat2md serve                      # Local daemon; later commands use it
+    aichat2md --watch ~/Downloads        # Convert new exports as they appear
+    aichat2md <file.html> --raw          # Local Markdown, no API call
+    aichat2md <url> --update             # Add only new turns to the earlier output
 """
 
 import argparse
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 import time
 
-from yaspin import yaspin
-
 from .config import setup_config, load_config
-from .extractors.playwright_extractor import extract_from_url
-from .extractors.webarchive_extractor import extract_from_webarchive
-from .extractors.html_extractor import extract_from_html
-from .structurizer import structurize_content
+from .cache import get_extraction_cache, get_response_cache, extraction_cache_key
+from .preprocess import preprocess_text
+from . import timings
+from .timings import span
 from . import __version__
 
+# Playwright, requests and yaspin are imported inside the functions that
+# use them: --help, --version, --setup and local-only conversions start
+# without paying for them (see benchmarks/startup.py)
+
+
+# Local file formats accepted by extract_content
+SUPPORTED_SUFFIXES = ['.webarchive', '.html', '.htm', '.mhtml', '.mht', '.xhtml']
+
 
 class TimedText:
     """Dynamic text with elapsed time in seconds."""
@@ -91,64 +104,176 @@ def generate_filename_from_markdown(markdown: str) -> str:
     return f"{today}-{title_clean}.md"
 
 
-def extract_content(input_path: str) -> Tuple[str, str]:
+def _extract_url(url: str, config: dict, stats: Optional[dict] = None) -> str:
+    """
+    Extract a share URL, preferring the browser-free fast path.
+
+    Args:
+        url: Share URL
+        config: Configuration dict
+        stats: Optional dict filled with request blocking statistics
+
+    Returns:
+        Extracted plain text content
+    """
+    if config.get('fast_path', True):
+        from .extractors.share_page_extractor import extract_from_share_page
+
+        text = extract_from_share_page(url)
+        if text is not None:
+            return text
+
+    # URLs share one warm Chromium; each gets its own context
+    from .extractors.playwright_extractor import extract_from_url, get_shared_pool
+
+    return extract_from_url(url, pool=get_shared_pool(config), stats=stats)
+
+
+def _preprocess(text: str, source: str, config: dict, quiet: bool) -> str:
+    """Strip UI boilerplate unless disabled, reporting the savings."""
+    if not config.get('preprocess', True):
+        return text
+    stats = {}
+    with span('preprocess', input_chars=len(text)) as info:
+        cleaned = preprocess_text(text, source, config, stats)
+        info['output_chars'] = len(cleaned)
+    if not quiet and stats['chars_before'] > stats['chars_after']:
+        print(
+            f"✓ Preprocessed: removed {stats['chars_before'] - stats['chars_after']} characters "
+            f"(~{stats['tokens_saved']} tokens)"
+        )
+    return cleaned
+
+
+def _reject_claude_share_link(input_path: str, quiet: bool):
+    """
+    Stop on Claude share links, which require manual export due to browser detection.
+
+    Raises:
+        ValueError: In quiet mode; otherwise export instructions are
+            printed and the process exits
+    """
+    if 'claude.ai/share' not in input_path.lower():
+        return
+    if quiet:
+        raise ValueError("Claude share links require manual export")
+    print("\n" + "="*60)
+    print("⚠️  Claude Share Links")
+    print("="*60)
+    print("\nClaude share links cannot be directly extracted due to:")
+    print("  • Cloudflare browser fingerprinting detection")
+    print("  • Cookie consent blocking automated access")
+    print("\n📌 Manual export required:")
+    print("  1. Open the link in your browser")
+    print("  2. Click the 'Export' button (top right)")
+    print("  3. Download as HTML file")
+    print("  4. Run: aichat2md <exported-file>")
+    print("="*60)
+    print("\n✅ Supported export formats:")
+    print("  • Safari: .webarchive (👑 Best - preserves content perfectly)")
+    print("  • Chrome/Edge: .mhtml or .html")
+    print("  • Firefox: .html")
+    print("  • Any browser: Save Page As → 'Web Page, Complete' (creates .html + folder)")
+    sys.exit(1)
+
+
+def extract_content(input_path: str, config: Optional[dict] = None, quiet: bool = False) -> Tuple[str, str]:
     """
     Extract content from URL, webarchive file, or HTML file.
 
+    Platform UI boilerplate is then stripped (see preprocess.preprocess_text)
+    unless config['preprocess'] is False. The extraction cache always holds
+    the unprocessed text.
+
     Args:
         input_path: URL or file path
+        config: Configuration dict (browser pool size, cache settings, etc.)
+        quiet: Suppress progress output (used by batch mode)
 
     Returns:
         Tuple of (extracted_text, source_identifier)
-    """
-    # Check for Claude share links - they require manual export due to browser detection
-    if 'claude.ai/share' in input_path.lower():
-        print("\n" + "="*60)
-        print("⚠️  Claude Share Links")
-        print("="*60)
-        print("\nClaude share links cannot be directly extracted due to:")
-        print("  • Cloudflare browser fingerprinting detection")
-        print("  • Cookie consent blocking automated access")
-        print("\n📌 Manual export required:")
-        print("  1. Open the link in your browser")
-        print("  2. Click the 'Export' button (top right)")
-        print("  3. Download as HTML file")
-        print("  4. Run: aichat2md <exported-file>")
-        print("="*60)
-        print("\n✅ Supported export formats:")
-        print("  • Safari: .webarchive (👑 Best - preserves content perfectly)")
-        print("  • Chrome/Edge: .mhtml or .html")
-        print("  • Firefox: .html")
-        print("  • Any browser: Save Page As → 'Web Page, Complete' (creates .html + folder)")
-        sys.exit(1)
 
-    if input_path.startswith('http'):
-        with yaspin(text=TimedText(f"Extracting from URL (up to 60s): {input_path}")) as sp:
-            text = extract_from_url(input_path)
-            sp.ok(f"✓ Extracted {len(text)} characters")
-        source = input_path
-    else:
-        # Determine file type
-        input_path_obj = Path(input_path)
-
-        # Check for webarchive files
-        if input_path_obj.suffix.lower() == '.webarchive':
-            # Webarchive extraction is fast, no spinner needed
-            print(f"📄 Extracting from webarchive: {input_path}")
-            text = extract_from_webarchive(input_path)
-            print(f"✓ Extracted {len(text)} characters")
-            source = input_path_obj.name
-        # Check for HTML files
-        elif input_path_obj.suffix.lower() in ['.html', '.htm', '.mhtml', '.xhtml']:
-            # HTML extraction is fast, no spinner needed
-            print(f"📄 Extracting from HTML file: {input_path}")
-            text = extract_from_html(input_path)
-            print(f"✓ Extracted {len(text)} characters")
-            source = input_path_obj.name
+    Raises:
+        ValueError: If the input format is unsupported, or a Claude share
+            link is given in quiet mode
+    """
+    _reject_claude_share_link(input_path, quiet)
+
+    config = config or {}
+    is_url = input_path.startswith('http')
+    source = input_path if is_url else Path(input_path).name
+
+    # Reuse a previous extraction of the same URL or unchanged file
+    cache = get_extraction_cache(config)
+    cache_key = None
+    if cache is not None and (is_url or Path(input_path).is_file()):
+        cache_key = extraction_cache_key(input_path)
+        if not config.get('cache_refresh'):
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if not quiet:
+                    print(f"✓ Loaded {len(cached)} characters from extraction cache")
+                return _preprocess(cached, source, config, quiet), source
+
+    with span('extract', source=source) as info:
+        if is_url:
+            if quiet:
+                text = _extract_url(input_path, config)
+            else:
+                from yaspin import yaspin
+
+                stats = {}
+                with yaspin(text=TimedText(f"Extracting from URL (up to 60s): {input_path}")) as sp:
+                    text = _extract_url(input_path, config, stats)
+                    blocked = ""
+                    if stats.get('blocked_requests'):
+                        blocked = f" (blocked {stats['blocked_requests']} requests, loaded {stats['loaded_bytes'] // 1024} KB)"
+                    sp.ok(f"✓ Extracted {len(text)} characters{blocked}")
         else:
-            raise ValueError(f"Unsupported file format: {input_path}. Use .webarchive, .html, or .mhtml")
-
-    return text, source
+            # Determine file type
+            input_path_obj = Path(input_path)
+
+            # Check for webarchive files
+            if input_path_obj.suffix.lower() == '.webarchive':
+                # Webarchive extraction is fast, no spinner needed
+                if not quiet:
+                    print(f"📄 Extracting from webarchive: {input_path}")
+                from .extractors.webarchive_extractor import extract_from_webarchive
+
+                text = extract_from_webarchive(input_path)
+                if not quiet:
+                    print(f"✓ Extracted {len(text)} characters")
+            # Check for MHTML archives
+            elif input_path_obj.suffix.lower() in ['.mhtml', '.mht']:
+                if not quiet:
+                    print(f"📄 Extracting from MHTML file: {input_path}")
+                from .extractors.mhtml_extractor import extract_from_mhtml
+
+                text = extract_from_mhtml(input_path)
+                if not quiet:
+                    print(f"✓ Extracted {len(text)} characters")
+            # Check for HTML files
+            elif input_path_obj.suffix.lower() in ['.html', '.htm', '.xhtml']:
+                # HTML extraction is fast, no spinner needed
+                if not quiet:
+                    print(f"📄 Extracting from HTML file: {input_path}")
+                from .extractors.html_extractor import extract_from_html
+
+                text = extract_from_html(input_path)
+                if not quiet:
+                    print(f"✓ Extracted {len(text)} characters")
+            else:
+                raise ValueError(f"Unsupported file format: {input_path}. Use .webarchive, .html, .mhtml, or .mht")
+        info['output_chars'] = len(text)
+
+    if cache_key is not None:
+        try:
+            cache.put(cache_key, text)
+        except OSError:
+            # A read-only or full cache directory must not fail the conversion
+            pass
+
+    return _preprocess(text, source, config, quiet), source
 
 
 def determine_output_path(input_path: str, markdown: str, config: dict, custom_output: str = None) -> Path:
@@ -194,8 +319,186 @@ def determine_output_path(input_path: str, markdown: str, config: dict, custom_o
     return output_path
 
 
+def save_markdown(input_path: str, markdown: str, config: dict, custom_output: str = None) -> Path:
+    """
+    Write markdown to its output path.
+
+    Args:
+        input_path: Original input (URL or file path)
+        markdown: Generated markdown
+        config: Configuration dict
+        custom_output: Custom output path from CLI argument
+
+    Returns:
+        Path the markdown was written to
+    """
+    output_path = determine_output_path(input_path, markdown, config, custom_output)
+
+    # Ensure parent directory exists
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    output_path.write_text(markdown, encoding='utf-8')
+
+    return output_path
+
+
+def structurize_streaming(
+    input_path: str,
+    raw_text: str,
+    source: str,
+    config: dict,
+    custom_output: str = None
+) -> Optional[Path]:
+    """
+    Structurize with a streaming API request, writing Markdown as it arrives.
+
+    File inputs and custom output paths are written in place. URL output
+    goes to a partial file in output_dir first and is renamed once the
+    title is known. Whatever arrived before an error is kept on disk.
+
+    Args:
+        input_path: Original input (URL or file path)
+        raw_text: Extracted text
+        source: Source identifier for front matter
+        config: Configuration dict
+        custom_output: Custom output path ('-' for stdout)
+
+    Returns:
+        Output file path, or None when writing to stdout
+    """
+    from .structurizer import stream_structurize
+
+    stats = {}
+
+    if custom_output == '-':
+        stream_structurize(raw_text, config, sys.stdout, source, stats)
+        print(
+            f"\n✓ Structurized (first token {stats.get('ttft')}s, {stats.get('tokens_per_second')} tokens/s)",
+            file=sys.stderr
+        )
+        return None
+
+    final = bool(custom_output) or not input_path.startswith('http')
+    if final:
+        output_path = determine_output_path(input_path, '', config, custom_output)
+    else:
+        # Title (and so the filename) is only known once the response is complete
+        output_dir = Path(config['output_dir']).expanduser()
+        output_path = output_dir / f"untitled-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.partial.md"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"⏳ Streaming to: {output_path}")
+    try:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            markdown = stream_structurize(raw_text, config, out, source, stats)
+    except BaseException:
+        if output_path.exists() and output_path.stat().st_size:
+            print(f"⚠️  Partial output kept at: {output_path}")
+        raise
+
+    if not final:
+        final_path = determine_output_path(input_path, markdown, config)
+        output_path.replace(final_path)
+        output_path = final_path
+
+    if stats.get('cache_hit'):
+        print("✓ Structurized (from response cache)")
+    else:
+        print(f"✓ Structurized (first token {stats.get('ttft')}s, {stats.get('tokens_per_second')} tokens/s)")
+    return output_path
+
+
+def convert_raw(input_path: str, config: dict, custom_output: Optional[str] = None) -> Optional[Path]:
+    """
+    Convert one input to Markdown locally (--raw) and save or print it.
+
+    Args:
+        input_path: URL or file path
+        config: Configuration dict
+        custom_output: Output path, or '-' for stdout
+
+    Returns:
+        Path of the saved file, or None when written to stdout
+    """
+    from .markdown_converter import convert_to_markdown
+
+    to_stdout = custom_output == '-'
+    _reject_claude_share_link(input_path, quiet=to_stdout)
+    markdown, _ = convert_to_markdown(input_path, config)
+    if to_stdout:
+        sys.stdout.write(markdown)
+        return None
+    output_path = save_markdown(input_path, markdown, config, custom_output)
+    print(f"✓ Converted locally ({len(markdown)} chars, no API call)")
+    print(f"✓ Saved to: {output_path}")
+    return output_path
+
+
+def _record_conversion(input_path: str, raw_text: str, output_path: Path, config: dict):
+    """Store the conversion record that a later --update extends."""
+    from .incremental import record_conversion
+
+    record_conversion(input_path, raw_text, output_path, config)
+
+
+def _config_overrides(args) -> dict:
+    """Config keys set by command line flags."""
+    overrides = {}
+    if args.lang:
+        overrides["language"] = args.lang
+    if args.model:
+        overrides["model"] = args.model
+    if args.no_cache:
+        overrides["cache"] = False
+    if args.refresh:
+        overrides["cache_refresh"] = True
+    if args.no_preprocess:
+        overrides["preprocess"] = False
+    if args.no_code_passthrough:
+        overrides["code_passthrough"] = False
+    if args.raw:
+        overrides["raw"] = True
+    return overrides
+
+
+def convert_with_daemon(daemon: dict, input_path: str, args) -> None:
+    """
+    Send one conversion to a running daemon (aichat2md serve) and save the result.
+
+    Structurized results are recorded like local conversions, so a later
+    --update can extend them.
+
+    Args:
+        daemon: Daemon state from server.find_daemon
+        input_path: URL or file path
+        args: Parsed command line arguments
+    """
+    from .server import convert_with_daemon as run_on_daemon
+
+    to_stdout = args.output == '-'
+    _reject_claude_share_link(input_path, quiet=to_stdout)
+    stats = {}
+    markdown, _ = run_on_daemon(daemon, input_path, _config_overrides(args), stats)
+    if to_stdout:
+        sys.stdout.write(markdown)
+        return
+    # Output paths are resolved here, so relative -o paths and output_dir work as usual
+    config = dict(load_config(require_api_key=False), **_config_overrides(args))
+    output_path = save_markdown(input_path, markdown, config, args.output)
+    if stats.get('text') is not None:
+        _record_conversion(input_path, stats['text'], output_path, config)
+    print(f"✓ Converted by daemon (pid {daemon.get('pid')})")
+    print(f"✓ Saved to: {output_path}")
+
+
 def main():
     """Main CLI entry point."""
+    if sys.argv[1:2] == ['serve']:
+        from .server import serve_main
+
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         prog="aichat2md",
         description='Convert AI chat conversations to structured Markdown',
@@ -208,13 +511,19 @@ Examples:
   aichat2md <url> --lang zh
   aichat2md <url> -o ~/Documents/output.md
   aichat2md <url> --model gpt-4o
+  aichat2md ~/Downloads/chat.html --raw
+  aichat2md <url> --update
+  aichat2md <url1> <url2> ~/Downloads/exports/
+  aichat2md --input-list links.txt --summary summary.json
+  aichat2md --watch ~/Downloads --raw
+  aichat2md serve    (keep a daemon running; other commands send jobs to it)
         """
     )
 
     parser.add_argument(
         'input',
-        nargs='?',
-        help='AI chat share URL or .webarchive file path'
+        nargs='*',
+        help='AI chat share URL(s), export file(s), or directories of exports'
     )
 
     parser.add_argument(
@@ -231,7 +540,13 @@ Examples:
 
     parser.add_argument(
         '--output', '-o',
-        help='Custom output file path'
+        help="Custom output file path ('-' for stdout)"
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream the AI response, writing Markdown as it arrives'
     )
 
     parser.add_argument(
@@ -239,6 +554,105 @@ Examples:
         help='Override AI model'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the extraction and response caches'
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Re-extract and re-structurize even if cached (caches are updated)'
+    )
+
+    parser.add_argument(
+        '--no-preprocess',
+        action='store_true',
+        help='Send extracted text as-is, without removing platform UI boilerplate'
+    )
+
+    parser.add_argument(
+        '--no-code-passthrough',
+        action='store_true',
+        help='Send long code blocks to the model instead of re-inserting them locally'
+    )
+
+    parser.add_argument(
+        '--raw', '--no-ai',
+        dest='raw',
+        action='store_true',
+        help='Convert to Markdown locally, without an API call (no API key needed)'
+    )
+
+    parser.add_argument(
+        '--update',
+        action='store_true',
+        help='Re-convert a conversation that continued: only new turns are sent and merged into its earlier Markdown'
+    )
+
+    parser.add_argument(
+        '--input-list',
+        metavar='FILE',
+        help='Batch mode: read inputs from a file (one URL or path per line)'
+    )
+
+    parser.add_argument(
+        '--extract-workers',
+        type=int,
+        default=4,
+        metavar='N',
+        help='Batch mode: concurrent extractions (default: 4)'
+    )
+
+    parser.add_argument(
+        '--structurize-workers',
+        type=int,
+        default=2,
+        metavar='N',
+        help='Batch mode: concurrent API calls (default: 2)'
+    )
+
+    parser.add_argument(
+        '--summary',
+        metavar='FILE',
+        help='Batch mode: write per-item results as JSON'
+    )
+
+    parser.add_argument(
+        '--watch',
+        nargs='?',
+        const='',
+        metavar='DIR',
+        help='Watch DIR (default: output_dir) and convert new or changed exports until Ctrl+C'
+    )
+
+    parser.add_argument(
+        '--watch-workers',
+        type=int,
+        default=2,
+        metavar='N',
+        help='Watch mode: concurrent conversions (default: 2)'
+    )
+
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Convert in this process even if an aichat2md serve daemon is running'
+    )
+
+    parser.add_argument(
+        '--timings',
+        action='store_true',
+        help='Print a per-stage timing table (durations, sizes, tokens, peak memory) to stderr'
+    )
+
+    parser.add_argument(
+        '--trace',
+        metavar='FILE',
+        help='Append per-stage timing spans to FILE as JSON lines'
+    )
+
     parser.add_argument(
         '--version',
         action='version',
@@ -253,39 +667,149 @@ Examples:
         return
 
     # Validate input
-    if not args.input:
+    watch_mode = args.watch is not None
+    if watch_mode and (args.input or args.input_list or args.output or args.stream or args.update):
+        print("✗ Error: --watch cannot be combined with inputs, --input-list, --output, --stream or --update")
+        sys.exit(1)
+
+    if not args.input and not args.input_list and not watch_mode:
         parser.print_help()
         print("\n✗ Error: Please provide a URL or file path")
         sys.exit(1)
 
+    batch_mode = (
+        len(args.input) > 1
+        or args.input_list is not None
+        or any(Path(item).expanduser().is_dir() for item in args.input)
+    )
+    if batch_mode and (args.output or args.stream or args.update):
+        print("✗ Error: --output, --stream and --update cannot be used with multiple inputs")
+        sys.exit(1)
+    if args.update and (args.raw or args.stream or args.output == '-'):
+        print("✗ Error: --update cannot be combined with --raw, --stream or --output -")
+        sys.exit(1)
+
+    if args.timings or args.trace:
+        timings.enable(args.trace)
+
+    # Single conversions go to a running daemon; streaming and timings need this process
+    daemon = None
+    if not (batch_mode or watch_mode or args.stream or args.update or args.no_daemon or timings.is_enabled()):
+        from .server import find_daemon
+
+        daemon = find_daemon()
+
     try:
+        if daemon is not None:
+            convert_with_daemon(daemon, args.input[0], args)
+            return
+
         # Load configuration
-        config = load_config()
+        config = load_config(require_api_key=not args.raw)
 
         # Override config with CLI arguments
-        if args.lang:
-            config["language"] = args.lang
-        if args.model:
-            config["model"] = args.model
+        config.update(_config_overrides(args))
+
+        if watch_mode:
+            from .watcher import watch_folder
+
+            counts = watch_folder(args.watch or config['output_dir'], config, workers=args.watch_workers)
+            if counts['failed']:
+                sys.exit(1)
+            return
+
+        if batch_mode:
+            from .batch import collect_inputs, run_batch, print_summary, write_summary
+            from .structurizer import get_client
+
+            inputs = collect_inputs(args.input, args.input_list)
+            if not inputs:
+                raise ValueError("No supported inputs found")
+
+            results = run_batch(
+                inputs,
+                config,
+                extract_workers=args.extract_workers,
+                structurize_workers=args.structurize_workers
+            )
+            print_summary(results)
+            response_cache = get_response_cache(config)
+            if response_cache is not None:
+                cache_stats = response_cache.stats()
+                print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+            retries = get_client(config).retries
+            if retries:
+                print(f"API retries: {retries} (rate limits or transient errors)")
+            if args.summary:
+                write_summary(results, args.summary)
+                print(f"✓ Summary saved to: {args.summary}")
+            if any(result['status'] != 'ok' for result in results):
+                sys.exit(1)
+            return
+
+        input_path = args.input[0]
+        # Markdown on stdout must not be mixed with progress output
+        to_stdout = args.output == '-'
+
+        if args.raw:
+            convert_raw(input_path, config, args.output)
+            return
+
+        if args.update:
+            from .incremental import FULL_REASONS, update_conversion
+
+            stats = {}
+            output_path, mode = update_conversion(input_path, config, args.output, stats=stats)
+            if mode == 'unchanged':
+                print(f"✓ No new turns; {output_path} is up to date")
+            elif mode == 'incremental':
+                print(
+                    f"✓ Added {stats['new_turns']} new turns "
+                    f"(sent {stats['sent_chars']} of {stats['total_chars']} chars, "
+                    f"plus {stats['context_chars']} chars of context)"
+                )
+                print(f"✓ Updated: {output_path}")
+            else:
+                print(f"✓ Structurized whole conversation ({FULL_REASONS[stats['reason']]})")
+                print(f"✓ Saved to: {output_path}")
+            return
 
         # Extract content
-        raw_text, source = extract_content(args.input)
+        raw_text, source = extract_content(input_path, config, quiet=to_stdout)
+
+        from .structurizer import structurize_content
+
+        if args.stream:
+            with span('structurize', input_chars=len(raw_text), stream=True):
+                output_path = structurize_streaming(input_path, raw_text, source, config, args.output)
+            if output_path is not None:
+                _record_conversion(input_path, raw_text, output_path, config)
+                print(f"✓ Saved to: {output_path}")
+            return
+
+        if to_stdout:
+            sys.stdout.write(structurize_content(raw_text, config, source))
+            return
 
         # Structurize with AI
+        from yaspin import yaspin
+        from .tokens import estimate_duration
+
         provider = config.get("api_base_url", "API")
-        estimated = min(60 + len(raw_text) // 100, 600)
+        estimated = estimate_duration(raw_text, config)
+        stats = {}
         with yaspin(text=TimedText(f"Structurizing {len(raw_text)} chars with {provider} (~{estimated}s)")) as sp:
-            markdown = structurize_content(raw_text, config, source)
-            sp.ok("✓ Structurized")
-
-        # Determine output path
-        output_path = determine_output_path(args.input, markdown, config, args.output)
-
-        # Ensure parent directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+            markdown = structurize_content(raw_text, config, source, stats)
+            detail = []
+            if stats.get('chunks'):
+                detail.append(f"{stats['chunks']} chunks")
+            if stats.get('cache_hit'):
+                detail.append("from response cache")
+            sp.ok(f"✓ Structurized ({', '.join(detail)})" if detail else "✓ Structurized")
 
         # Save to file
-        output_path.write_text(markdown, encoding='utf-8')
+        output_path = save_markdown(input_path, markdown, config, args.output)
+        _record_conversion(input_path, raw_text, output_path, config)
 
         print(f"✓ Saved to: {output_path}")
 
@@ -303,6 +827,12 @@ Examples:
         traceback.print_exc()
         sys.exit(1)
 
+    finally:
+        spans = timings.disable()
+        if args.timings and spans:
+            # stderr, so Markdown on stdout (-o -) stays clean
+            print("\n" + timings.format_table(spans, aggregate=batch_mode or watch_mode), file=sys.stderr)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,212 @@
+"""Keep long code blocks out of API requests and restore them in the output."""
+
+import re
+from typing import List, Tuple
+
+from .chunking import SECTION_NAMES
+
+
+PLACEHOLDER = '[CODE_BLOCK_{}]'
+PLACEHOLDER_RE = re.compile(r'`?\[CODE_BLOCK_(\d+)\]`?')
+# A placeholder inside a line, with the spaces around it
+INLINE_PLACEHOLDER_RE = re.compile(r'[ \t]*`?\[CODE_BLOCK_(\d+)\]`?[ \t]*')
+FENCE_RE = re.compile(r'^[ \t]*(`{3,}|~{3,})')
+
+# Appended to the system prompt when the input contains placeholders
+PLACEHOLDER_INSTRUCTIONS = {
+    'en': "\n\nLong code blocks in the input were replaced by placeholders such as "
+          "[CODE_BLOCK_1]. Do not write that code out. Put each placeholder on its own line, "
+          "exactly as written, where the code belongs (for example under Code Examples); "
+          "it will be replaced with the original code.",
+    'zh': "\n\n输入中较长的代码块已被替换为 [CODE_BLOCK_1] 这样的占位符。不要写出这些代码。"
+          "请把每个占位符原样单独放在一行，放在代码应在的位置（例如代码示例部分），"
+          "之后会被替换回原始代码。"
+}
+
+
+def protect_code_blocks(text: str, min_chars: int = 200) -> Tuple[str, List[str]]:
+    """
+    Replace fenced code blocks of at least min_chars with placeholders.
+
+    Args:
+        text: Extracted conversation text with ``` (or ~~~) fenced code
+        min_chars: Shorter blocks are left in place for the model to see
+
+    Returns:
+        (text with placeholder lines, original blocks; block N is at index N-1)
+    """
+    lines = text.split('\n')
+    output: List[str] = []
+    blocks: List[str] = []
+    i = 0
+
+    while i < len(lines):
+        match = FENCE_RE.match(lines[i])
+        if not match:
+            output.append(lines[i])
+            i += 1
+            continue
+
+        fence = match.group(1)
+        end = i + 1
+        while end < len(lines):
+            closing = FENCE_RE.match(lines[end])
+            if closing and closing.group(1)[0] == fence[0] and len(closing.group(1)) >= len(fence) \
+                    and not lines[end].strip()[len(closing.group(1)):].strip():
+                break
+            end += 1
+
+        if end >= len(lines):
+            # Unclosed fence: leave the rest untouched
+            output.extend(lines[i:])
+            break
+
+        block = '\n'.join(lines[i:end + 1])
+        if len(block) >= min_chars:
+            blocks.append(block)
+            output.append(PLACEHOLDER.format(len(blocks)))
+        else:
+            output.extend(lines[i:end + 1])
+        i = end + 1
+
+    return '\n'.join(output), blocks
+
+
+def has_placeholders(text: str) -> bool:
+    """Check whether text contains code block placeholders."""
+    return PLACEHOLDER_RE.search(text) is not None
+
+
+class CodeBlockRestorer:
+    """
+    Streaming placeholder replacement.
+
+    Text is processed a line at a time, so feed() can be given arbitrary
+    stream deltas. A placeholder the model wrapped in its own ``` fence is
+    replaced together with that fence. Blocks the model never referenced
+    are appended under the code examples heading by close().
+    """
+
+    def __init__(self, blocks: List[str], language: str = 'en'):
+        self.blocks = blocks
+        self.heading = SECTION_NAMES.get(language, SECTION_NAMES['en'])['code']
+        self.used = set()
+        self._partial = ''
+        self._held: List[str] = []
+        self._in_fence = False
+        self._ends_with_newline = True
+
+    def _block(self, number: int) -> str:
+        self.used.add(number)
+        return self.blocks[number - 1]
+
+    def _placeholder_number(self, line: str):
+        match = PLACEHOLDER_RE.fullmatch(line.strip())
+        if match and 1 <= int(match.group(1)) <= len(self.blocks):
+            return int(match.group(1))
+        return None
+
+    def _replace_inline(self, line: str) -> str:
+        def substitute(match):
+            number = int(match.group(1))
+            if not 1 <= number <= len(self.blocks):
+                return match.group(0)
+            before = line[:match.start()]
+            after = line[match.end():]
+            prefix = '' if not before.strip() else '\n'
+            suffix = '' if not after.strip() else '\n'
+            return prefix + self._block(number) + suffix
+
+        stripped = line.rstrip('\n')
+        if stripped.strip() and PLACEHOLDER_RE.fullmatch(stripped.strip()):
+            number = self._placeholder_number(stripped)
+            if number is not None:
+                return self._block(number) + line[len(stripped):]
+        return INLINE_PLACEHOLDER_RE.sub(substitute, line)
+
+    def _flush_held(self) -> str:
+        held, self._held = self._held, []
+        if len(held) == 2:
+            # Fence opener and placeholder without a closing fence: keep the code, drop the stray fence
+            return self._block(self._placeholder_number(held[1])) + '\n'
+        return ''.join(held)
+
+    def _line(self, line: str) -> str:
+        stripped = line.strip()
+
+        if self._in_fence:
+            if FENCE_RE.match(line) and not stripped.lstrip('`~'):
+                self._in_fence = False
+            return line
+
+        if len(self._held) == 1:
+            if self._placeholder_number(line) is not None:
+                self._held.append(line)
+                return ''
+            # The model's own code block: pass it through untouched
+            opener = self._flush_held()
+            self._in_fence = True
+            return opener + self._line(line)
+
+        if len(self._held) == 2:
+            if FENCE_RE.match(line) and not stripped.lstrip('`~'):
+                number = self._placeholder_number(self._held[1])
+                self._held = []
+                return self._block(number) + ('\n' if line.endswith('\n') else '')
+            return self._flush_held() + self._line(line)
+
+        if FENCE_RE.match(line):
+            self._held = [line]
+            return ''
+        return self._replace_inline(line)
+
+    def feed(self, text: str) -> str:
+        """Process a piece of model output; returns the text ready to write."""
+        if not self.blocks:
+            return text
+        self._partial += text
+        output = []
+        while '\n' in self._partial:
+            line, self._partial = self._partial.split('\n', 1)
+            output.append(self._line(line + '\n'))
+        return self._track(''.join(output))
+
+    def close(self, append_missing: bool = True) -> str:
+        """Flush buffered text and append code blocks the model left out."""
+        if not self.blocks:
+            return ''
+        output = []
+        if self._partial:
+            output.append(self._line(self._partial))
+            self._partial = ''
+        output.append(self._flush_held())
+
+        missing = [block for number, block in enumerate(self.blocks, 1) if number not in self.used]
+        if append_missing and missing:
+            self._track(''.join(output))
+            separator = '\n' if self._ends_with_newline else '\n\n'
+            output.append(f"{separator}## {self.heading}\n\n" + '\n\n'.join(missing) + '\n')
+        return ''.join(output)
+
+    def _track(self, text: str) -> str:
+        if text:
+            self._ends_with_newline = text.endswith('\n')
+        return text
+
+
+def restore_code_blocks(markdown: str, blocks: List[str], language: str = 'en') -> str:
+    """
+    Put the original code back in place of placeholders.
+
+    Args:
+        markdown: Model output containing [CODE_BLOCK_N] placeholders
+        blocks: Blocks returned by protect_code_blocks
+        language: Output language, for the heading of unreferenced blocks
+
+    Returns:
+        Markdown with every block re-inserted byte-for-byte
+    """
+    if not blocks:
+        return markdown
+    restorer = CodeBlockRestorer(blocks, language)
+    return restorer.feed(markdown) + restorer.close()
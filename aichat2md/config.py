@@ -16,26 +16,60 @@ DEFAULT_CONFIG = {
     "language": "en",
     "output_dir": str(Path.home() / "Downloads"),
     "model": "deepseek-chat",
-    "max_tokens": 4000,
-    "temperature": 0.7
+    "max_tokens": "auto",
+    "temperature": 0.7,
+    "api_max_retries": 5,
+    "api_retry_max_seconds": 120,
+    "browser_max_pages": 4,
+    "block_resources": True,
+    "fast_path": True,
+    "preprocess": True,
+    "cache": True,
+    "cache_max_mb": 200,
+    "extraction_cache_ttl_days": 30,
+    "chunk_threshold_tokens": 12000,
+    "chunk_max_tokens": 6000,
+    "chunk_concurrency": 4,
+    "code_passthrough": True,
+    "code_passthrough_min_chars": 200,
+    "watch_debounce_seconds": 2,
+    "watch_poll_seconds": 1
 }
 
+# Fixed max_tokens that --setup wrote before "auto" became the default
+LEGACY_MAX_TOKENS = 4000
+
 # API preset configurations
 API_PRESETS = {
     "deepseek": {
         "api_base_url": "https://api.deepseek.com",
         "model": "deepseek-chat",
-        "description": "DeepSeek (cost-effective, Chinese service)"
+        "description": "DeepSeek (cost-effective, Chinese service)",
+        # DeepSeek does not publish fixed limits; it slows responses under load
+        "rpm": None,
+        "tpm": None,
+        "max_output_tokens": 8192,
+        "tokens_per_second": 20
     },
     "openai": {
         "api_base_url": "https://api.openai.com/v1",
         "model": "gpt-4o-mini",
-        "description": "OpenAI (GPT-4o-mini)"
+        "description": "OpenAI (GPT-4o-mini)",
+        # Usage tier 1 limits for gpt-4o-mini
+        "rpm": 500,
+        "tpm": 200000,
+        "max_output_tokens": 16384,
+        "tokens_per_second": 50
     },
     "groq": {
         "api_base_url": "https://api.groq.com/openai/v1",
         "model": "llama-3.3-70b-versatile",
-        "description": "Groq (fast inference)"
+        "description": "Groq (fast inference)",
+        # Free tier limits for llama-3.3-70b-versatile
+        "rpm": 30,
+        "tpm": 12000,
+        "max_output_tokens": 8192,
+        "tokens_per_second": 200
     },
     "custom": {
         "api_base_url": "",
@@ -114,9 +148,17 @@ def setup_config():
     print(f"\n✓ Configuration saved to {CONFIG_FILE}")
 
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from file."""
+def load_config(require_api_key: bool = True) -> Dict[str, Any]:
+    """
+    Load configuration from file.
+
+    Args:
+        require_api_key: If False (offline --raw conversion), a missing
+            config file or API key is fine and defaults are used
+    """
     if not CONFIG_FILE.exists():
+        if not require_api_key:
+            return dict(DEFAULT_CONFIG, output_dir=get_default_output_dir())
         raise FileNotFoundError(
             f"Configuration file not found. Please run: aichat2md --setup"
         )
@@ -126,13 +168,17 @@ def load_config() -> Dict[str, Any]:
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in config file: {e}")
 
-    if not config.get("api_key"):
+    if require_api_key and not config.get("api_key"):
         raise ValueError("API key not configured. Please run: aichat2md --setup")
 
     # Merge with defaults for backward compatibility
     full_config = DEFAULT_CONFIG.copy()
     full_config.update(config)
 
+    # Configs from older --setup runs pinned the old default; size it automatically
+    if full_config.get("max_tokens") == LEGACY_MAX_TOKENS:
+        full_config["max_tokens"] = "auto"
+
     return full_config
 
 
@@ -1,6 +1,37 @@
-"""Content extractors for different sources."""
+"""Content extractors for different sources.
 
-from .playwright_extractor import extract_from_url
-from .webarchive_extractor import extract_from_webarchive
+Extractors are imported on first use, so importing one (e.g. the HTML
+extractor) doesn't pull in Playwright or requests.
+"""
 
-__all__ = ['extract_from_url', 'extract_from_webarchive']
+import importlib
+
+_EXPORTS = {
+    'extract_from_url': 'playwright_extractor',
+    'extract_turns_from_url': 'playwright_extractor',
+    'extract_html_from_url': 'playwright_extractor',
+    'BrowserPool': 'playwright_extractor',
+    'get_shared_pool': 'playwright_extractor',
+    'extract_from_webarchive': 'webarchive_extractor',
+    'extract_turns_from_webarchive': 'webarchive_extractor',
+    'extract_from_html': 'html_extractor',
+    'extract_turns_from_html': 'html_extractor',
+    'extract_from_mhtml': 'mhtml_extractor',
+    'extract_turns_from_mhtml': 'mhtml_extractor',
+    'extract_from_share_page': 'share_page_extractor',
+    'extract_turns_from_share_page': 'share_page_extractor',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
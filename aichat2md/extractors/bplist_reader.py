@@ -0,0 +1,124 @@
+"""Lazy reader for binary property lists (bplist00)."""
+
+import struct
+from typing import List, Optional
+
+
+BPLIST_MAGIC = b'bplist00'
+TRAILER_SIZE = 32
+
+# Object type markers (high nibble of the first byte)
+MARKER_INT = 0x1
+MARKER_DATA = 0x4
+MARKER_ASCII = 0x5
+MARKER_UTF16 = 0x6
+MARKER_ARRAY = 0xA
+MARKER_DICT = 0xD
+
+
+class BinaryPlist:
+    """
+    Random-access view of a binary plist.
+
+    Objects are addressed by their reference number and decoded only when
+    asked for, so walking a path through a large plist (e.g. a memory-mapped
+    webarchive) never touches the objects beside it. Data objects are
+    returned as memoryviews into the underlying buffer, without copying.
+    """
+
+    def __init__(self, buffer):
+        """
+        Args:
+            buffer: bytes, mmap or other buffer holding the whole plist
+
+        Raises:
+            ValueError: If the buffer isn't a well-formed binary plist
+        """
+        self.buffer = memoryview(buffer)
+        try:
+            if len(self.buffer) < len(BPLIST_MAGIC) + TRAILER_SIZE or self.buffer[:8] != BPLIST_MAGIC:
+                raise ValueError("Not a binary plist")
+
+            (self._offset_size, self._ref_size, self._num_objects,
+             self.top, self._offset_table) = struct.unpack('>6xBBQQQ', self.buffer[-TRAILER_SIZE:])
+            if self._offset_table + self._num_objects * self._offset_size > len(self.buffer) - TRAILER_SIZE:
+                raise ValueError("Invalid binary plist: offset table out of range")
+        except ValueError:
+            # Nobody else can release the view, and a live view keeps an mmap from closing
+            self.buffer.release()
+            raise
+
+    def _uint(self, start: int, size: int) -> int:
+        return int.from_bytes(self.buffer[start:start + size], 'big')
+
+    def _offset(self, ref: int) -> int:
+        if ref >= self._num_objects:
+            raise ValueError(f"Invalid binary plist: object {ref} out of range")
+        return self._uint(self._offset_table + ref * self._offset_size, self._offset_size)
+
+    def _header(self, ref: int):
+        """Return (type marker, length, offset of the payload) for an object."""
+        offset = self._offset(ref)
+        marker = self.buffer[offset]
+        kind, length = marker >> 4, marker & 0x0F
+        start = offset + 1
+        if kind in (MARKER_DATA, MARKER_ASCII, MARKER_UTF16, MARKER_ARRAY, MARKER_DICT) and length == 0x0F:
+            # Long lengths follow as an int object
+            int_marker = self.buffer[start]
+            if int_marker >> 4 != MARKER_INT:
+                raise ValueError("Invalid binary plist: bad length marker")
+            size = 1 << (int_marker & 0x0F)
+            length = self._uint(start + 1, size)
+            start += 1 + size
+        return kind, length, start
+
+    def _refs(self, start: int, count: int) -> List[int]:
+        size = self._ref_size
+        return [self._uint(start + i * size, size) for i in range(count)]
+
+    def string(self, ref: int) -> Optional[str]:
+        """Decode a string object, or None if ref is not a string."""
+        kind, length, start = self._header(ref)
+        if kind == MARKER_ASCII:
+            return bytes(self.buffer[start:start + length]).decode('ascii', errors='replace')
+        if kind == MARKER_UTF16:
+            return bytes(self.buffer[start:start + 2 * length]).decode('utf-16-be', errors='replace')
+        return None
+
+    def data(self, ref: int) -> Optional[memoryview]:
+        """View of a data object's bytes, or None if ref is not data."""
+        kind, length, start = self._header(ref)
+        if kind != MARKER_DATA:
+            return None
+        return self.buffer[start:start + length]
+
+    def array(self, ref: int) -> List[int]:
+        """Element references of an array object (empty if ref is not an array)."""
+        kind, length, start = self._header(ref)
+        if kind != MARKER_ARRAY:
+            return []
+        return self._refs(start, length)
+
+    def lookup(self, ref: int, key: str) -> Optional[int]:
+        """
+        Find a value in a dict object, decoding only its keys.
+
+        Args:
+            ref: Reference of a dict object
+            key: Key to look for
+
+        Returns:
+            Reference of the value, or None if missing or ref is not a dict
+        """
+        kind, length, start = self._header(ref)
+        if kind != MARKER_DICT:
+            return None
+        key_refs = self._refs(start, length)
+        for index, key_ref in enumerate(key_refs):
+            if self.string(key_ref) == key:
+                return self._uint(start + (length + index) * self._ref_size, self._ref_size)
+        return None
+
+    def release(self):
+        """Release the view so the underlying mmap can be closed."""
+        self.buffer.release()
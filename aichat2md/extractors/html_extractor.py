@@ -1,53 +1,162 @@
 """Extract content from HTML files (.html, .mhtml, etc.)."""
 
+import codecs
+import os
+import re
 from pathlib import Path
-from html.parser import HTMLParser
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ..timings import span
+from ..turns import split_text_turns, turns_from_marks
+from .html_markdown import MarkdownCollector, join_blocks
+from .text_engine import create_parser
 
-class CleanHTMLParser(HTMLParser):
-    """HTML parser that extracts clean text, skipping scripts and styles."""
 
-    def __init__(self):
-        super().__init__()
-        self.text_chunks: List[str] = []
-        self.skip_tags = {'script', 'style', 'noscript'}
-        self.current_tag = None
+# Bytes read per feed; also the prefix used to detect the encoding
+READ_CHUNK_SIZE = 64 * 1024
 
-    def handle_starttag(self, tag, attrs):
-        if tag in self.skip_tags:
-            self.current_tag = tag
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
 
-    def handle_endtag(self, tag):
-        if tag == self.current_tag:
-            self.current_tag = None
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9._:-]+)', re.IGNORECASE)
 
-    def handle_data(self, data):
-        if self.current_tag is None:
-            # Clean whitespace but preserve structure
-            cleaned = data.strip()
-            if cleaned:
-                self.text_chunks.append(cleaned)
 
-    def get_text(self) -> str:
-        """Get extracted text with normalized spacing."""
-        return '\n'.join(self.text_chunks)
+def detect_encoding(prefix: bytes) -> str:
+    """
+    Detect the encoding of an HTML document from its first bytes.
+
+    Checks for a byte order mark, then a <meta charset> declaration, then
+    whether the prefix decodes as UTF-8. Falls back to latin-1.
 
+    Args:
+        prefix: First bytes of the file
 
-def extract_from_html(filepath: str) -> str:
+    Returns:
+        Python codec name
     """
-    Extract text content from HTML file.
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    match = META_CHARSET_RE.search(prefix)
+    if match:
+        try:
+            encoding = codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            encoding = None
+        # A UTF-16 declaration in an ASCII-readable document is wrong by definition
+        if encoding:
+            return 'utf-8' if encoding.startswith('utf-16') else encoding
+
+    try:
+        # final=False tolerates a multi-byte character cut off at the end of the prefix
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def iter_html_blocks(
+    blocks: Iterable[bytes],
+    encoding: Optional[str] = None,
+    backend: Optional[str] = None,
+    marks: Optional[List[Tuple[int, int, str]]] = None,
+    markdown: bool = False,
+    size_hint: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Stream text chunks out of HTML arriving as byte blocks.
+
+    Bytes that don't decode are replaced rather than triggering a second
+    pass.
 
     Args:
-        filepath: Path to HTML file (.html, .mhtml, etc.)
+        blocks: Raw HTML bytes, in order
+        encoding: Codec to use; detected from the first block if omitted
+        backend: Parser backend (see text_engine.create_parser)
+        marks: Optional list extended with the document's turn marks
+            (see text_engine.TextCollector) once all chunks are yielded
+        markdown: Yield Markdown blocks (see html_markdown) instead of text
+        size_hint: Total size in bytes, if known (see text_engine.choose_backend)
+
+    Yields:
+        Text chunks in document order
+    """
+    parser = create_parser(backend, MarkdownCollector if markdown else None, size_hint)
+    decoder = None
+    for block in blocks:
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(encoding or detect_encoding(bytes(block)))(errors='replace')
+        parser.feed(decoder.decode(block))
+        yield from parser.pop_chunks()
+
+    if decoder is not None:
+        parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    yield from parser.pop_chunks()
+    if marks is not None:
+        marks.extend(parser.turn_marks)
+
+
+def iter_html_text(
+    filepath: str,
+    encoding: Optional[str] = None,
+    backend: Optional[str] = None,
+    marks: Optional[List[Tuple[int, int, str]]] = None,
+    markdown: bool = False
+) -> Iterator[str]:
+    """
+    Stream text chunks out of an HTML file.
 
-    Returns:
-        Extracted plain text content
+    The file is read in fixed-size blocks and fed to the text engine, so
+    memory stays bounded regardless of file size (except with the
+    selectolax backend, which parses the whole document at once and is
+    only chosen automatically for small files).
 
-    Raises:
-        FileNotFoundError: If file doesn't exist
-        ValueError: If file is not a valid HTML file
+    Args:
+        filepath: Path to HTML file
+        encoding: Codec to use; detected from the first block if omitted
+        backend: Parser backend (see text_engine.create_parser)
+        marks: Optional list extended with the document's turn marks
+        markdown: Yield Markdown blocks instead of text
+
+    Yields:
+        Text chunks in document order
+    """
+    with open(filepath, 'rb') as f:
+        blocks = iter(lambda: f.read(READ_CHUNK_SIZE), b'')
+        yield from iter_html_blocks(blocks, encoding, backend, marks, markdown, os.fstat(f.fileno()).st_size)
+
+
+def build_turns(chunks: List[str], marks: List[Tuple[int, int, str]], markdown: bool = False) -> List[Dict[str, Any]]:
+    """Turns from turn marks, or from speaker labels when the DOM had no hints."""
+    join = join_blocks if markdown else '\n'.join
+    return turns_from_marks(chunks, marks, join) or split_text_turns(join(chunks))
+
+
+def html_to_turns(html: str, backend: Optional[str] = None, markdown: bool = False) -> List[Dict[str, Any]]:
+    """
+    Split an HTML string (e.g. a rendered page) into turns.
+
+    Args:
+        html: HTML document
+        backend: Parser backend (see text_engine.create_parser)
+        markdown: Turn text as Markdown instead of plain text
+
+    Returns:
+        List of turns in order
     """
+    marks: List[Tuple[int, int, str]] = []
+    data = html.encode('utf-8')
+    chunks = list(iter_html_blocks([data], 'utf-8', backend, marks, markdown, len(data)))
+    return build_turns(chunks, marks, markdown)
+
+
+def _check_html_file(filepath: str):
+    """Raise if filepath is missing or not an HTML file."""
     path = Path(filepath)
 
     if not path.exists():
@@ -58,26 +167,61 @@ def extract_from_html(filepath: str) -> str:
     if suffix not in ['.html', '.htm', '.mhtml', '.xhtml']:
         raise ValueError(f"Not a supported HTML file: {filepath}")
 
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            html = f.read()
 
-        # Parse and clean HTML
-        parser = CleanHTMLParser()
-        parser.feed(html)
+def extract_from_html(filepath: str, backend: Optional[str] = None) -> str:
+    """
+    Extract text content from HTML file.
 
-        return parser.get_text()
+    Args:
+        filepath: Path to HTML file (.html, .mhtml, etc.)
+        backend: Parser backend; the fastest installed one if omitted
 
-    except UnicodeDecodeError:
-        # Try different encoding
-        try:
-            with open(filepath, 'r', encoding='latin-1') as f:
-                html = f.read()
-            parser = CleanHTMLParser()
-            parser.feed(html)
-            return parser.get_text()
-        except Exception as e:
-            raise ValueError(f"Could not decode HTML file: {e}") from e
+    Returns:
+        Extracted plain text content
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file is not a valid HTML file
+    """
+    _check_html_file(filepath)
+    with span('parse.html', input_bytes=Path(filepath).stat().st_size) as info:
+        text = '\n'.join(iter_html_text(filepath, backend=backend))
+        info['output_chars'] = len(text)
+    return text
+
+
+def extract_turns_from_html(
+    filepath: str,
+    backend: Optional[str] = None,
+    markdown: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Extract the conversation in an HTML file as turns.
+
+    Turns come from platform DOM hints (e.g. ChatGPT's
+    data-message-author-role) when present, else from speaker labels in
+    the text (see turns.py).
+
+    Args:
+        filepath: Path to HTML file
+        backend: Parser backend; the fastest installed one if omitted
+        markdown: Turn text as Markdown (headings, lists, tables, links)
+            instead of plain text
+
+    Returns:
+        List of turns in order
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file is not a valid HTML file
+    """
+    _check_html_file(filepath)
+    with span('parse.html', input_bytes=Path(filepath).stat().st_size, markdown=markdown) as info:
+        marks: List[Tuple[int, int, str]] = []
+        chunks = list(iter_html_text(filepath, backend=backend, marks=marks, markdown=markdown))
+        turns = build_turns(chunks, marks, markdown)
+        info['turns'] = len(turns)
+    return turns
 
 
 if __name__ == "__main__":
@@ -0,0 +1,246 @@
+"""Text engine collector that renders HTML as Markdown instead of plain text."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .text_engine import SKIP_TAGS, TextCollector
+
+
+# Interactive and decorative elements carry no conversation text
+MARKDOWN_SKIP_TAGS = SKIP_TAGS | {'button', 'svg', 'template', 'select'}
+
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'footer', 'aside', 'nav',
+    'figure', 'figcaption', 'details', 'summary', 'dl', 'dt', 'dd', 'form',
+    'fieldset', 'address', 'center', 'body', 'html',
+}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+INLINE_MARKERS = {'strong': '**', 'b': '**', 'em': '*', 'i': '*', 'code': '`', 'del': '~~', 's': '~~', 'a': ''}
+LIST_INDENT = {'ul': 2, 'ol': 3}
+
+WHITESPACE_RE = re.compile(r'\s+')
+# Line starts that Markdown would read as structure
+BLOCK_START_RE = re.compile(r'^(#{1,6}\s|>|[-+*]\s|\d+[.)]\s)')
+LIST_ITEM_RE = re.compile(r'^((?:> )*\s*)(?:([-*+])|\d+\.) ')
+
+
+class MarkdownCollector(TextCollector):
+    """
+    Turns parser events into Markdown blocks.
+
+    Headings, paragraphs, nested lists, block quotes, tables, links,
+    emphasis and inline code are kept; <pre> becomes fenced code as in
+    TextCollector, and turn marks are recorded the same way. Each block is
+    one chunk; join_blocks() puts them together. The document <title> is
+    kept in title rather than the text. Elements with a whitespace-pre*
+    class (e.g. ChatGPT's user messages) keep their line breaks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.skip_tags = MARKDOWN_SKIP_TAGS
+        self.title = ''
+        self._in_title = False
+        self._heading = 0
+        self._lists: List[List] = []  # [tag, next number]
+        self._item_marker: Optional[str] = None
+        self._quote_depth = 0
+        self._inline: List[Tuple[str, int, Optional[str]]] = []
+        self._preserve: Optional[str] = None
+        self._preserve_depth = 0
+        self._table: Optional[Dict] = None
+        self._table_depth = 0
+
+    def flush(self):
+        text = ''.join(self._pending)
+        self._pending = []
+        self._inline = []
+        lines = [' '.join(line.split()) for line in text.split('\n')]
+        text = '\n'.join(line for line in lines if line)
+        if not text:
+            return
+
+        if self._table is not None:
+            if self._table['cell'] is not None:
+                self._table['cell'].append(text)
+            return
+
+        if self._heading:
+            text = '#' * self._heading + ' ' + ' '.join(text.split('\n'))
+        else:
+            text = '\n'.join('\\' + line if BLOCK_START_RE.match(line) else line for line in text.split('\n'))
+        self._add_chunk(text)
+
+    def _add_chunk(self, chunk: str):
+        # List item markers and indentation, then block quote markers
+        if self._lists:
+            outer = ' ' * sum(LIST_INDENT[tag] for tag, _ in self._lists[:-1])
+            inner = outer + ' ' * LIST_INDENT[self._lists[-1][0]]
+            first = outer + self._item_marker if self._item_marker else inner
+            self._item_marker = None
+            lines = chunk.split('\n')
+            chunk = '\n'.join([first + lines[0]] + [inner + line if line else line for line in lines[1:]])
+        if self._quote_depth:
+            quote = '> ' * self._quote_depth
+            chunk = '\n'.join(quote + line for line in chunk.split('\n'))
+        super()._add_chunk(chunk)
+
+    def start(self, tag: str, attrs: Optional[Dict[str, Optional[str]]] = None):
+        if self._pre_depth or tag == 'pre' or tag in self.skip_tags or self.skip_depth:
+            super().start(tag, attrs)
+            return
+        self._track_turn_start(tag, attrs)
+        self._track_preserve_start(tag, attrs)
+
+        if tag == 'title':
+            self._in_title = True
+        elif tag in INLINE_MARKERS:
+            self._inline.append((tag, len(self._pending), (attrs or {}).get('href')))
+        elif tag == 'br':
+            self._pending.append('\n')
+        elif tag == 'hr':
+            self.flush()
+            self._add_chunk('---')
+        elif tag in HEADING_TAGS:
+            self.flush()
+            self._heading = HEADING_TAGS[tag]
+        elif tag in ('ul', 'ol'):
+            self.flush()
+            self._lists.append([tag, 1])
+        elif tag == 'li':
+            self.flush()
+            if self._lists:
+                kind = self._lists[-1]
+                self._item_marker = '- ' if kind[0] == 'ul' else f'{kind[1]}. '
+                kind[1] += 1
+        elif tag == 'blockquote':
+            self.flush()
+            self._quote_depth += 1
+        elif tag == 'table':
+            self.flush()
+            if self._table is None:
+                self._table = {'rows': [], 'row': None, 'cell': None}
+            else:
+                self._table_depth += 1
+        elif self._table is not None and not self._table_depth and tag == 'tr':
+            self._table['row'] = []
+        elif self._table is not None and not self._table_depth and tag in ('td', 'th'):
+            self.flush()
+            self._table['cell'] = []
+        elif tag in BLOCK_TAGS:
+            self.flush()
+
+    def end(self, tag: str):
+        if self._pre_depth or tag == 'pre' or tag in self.skip_tags:
+            super().end(tag)
+            return
+
+        if tag == 'title':
+            self._in_title = False
+        elif tag in INLINE_MARKERS:
+            self._close_inline(tag)
+        elif tag in HEADING_TAGS:
+            self.flush()
+            self._heading = 0
+        elif tag in ('ul', 'ol'):
+            self.flush()
+            if self._lists:
+                self._lists.pop()
+        elif tag == 'li':
+            self.flush()
+        elif tag == 'blockquote':
+            self.flush()
+            self._quote_depth = max(0, self._quote_depth - 1)
+        elif tag == 'table':
+            if self._table_depth:
+                self._table_depth -= 1
+            else:
+                self._end_table()
+        elif self._table is not None and not self._table_depth and tag in ('td', 'th'):
+            self.flush()
+            if self._table['row'] is not None and self._table['cell'] is not None:
+                self._table['row'].append(' '.join(self._table['cell']).replace('|', '\\|'))
+            self._table['cell'] = None
+        elif self._table is not None and not self._table_depth and tag == 'tr':
+            if self._table['row']:
+                self._table['rows'].append(self._table['row'])
+            self._table['row'] = None
+        elif tag in BLOCK_TAGS:
+            self.flush()
+
+        self._track_preserve_end(tag)
+        self._track_turn_end(tag)
+
+    def data(self, data: str):
+        if self._in_title and not self.skip_depth:
+            self.title = ' '.join((self.title + ' ' + data).split())
+            return
+        if self._pre_depth or self.skip_depth:
+            super().data(data)
+            return
+        self._pending.append(data if self._preserve else WHITESPACE_RE.sub(' ', data))
+
+    def _close_inline(self, tag: str):
+        for index in range(len(self._inline) - 1, -1, -1):
+            if self._inline[index][0] == tag:
+                break
+        else:
+            return
+        _, start, href = self._inline[index]
+        del self._inline[index:]
+        segment = ''.join(self._pending[start:])
+        core = segment.strip()
+        if not core:
+            return
+        if tag == 'a':
+            wrapped = f'[{core}]({href})' if href and not href.startswith(('#', 'javascript:')) else core
+        else:
+            wrapped = INLINE_MARKERS[tag] + core + INLINE_MARKERS[tag]
+        lead = segment[:len(segment) - len(segment.lstrip())]
+        trail = segment[len(segment.rstrip()):]
+        self._pending[start:] = [lead + wrapped + trail]
+
+    def _end_table(self):
+        table, self._table = self._table, None
+        rows = table['rows']
+        if not rows:
+            return
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+        lines = ['| ' + ' | '.join(rows[0]) + ' |', '|' + ' --- |' * width]
+        lines += ['| ' + ' | '.join(row) + ' |' for row in rows[1:]]
+        self._add_chunk('\n'.join(lines))
+
+    def _track_preserve_start(self, tag: str, attrs):
+        if self._preserve is not None:
+            if tag == self._preserve:
+                self._preserve_depth += 1
+        elif 'whitespace-pre' in ((attrs or {}).get('class') or ''):
+            self._preserve = tag
+            self._preserve_depth = 1
+
+    def _track_preserve_end(self, tag: str):
+        if self._preserve is not None and tag == self._preserve:
+            self._preserve_depth -= 1
+            if not self._preserve_depth:
+                self._preserve = None
+
+
+def join_blocks(blocks: List[str]) -> str:
+    """Join Markdown blocks with blank lines, keeping items of one list together."""
+    if not blocks:
+        return ''
+    parts = [blocks[0]]
+    for previous, block in zip(blocks, blocks[1:]):
+        parts.append('\n' if _same_list(previous, block) else '\n\n')
+        parts.append(block)
+    return ''.join(parts)
+
+
+def _same_list(previous: str, block: str) -> bool:
+    """Whether two list item blocks belong to one list (or one is nested)."""
+    first, second = LIST_ITEM_RE.match(previous), LIST_ITEM_RE.match(block)
+    if not first or not second:
+        return False
+    # A bullet list directly followed by a numbered one (or vice versa) at the same level
+    return first.group(1) != second.group(1) or bool(first.group(2)) == bool(second.group(2))
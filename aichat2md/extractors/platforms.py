@@ -0,0 +1,28 @@
+"""Platform detection for share URLs (no browser or network dependencies)."""
+
+
+# Desktop Chrome user agent, for share pages that serve bots a different page
+DESKTOP_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+
+
+def detect_platform(url: str) -> str:
+    """
+    Detect platform from URL.
+
+    Args:
+        url: Share URL
+
+    Returns:
+        Platform name: 'claude', 'chatgpt', 'doubao', 'gemini', or 'default'
+    """
+    url_lower = url.lower()
+    if 'claude.ai' in url_lower:
+        return 'claude'
+    elif 'chatgpt.com' in url_lower or 'chat.openai.com' in url_lower:
+        return 'chatgpt'
+    elif 'doubao.com' in url_lower:
+        return 'doubao'
+    elif 'gemini.google.com' in url_lower or 'g.co' in url_lower:
+        return 'gemini'
+    else:
+        return 'default'
@@ -1,35 +1,63 @@
 """Extract content from AI chat share URLs using Playwright."""
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+import atexit
+import threading
+from typing import Any, Dict, List, Optional, Union
 
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
-def _detect_platform(url: str) -> str:
-    """
-    Detect platform from URL.
+from ..timings import bind_coroutine, span
+from ..turns import make_turn, split_text_turns
+from .platforms import DESKTOP_USER_AGENT, detect_platform
+from .readiness import get_readiness_profile, wait_until_ready
+from .resource_blocking import ResourceBlocker, get_blocking_profile
+from .text_engine import turn_selectors
 
-    Args:
-        url: Share URL
 
-    Returns:
-        Platform name: 'claude', 'doubao', 'gemini', or 'default'
-    """
-    url_lower = url.lower()
-    if 'claude.ai' in url_lower:
-        return 'claude'
-    elif 'doubao.com' in url_lower:
-        return 'doubao'
-    elif 'gemini.google.com' in url_lower or 'g.co' in url_lower:
-        return 'gemini'
-    else:
-        return 'default'
+# Stealth settings for Claude.ai (Cloudflare protection)
+STEALTH_INIT_SCRIPT = 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
+
+# Rewrites each <pre> as a ``` fenced block (language from a language-* class),
+# so code reaches the text byte-for-byte and without its toolbar
+FENCE_CODE_SCRIPT = """() => {
+    for (const pre of document.querySelectorAll('pre')) {
+        const code = pre.querySelector('code') || pre;
+        const match = /(?:^|\\s)(?:language|lang)-([\\w+#.-]+)/.exec(code.className || pre.className || '');
+        const text = code.textContent.replace(/^\\n+/, '').replace(/\\s+$/, '');
+        if (!text.trim()) continue;
+        const longest = Math.max(0, ...(text.match(/`+/g) || []).map(run => run.length));
+        const fence = '`'.repeat(Math.max(3, longest + 1));
+        pre.textContent = fence + (match ? match[1] : '') + '\\n' + text + '\\n' + fence;
+    }
+}"""
+
+# Returns [role, text] for each outermost element matching a turn hint, in document order
+TURNS_SCRIPT = """(hints) => {
+    const found = [];
+    for (const [selector, role] of hints) {
+        for (const element of document.querySelectorAll(selector)) found.push([element, role]);
+    }
+    const elements = new Set(found.map(([element]) => element));
+    const outermost = found.filter(([element]) => {
+        for (let parent = element.parentElement; parent; parent = parent.parentElement) {
+            if (elements.has(parent)) return false;
+        }
+        return true;
+    });
+    outermost.sort(([a], [b]) => (a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING) ? -1 : 1);
+    return outermost.map(([element, role]) => [role, element.innerText]);
+}"""
 
 
 def _get_wait_time(platform: str) -> int:
     """
-    Get wait time in milliseconds for platform.
+    Get fallback wait time in milliseconds for platform.
+
+    Used only when readiness detection can't find the conversation.
 
     Args:
-        platform: Platform name from _detect_platform
+        platform: Platform name from detect_platform
 
     Returns:
         Wait time in milliseconds
@@ -43,13 +71,298 @@ def _get_wait_time(platform: str) -> int:
     return wait_times.get(platform, 2000)
 
 
-def extract_from_url(url: str, timeout: int = 60000) -> str:
+def _get_wait_strategy(platform: str) -> str:
+    """
+    Get page.goto wait_until strategy for platform.
+
+    Use 'load' for Gemini/Doubao/Claude (networkidle may timeout due to ongoing requests).
+    """
+    return 'load' if platform in ['gemini', 'doubao', 'claude'] else 'networkidle'
+
+
+def _get_context_options(platform: str) -> Dict[str, Any]:
+    """
+    Get browser context options for platform.
+
+    Args:
+        platform: Platform name from detect_platform
+
+    Returns:
+        Keyword arguments for browser.new_context
+    """
+    if platform == 'claude':
+        return {
+            'user_agent': DESKTOP_USER_AGENT,
+            'viewport': {'width': 1920, 'height': 1080}
+        }
+    return {}
+
+
+async def _handle_claude_route(route):
+    """Route handler to bypass cookie consent for Claude."""
+    if route.request.resource_type == 'document':
+        response = await route.fetch()
+        try:
+            body = await response.text()
+            # Modify consent flag to bypass cookie banner
+            modified = body.replace('"requiresExplicitConsent":true', '"requiresExplicitConsent":false')
+            await route.fulfill(response=response, body=modified)
+        except Exception:
+            await route.fallback()
+    else:
+        await route.fallback()
+
+
+def _make_route_handler(platform: str, blocker: Optional[ResourceBlocker]):
+    """
+    Build the page route handler for platform.
+
+    Requests matched by the blocking profile are aborted first; everything
+    else goes through Claude's document rewrite or continues unchanged.
+    """
+    async def handle_route(route):
+        request = route.request
+        if blocker is not None and blocker.should_block(request.resource_type, request.url):
+            await route.abort()
+        elif platform == 'claude':
+            await _handle_claude_route(route)
+        else:
+            await route.fallback()
+
+    return handle_route
+
+
+class BrowserPool:
+    """
+    Warm headless Chromium shared across URL extractions.
+
+    Chromium is launched once and each URL gets its own isolated context and
+    page. The async Playwright API runs on a private event loop thread, so
+    extract() can be called from ordinary synchronous code, including from
+    several threads at once; at most max_pages pages are open concurrently.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 4,
+        timeout: int = 60000,
+        readiness: Optional[Dict[str, Dict[str, Any]]] = None,
+        block_resources: bool = True,
+        resource_blocking: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.max_pages = max(1, max_pages)
+        self.timeout = timeout
+        self.readiness = readiness or {}
+        self.block_resources = block_resources
+        self.resource_blocking = resource_blocking or {}
+        # Cumulative blocking statistics across all extractions
+        self.blocking_stats = {'blocked_requests': 0, 'allowed_requests': 0, 'loaded_bytes': 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._playwright = None
+        self._browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self) -> 'BrowserPool':
+        """Start the event loop thread and launch Chromium (idempotent)."""
+        with self._lock:
+            if self._browser is not None:
+                return self
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever,
+                name='aichat2md-browser',
+                daemon=True
+            )
+            self._thread.start()
+            try:
+                with span('browser.launch'):
+                    self._run(self._launch())
+            except Exception:
+                self._stop_loop()
+                raise
+        return self
+
+    def close(self):
+        """Close Chromium and stop the event loop thread."""
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                if self._browser is not None:
+                    self._run(self._shutdown())
+            finally:
+                self._stop_loop()
+
+    def extract(self, url: str, stats: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Extract text content from a URL using a fresh context.
+
+        Args:
+            url: Share URL
+            stats: Optional dict filled with this page's blocking statistics
+
+        Returns:
+            Extracted plain text content
+        """
+        return self._run_extract(url, stats, 'text')
+
+    def extract_turns(self, url: str, stats: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Like extract(), but return the conversation as turns (see turns.py)."""
+        return self._run_extract(url, stats, 'turns')
+
+    def extract_html(self, url: str, stats: Optional[Dict[str, Any]] = None) -> str:
+        """Like extract(), but return the rendered page HTML (code blocks fenced)."""
+        return self._run_extract(url, stats, 'html')
+
+    def _run_extract(self, url: str, stats: Optional[Dict[str, Any]], output: str):
+        self.start()
+        with span('browser.extract', output=output):
+            return self._run(self._extract(url, stats, output))
+
+    def _run(self, coro):
+        # Spans opened on the loop thread nest under the caller's span
+        return asyncio.run_coroutine_threadsafe(bind_coroutine(coro), self._loop).result()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._browser = None
+        self._playwright = None
+
+    async def _launch(self):
+        self._playwright = await async_playwright().start()
+        # Browser-level flag needed by Claude's stealth setup; harmless elsewhere
+        self._browser = await self._playwright.chromium.launch(
+            headless=True,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        self._semaphore = asyncio.Semaphore(self.max_pages)
+
+    async def _shutdown(self):
+        await self._browser.close()
+        await self._playwright.stop()
+
+    async def _extract(
+        self,
+        url: str,
+        stats: Optional[Dict[str, Any]] = None,
+        output: str = 'text'
+    ) -> Union[str, List[Dict[str, Any]]]:
+        platform = detect_platform(url)
+        blocker = None
+        if self.block_resources:
+            blocker = ResourceBlocker(get_blocking_profile(platform, self.resource_blocking))
+
+        async with self._semaphore:
+            with span('browser.context'):
+                context = await self._browser.new_context(**_get_context_options(platform))
+            try:
+                page = await context.new_page()
+
+                if platform == 'claude':
+                    await page.add_init_script(STEALTH_INIT_SCRIPT)
+                if blocker is not None:
+                    page.on('response', blocker.record_response)
+                if blocker is not None or platform == 'claude':
+                    await page.route('**/*', _make_route_handler(platform, blocker))
+
+                # Navigate with appropriate wait strategy
+                with span('browser.goto'):
+                    await page.goto(url, wait_until=_get_wait_strategy(platform), timeout=self.timeout)
+
+                # Wait until the conversation has rendered and settled
+                with span('browser.ready'):
+                    await wait_until_ready(
+                        page,
+                        get_readiness_profile(platform, self.readiness),
+                        fallback_ms=_get_wait_time(platform)
+                    )
+
+                with span('browser.read') as info:
+                    # Extract plain text from body, with code blocks fenced
+                    await page.evaluate(FENCE_CODE_SCRIPT)
+
+                    if output == 'html':
+                        html = await page.content()
+                        info['output_chars'] = len(html)
+                        return html
+
+                    if output == 'turns':
+                        found = await page.evaluate(TURNS_SCRIPT, turn_selectors())
+                        found = [(role, text.strip()) for role, text in found or [] if text.strip()]
+                        if found:
+                            return [make_turn(role, text, position) for position, (role, text) in enumerate(found)]
+
+                    content = await page.inner_text('body')
+                    info['output_chars'] = len(content)
+
+                return split_text_turns(content.strip()) if output == 'turns' else content.strip()
+            finally:
+                await context.close()
+                if blocker is not None:
+                    page_stats = blocker.stats()
+                    for key in self.blocking_stats:
+                        self.blocking_stats[key] += page_stats[key]
+                    if stats is not None:
+                        stats.update(page_stats)
+
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool(config: Optional[Dict[str, Any]] = None) -> BrowserPool:
+    """
+    Get the process-wide browser pool, creating it on first use.
+
+    Chromium is only launched when the first URL is extracted, and the pool
+    is closed automatically at interpreter exit.
+
+    Args:
+        config: Configuration dict (only used when creating the pool)
+
+    Returns:
+        Shared BrowserPool
+    """
+    global _shared_pool
+    config = config or {}
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool(
+                max_pages=config.get('browser_max_pages', 4),
+                readiness=config.get('readiness'),
+                block_resources=config.get('block_resources', True),
+                resource_blocking=config.get('resource_blocking')
+            )
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+def extract_from_url(
+    url: str,
+    timeout: int = 60000,
+    pool: Optional[BrowserPool] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
     """
     Extract text content from AI chat share URL.
 
     Args:
         url: Share URL (ChatGPT, Gemini, Doubao, etc.)
-        timeout: Page load timeout in milliseconds
+        timeout: Page load timeout in milliseconds (ignored when pool is given)
+        pool: Warm browser pool to reuse; a one-off browser is launched if omitted
+        stats: Optional dict filled with request blocking statistics
 
     Returns:
         Extracted plain text content
@@ -58,73 +371,57 @@ def extract_from_url(url: str, timeout: int = 60000) -> str:
         PlaywrightTimeoutError: If page fails to load
         ValueError: If URL is invalid
     """
-    if not url.startswith('http'):
-        raise ValueError(f"Invalid URL: {url}")
+    return _extract_with_pool(url, timeout, pool, stats, 'text')
 
-    # Detect platform and get corresponding wait time
-    platform = _detect_platform(url)
-    wait_time = _get_wait_time(platform)
 
-    try:
-        with sync_playwright() as p:
-            # Claude.ai uses Cloudflare protection, needs stealth settings
-            if platform == 'claude':
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--disable-blink-features=AutomationControlled']
-                )
-                context = browser.new_context(
-                    user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-                    viewport={'width': 1920, 'height': 1080}
-                )
-                page = context.new_page()
-                page.add_init_script('Object.defineProperty(navigator, "webdriver", {get: () => undefined})')
-
-                # Route handler to bypass cookie consent for Claude
-                def handle_claude_route(route):
-                    if route.request.resource_type == 'document':
-                        response = route.fetch()
-                        try:
-                            body = response.text()
-                            # Modify consent flag to bypass cookie banner
-                            modified = body.replace('"requiresExplicitConsent":true', '"requiresExplicitConsent":false')
-                            route.fulfill(response=response, body=modified)
-                        except:
-                            route.fallback()
-                    else:
-                        route.fallback()
-
-                page.route('**/*', handle_claude_route)
-            else:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-
-            # Navigate with appropriate wait strategy
-            # Use 'load' for Gemini/Doubao/Claude (networkidle may timeout due to ongoing requests)
-            wait_strategy = 'load' if platform in ['gemini', 'doubao', 'claude'] else 'networkidle'
-            page.goto(url, wait_until=wait_strategy, timeout=60000)
-
-            # Wait for content to load
-            # Try to wait for main selector (works for ChatGPT)
-            try:
-                page.wait_for_selector('main', timeout=10000)
-            except PlaywrightTimeoutError:
-                # Some platforms may not have 'main' element, continue anyway
-                pass
+def extract_turns_from_url(
+    url: str,
+    timeout: int = 60000,
+    pool: Optional[BrowserPool] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Extract the conversation from an AI chat share URL as turns (see turns.py).
 
-            # Additional wait for dynamic content based on platform
-            page.wait_for_timeout(wait_time)
+    Turns come from platform DOM hints when the page has them, else from
+    speaker labels in the page text. Arguments and errors are as for
+    extract_from_url.
 
-            # Extract plain text from body
-            content = page.inner_text('body')
+    Returns:
+        List of turns in order
+    """
+    return _extract_with_pool(url, timeout, pool, stats, 'turns')
+
+
+def extract_html_from_url(
+    url: str,
+    timeout: int = 60000,
+    pool: Optional[BrowserPool] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Render an AI chat share URL and return the page HTML, with <pre> blocks
+    already fenced. Arguments and errors are as for extract_from_url.
+    """
+    return _extract_with_pool(url, timeout, pool, stats, 'html')
 
-            browser.close()
 
-            return content.strip()
+def _extract_with_pool(url, timeout, pool, stats, output):
+    if not url.startswith('http'):
+        raise ValueError(f"Invalid URL: {url}")
+
+    method = {'text': 'extract', 'turns': 'extract_turns', 'html': 'extract_html'}[output]
+    try:
+        if pool is not None:
+            return getattr(pool, method)(url, stats)
+
+        with BrowserPool(max_pages=1, timeout=timeout) as one_off:
+            return getattr(one_off, method)(url, stats)
 
     except PlaywrightTimeoutError as e:
+        load_timeout = pool.timeout if pool is not None else timeout
         raise PlaywrightTimeoutError(
-            f"Failed to load page within {timeout}ms. "
+            f"Failed to load page within {load_timeout}ms. "
             "Check your network connection and URL validity."
         ) from e
 
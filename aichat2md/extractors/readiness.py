@@ -0,0 +1,119 @@
+"""Platform-aware page readiness detection for the URL extractor."""
+
+from typing import Any, Dict, Optional
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+
+# Per-platform readiness settings:
+#   selector:            element that only exists once the conversation has rendered
+#   selector_timeout_ms: how long to wait for that element before falling back
+#   quiet_ms:            DOM must see no mutations for this long to count as settled
+#   max_wait_ms:         cap on the quiet-period wait for pages that never settle
+# Any field can be overridden per platform via the "readiness" key in config.json.
+READINESS_PROFILES = {
+    'chatgpt': {
+        'selector': '[data-message-author-role]',
+        'selector_timeout_ms': 10000,
+        'quiet_ms': 300,
+        'max_wait_ms': 5000
+    },
+    'gemini': {
+        'selector': 'message-content, model-response, .conversation-container',
+        'selector_timeout_ms': 10000,
+        'quiet_ms': 500,
+        'max_wait_ms': 8000
+    },
+    'doubao': {
+        'selector': '[data-testid="message_text_content"], [data-testid="message-block-container"]',
+        'selector_timeout_ms': 10000,
+        'quiet_ms': 500,
+        'max_wait_ms': 6000
+    },
+    'claude': {
+        'selector': '[data-testid="user-message"], .font-claude-message',
+        'selector_timeout_ms': 10000,
+        'quiet_ms': 500,
+        'max_wait_ms': 8000
+    },
+    'default': {
+        'selector': 'main',
+        'selector_timeout_ms': 10000,
+        'quiet_ms': 400,
+        'max_wait_ms': 4000
+    }
+}
+
+# Resolves true once document.body has seen no mutations for quietMs,
+# or false if maxWaitMs elapses first.
+QUIET_PERIOD_SCRIPT = """
+({quietMs, maxWaitMs}) => new Promise(resolve => {
+    let quietTimer = null;
+    let capTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    const finish = (quiet) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(quiet);
+    };
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    capTimer = setTimeout(() => finish(false), maxWaitMs);
+})
+"""
+
+
+def get_readiness_profile(platform: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Get readiness settings for platform, merged with config overrides.
+
+    Args:
+        platform: Platform name from detect_platform
+        overrides: Optional {platform: {field: value}} mapping from config.json
+
+    Returns:
+        Readiness settings dict
+    """
+    profile = dict(READINESS_PROFILES.get(platform, READINESS_PROFILES['default']))
+    if overrides and platform in overrides:
+        profile.update(overrides[platform])
+    return profile
+
+
+async def wait_until_ready(page, profile: Dict[str, Any], fallback_ms: int) -> str:
+    """
+    Wait until the conversation DOM is present and has stopped changing.
+
+    Falls back to a fixed sleep when the platform selector never appears or
+    the page can't be observed.
+
+    Args:
+        page: Playwright async Page (already navigated)
+        profile: Settings from get_readiness_profile
+        fallback_ms: Fixed wait used when detection fails
+
+    Returns:
+        How readiness was reached: 'quiet', 'max_wait', or 'fallback'
+    """
+    try:
+        await page.wait_for_selector(profile['selector'], timeout=profile['selector_timeout_ms'])
+    except PlaywrightTimeoutError:
+        # Selector is stale or page layout changed: keep the old behaviour
+        await page.wait_for_timeout(fallback_ms)
+        return 'fallback'
+
+    try:
+        quiet = await page.evaluate(
+            QUIET_PERIOD_SCRIPT,
+            {'quietMs': profile['quiet_ms'], 'maxWaitMs': profile['max_wait_ms']}
+        )
+    except Exception:
+        # Navigation or a torn-down frame interrupted the observer
+        await page.wait_for_timeout(fallback_ms)
+        return 'fallback'
+
+    return 'quiet' if quiet else 'max_wait'
@@ -0,0 +1,116 @@
+"""Request blocking profiles for headless page loads."""
+
+from typing import Any, Dict, List, Optional
+
+
+# Hosts that only serve analytics, telemetry or ads on the supported share pages
+TELEMETRY_PATTERNS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'sentry.io',
+    'browser-intake-datadoghq.com',
+    'segment.io',
+    'segment.com',
+    'mixpanel.com',
+    'amplitude.com',
+    'hotjar.com',
+    'clarity.ms',
+    'intercom.io',
+    'statsig',
+    'featuregates.org',
+]
+
+# Per-platform blocking profiles:
+#   resource_types: Playwright resource types to abort
+#   url_patterns:   substrings of request URLs to abort, whatever their type
+# Stylesheets are never blocked: inner_text() depends on CSS visibility.
+# Any field can be overridden per platform via the "resource_blocking" key in config.json.
+BLOCKING_PROFILES = {
+    'chatgpt': {
+        'resource_types': ['image', 'media', 'font'],
+        'url_patterns': TELEMETRY_PATTERNS + ['ab.chatgpt.com', 'chatgpt.com/ces/']
+    },
+    'gemini': {
+        'resource_types': ['image', 'media', 'font'],
+        'url_patterns': TELEMETRY_PATTERNS + ['play.google.com/log', 'ogs.google.com']
+    },
+    'doubao': {
+        'resource_types': ['image', 'media', 'font'],
+        'url_patterns': TELEMETRY_PATTERNS + ['mcs.zijieapi.com', 'mon.zijieapi.com', 'mssdk.bytedance.com']
+    },
+    'claude': {
+        'resource_types': ['image', 'media', 'font'],
+        'url_patterns': TELEMETRY_PATTERNS
+    },
+    'default': {
+        'resource_types': ['image', 'media', 'font'],
+        'url_patterns': TELEMETRY_PATTERNS
+    }
+}
+
+
+def get_blocking_profile(platform: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, List[str]]:
+    """
+    Get blocking profile for platform, merged with config overrides.
+
+    Args:
+        platform: Platform name from detect_platform
+        overrides: Optional {platform: {field: value}} mapping from config.json
+
+    Returns:
+        Blocking profile dict
+    """
+    profile = dict(BLOCKING_PROFILES.get(platform, BLOCKING_PROFILES['default']))
+    if overrides and platform in overrides:
+        profile.update(overrides[platform])
+    return profile
+
+
+class ResourceBlocker:
+    """Decides which requests to abort and counts what was blocked."""
+
+    def __init__(self, profile: Dict[str, List[str]]):
+        self.resource_types = set(profile.get('resource_types', []))
+        self.url_patterns = [pattern.lower() for pattern in profile.get('url_patterns', [])]
+        self.blocked_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Check request against the profile and record the outcome."""
+        url_lower = url.lower()
+        blocked = (
+            resource_type in self.resource_types
+            or any(pattern in url_lower for pattern in self.url_patterns)
+        )
+        if blocked:
+            self.blocked_requests += 1
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        else:
+            self.allowed_requests += 1
+        return blocked
+
+    def record_response(self, response):
+        """Count bytes of an allowed response (from Content-Length, when sent)."""
+        try:
+            self.loaded_bytes += int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get blocking statistics.
+
+        Aborted requests never transfer anything, so their size can't be
+        known here: blocked requests are counted, and loaded_bytes is what
+        the page still downloaded. The bytes saved are measured against an
+        unblocked load by benchmarks/resource_blocking.py.
+        """
+        return {
+            'blocked_requests': self.blocked_requests,
+            'blocked_by_type': dict(self.blocked_by_type),
+            'allowed_requests': self.allowed_requests,
+            'loaded_bytes': self.loaded_bytes
+        }
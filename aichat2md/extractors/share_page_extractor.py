@@ -0,0 +1,279 @@
+"""Extract conversations from share pages without a browser.
+
+Share pages (ChatGPT in particular) ship the whole conversation as embedded
+JSON for client-side hydration. A plain HTTP GET plus parsing that payload
+avoids launching Chromium entirely.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from ..timings import span
+from ..turns import make_turn, turns_to_text
+from .platforms import DESKTOP_USER_AGENT, detect_platform
+
+
+# Platforms whose share pages embed the conversation in the initial HTML
+FAST_PATH_PLATFORMS = {'chatgpt', 'default'}
+
+# Roles kept in the rebuilt conversation (system/tool messages are internal)
+CONVERSATION_ROLES = {'user', 'assistant'}
+
+SCRIPT_RE = re.compile(r'<script([^>]*)>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+ASSIGNMENT_RE = re.compile(r'window\.__(?:remixContext|NEXT_DATA__|reactRouterContext)\s*=\s*')
+STREAM_ENQUEUE_RE = re.compile(r'streamController\.enqueue\(')
+
+
+def _decode_turbo_stream(data: List[Any]) -> Any:
+    """
+    Rebuild objects from a turbo-stream payload (React Router / Remix streaming).
+
+    The payload is a flat array: dict keys are "_<index of key string>" and
+    values, like list items, are indices into the same array.
+    """
+    cache: Dict[int, Any] = {}
+
+    def resolve(index):
+        if not isinstance(index, int) or isinstance(index, bool):
+            return index
+        # Negative indices encode undefined/null/NaN and friends
+        if index < 0 or index >= len(data):
+            return None
+        if index in cache:
+            return cache[index]
+
+        value = data[index]
+        if isinstance(value, dict):
+            result = {}
+            cache[index] = result
+            for key, item in value.items():
+                if key.startswith('_') and key[1:].isdigit():
+                    name = data[int(key[1:])]
+                    result[str(name)] = resolve(item)
+        elif isinstance(value, list):
+            if value and isinstance(value[0], str):
+                # Typed values such as ["D", timestamp] carry no conversation text
+                result = None
+            else:
+                result = []
+                cache[index] = result
+                result.extend(resolve(item) for item in value)
+        else:
+            result = value
+        cache[index] = result
+        return result
+
+    return resolve(0)
+
+
+def _find_payloads(html: str) -> List[Any]:
+    """Find and decode JSON payloads embedded in script tags."""
+    decoder = json.JSONDecoder()
+    payloads = []
+
+    for attrs, body in SCRIPT_RE.findall(html):
+        body = body.strip()
+        if not body:
+            continue
+
+        # <script id="__NEXT_DATA__" type="application/json">{...}</script>
+        if 'application/json' in attrs.lower():
+            try:
+                payloads.append(json.loads(body))
+            except ValueError:
+                pass
+            continue
+
+        # window.__remixContext = {...};
+        for match in ASSIGNMENT_RE.finditer(body):
+            try:
+                payloads.append(decoder.raw_decode(body, match.end())[0])
+            except ValueError:
+                pass
+
+        # window.__reactRouterContext.streamController.enqueue("[...]")
+        for match in STREAM_ENQUEUE_RE.finditer(body):
+            try:
+                chunk = decoder.raw_decode(body, match.end())[0]
+                stream = json.loads(chunk)
+            except (ValueError, TypeError):
+                continue
+            if isinstance(stream, list):
+                payloads.append(_decode_turbo_stream(stream))
+
+    return payloads
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """Join the text parts of a ChatGPT message."""
+    content = message.get('content') or {}
+    parts = content.get('parts')
+    if parts is None and isinstance(content.get('text'), str):
+        parts = [content['text']]
+    texts = [part for part in (parts or []) if isinstance(part, str)]
+    return '\n'.join(texts).strip()
+
+
+def _nodes_to_turns(nodes: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Convert ordered conversation nodes to turns, dropping hidden/internal ones."""
+    turns = []
+    for node in nodes:
+        message = (node or {}).get('message')
+        if not isinstance(message, dict):
+            continue
+        role = ((message.get('author') or {}).get('role') or '').lower()
+        metadata = message.get('metadata') or {}
+        if role not in CONVERSATION_ROLES or metadata.get('is_visually_hidden_from_conversation'):
+            continue
+        text = _message_text(message)
+        if text:
+            turns.append({'role': role, 'text': text})
+    return turns
+
+
+def _mapping_to_nodes(mapping: Dict[str, Any], current_node: Optional[str]) -> List[Dict[str, Any]]:
+    """Order a ChatGPT message tree along its current branch."""
+    if current_node in mapping:
+        # Walk back from the visible leaf to the root
+        path = []
+        node_id = current_node
+        seen = set()
+        while node_id in mapping and node_id not in seen:
+            seen.add(node_id)
+            path.append(mapping[node_id])
+            node_id = mapping[node_id].get('parent')
+        return list(reversed(path))
+
+    roots = [node for node in mapping.values() if not node.get('parent')]
+    if not roots:
+        return []
+    path = []
+    node = roots[0]
+    seen = set()
+    while node is not None and id(node) not in seen:
+        seen.add(id(node))
+        path.append(node)
+        children = node.get('children') or []
+        node = mapping.get(children[-1]) if children else None
+    return path
+
+
+def _find_conversation(payload: Any, depth: int = 0) -> Optional[List[Dict[str, str]]]:
+    """Depth-first search for a conversation structure in a decoded payload."""
+    if depth > 40:
+        return None
+
+    if isinstance(payload, dict):
+        linear = payload.get('linear_conversation')
+        if isinstance(linear, list):
+            turns = _nodes_to_turns(linear)
+            if turns:
+                return turns
+
+        mapping = payload.get('mapping')
+        if isinstance(mapping, dict) and mapping:
+            nodes = _mapping_to_nodes(mapping, payload.get('current_node'))
+            turns = _nodes_to_turns(nodes)
+            if turns:
+                return turns
+
+        children = payload.values()
+    elif isinstance(payload, list):
+        children = payload
+    else:
+        return None
+
+    for child in children:
+        if isinstance(child, (dict, list)):
+            turns = _find_conversation(child, depth + 1)
+            if turns:
+                return turns
+    return None
+
+
+def parse_share_page(html: str) -> Optional[List[Dict[str, str]]]:
+    """
+    Rebuild the ordered conversation from a share page's embedded JSON.
+
+    Args:
+        html: Share page HTML as served (before any JavaScript runs)
+
+    Returns:
+        List of turns ({'role': 'user'|'assistant', 'text': ...}),
+        or None if the page has no recognizable payload
+    """
+    for payload in _find_payloads(html):
+        turns = _find_conversation(payload)
+        if turns:
+            return turns
+    return None
+
+
+def extract_turns_from_share_page(url: str, timeout: int = 20) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extract the conversation from a share URL as turns (see turns.py).
+
+    Args:
+        url: Share URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        List of turns, or None if this platform isn't supported, the page
+        couldn't be fetched, or it has no embedded conversation
+    """
+    if detect_platform(url) not in FAST_PATH_PLATFORMS:
+        return None
+
+    with span('share_page.fetch') as info:
+        try:
+            response = requests.get(
+                url,
+                headers={'User-Agent': DESKTOP_USER_AGENT, 'Accept': 'text/html'},
+                timeout=timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            return None
+        info['output_chars'] = len(response.text)
+
+    with span('share_page.parse') as info:
+        turns = parse_share_page(response.text)
+        info['turns'] = len(turns or [])
+    if not turns:
+        return None
+
+    return [make_turn(turn['role'], turn['text'], position) for position, turn in enumerate(turns)]
+
+
+def extract_from_share_page(url: str, timeout: int = 20) -> Optional[str]:
+    """
+    Extract conversation text from a share URL with a plain HTTP GET.
+
+    Args:
+        url: Share URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        Extracted plain text content, or None if this platform isn't
+        supported, the page couldn't be fetched, or it has no embedded
+        conversation (callers should fall back to extract_from_url)
+    """
+    turns = extract_turns_from_share_page(url, timeout)
+    return turns_to_text(turns) if turns else None
+
+
+if __name__ == "__main__":
+    # Manual test
+    import sys
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+        print(f"Extracting from: {url}")
+        content = extract_from_share_page(url)
+        if content is None:
+            print("No embedded conversation found")
+        else:
+            print(f"Extracted {len(content)} characters")
+            print(content[:500])
@@ -0,0 +1,416 @@
+"""Shared HTML-to-text engine with pluggable parser backends."""
+
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+
+# Elements whose content is never text
+SKIP_TAGS = {'script', 'style', 'noscript'}
+
+LANGUAGE_CLASS_RE = re.compile(r'(?:^|\s)(?:language|lang)-([\w+#.-]+)')
+
+# Platform DOM hints that mark an element as one conversation turn
+TURN_ATTRIBUTES = {
+    # ChatGPT
+    ('data-message-author-role', 'user'): 'user',
+    ('data-message-author-role', 'assistant'): 'assistant',
+    # Claude
+    ('data-testid', 'user-message'): 'user',
+    # Doubao
+    ('data-testid', 'send_message'): 'user',
+    ('data-testid', 'receive_message'): 'assistant',
+}
+TURN_CLASSES = {'font-user-message': 'user', 'font-claude-message': 'assistant', 'font-claude-response': 'assistant'}
+# Gemini uses custom elements
+TURN_TAGS = {'user-query': 'user', 'model-response': 'assistant'}
+
+# Backends tried in order when none is requested; lxml parses incrementally,
+# selectolax needs the whole document, the stdlib parser always works
+BACKEND_ORDER = ['lxml', 'selectolax', 'stdlib']
+
+# Largest input selectolax is picked for automatically; it holds the whole
+# document in memory, so bigger or unknown-size inputs use a streaming parser
+SELECTOLAX_MAX_BYTES = 8 * 1024 * 1024
+
+
+class TextCollector:
+    """
+    Turns parser events into text chunks.
+
+    Text is buffered until the next tag or comment, so a text node split
+    across two feeds still comes out as one chunk. Skipped elements are
+    tracked with a depth counter, so nesting such as <noscript><style>
+    resumes text only after the outermost skipped element closes.
+
+    Each <pre> becomes one fenced code chunk with its whitespace intact. If
+    the <pre> holds a <code> element, only the code is kept (so toolbar
+    text such as a language label or "Copy code" is dropped), and a
+    language-* class sets the fence language.
+
+    Elements that platform DOM hints mark as a turn (see TURN_ATTRIBUTES)
+    are recorded in turn_marks as (first chunk, end chunk, role), counting
+    chunks from the start of the document.
+    """
+
+    def __init__(self):
+        self.text_chunks: List[str] = []
+        self.skip_tags = SKIP_TAGS
+        self.skip_depth = 0
+        self._pending: List[str] = []
+        self._pre_depth = 0
+        self._pre_text: List[str] = []
+        self._code_depth = 0
+        self._code_text: List[str] = []
+        self._code_language = ''
+        self._saw_code = False
+        self.turn_marks: List[Tuple[int, int, str]] = []
+        self._chunk_count = 0
+        self._turn: Optional[Tuple[str, int, str]] = None
+        self._turn_depth = 0
+
+    def _add_chunk(self, chunk: str):
+        self.text_chunks.append(chunk)
+        self._chunk_count += 1
+
+    def flush(self):
+        if self._pending:
+            # Clean whitespace but preserve structure
+            cleaned = ''.join(self._pending).strip()
+            self._pending = []
+            if cleaned:
+                self._add_chunk(cleaned)
+
+    def _track_turn_start(self, tag: str, attrs):
+        if self._turn is not None:
+            if tag == self._turn[0]:
+                self._turn_depth += 1
+            return
+        role = _turn_role(tag, attrs)
+        if role and not self._pre_depth:
+            self.flush()
+            self._turn = (tag, self._chunk_count, role)
+            self._turn_depth = 1
+
+    def _track_turn_end(self, tag: str):
+        if self._turn is None or tag != self._turn[0]:
+            return
+        self._turn_depth -= 1
+        if not self._turn_depth:
+            self.flush()
+            self.turn_marks.append((self._turn[1], self._chunk_count, self._turn[2]))
+            self._turn = None
+
+    def start(self, tag: str, attrs: Optional[Dict[str, Optional[str]]] = None):
+        self._track_turn_start(tag, attrs)
+        if tag in self.skip_tags:
+            self.skip_depth += 1
+        if self._pre_depth:
+            if tag == 'pre':
+                self._pre_depth += 1
+            elif tag == 'code':
+                self._start_code(attrs)
+            elif tag == 'br' and not self.skip_depth:
+                self._pre_text.append('\n')
+                if self._code_depth:
+                    self._code_text.append('\n')
+            return
+
+        self.flush()
+        if tag == 'pre' and not self.skip_depth:
+            self._pre_depth = 1
+            # <pre class="language-x"> also names the language
+            self._code_language = _language_from_class(attrs)
+
+    def _start_code(self, attrs):
+        self._code_depth += 1
+        self._saw_code = True
+        self._code_language = _language_from_class(attrs) or self._code_language
+
+    def end(self, tag: str):
+        if tag in self.skip_tags and self.skip_depth:
+            self.skip_depth -= 1
+        if self._pre_depth:
+            if tag == 'code' and self._code_depth:
+                self._code_depth -= 1
+            elif tag == 'pre':
+                self._pre_depth -= 1
+                if not self._pre_depth:
+                    self._emit_code()
+        else:
+            self.flush()
+        self._track_turn_end(tag)
+
+    def _emit_code(self):
+        body = ''.join(self._code_text if self._saw_code else self._pre_text)
+        body = body.lstrip('\n').rstrip()
+        if body.strip():
+            # The fence must be longer than any backtick run inside the code
+            longest = max((len(run) for run in re.findall(r'`+', body)), default=0)
+            fence = '`' * max(3, longest + 1)
+            self._add_chunk(f"{fence}{self._code_language}\n{body}\n{fence}")
+        self._pre_text = []
+        self._code_text = []
+        self._code_depth = 0
+        self._code_language = ''
+        self._saw_code = False
+
+    def data(self, data: str):
+        if self.skip_depth:
+            return
+        if self._pre_depth:
+            self._pre_text.append(data)
+            if self._code_depth:
+                self._code_text.append(data)
+            return
+        self._pending.append(data)
+
+    def pop_chunks(self) -> List[str]:
+        """Return and clear the text chunks completed so far."""
+        chunks, self.text_chunks = self.text_chunks, []
+        return chunks
+
+    def get_text(self) -> str:
+        """Get extracted text with normalized spacing."""
+        self.flush()
+        return '\n'.join(self.text_chunks)
+
+
+def turn_selectors() -> List[Tuple[str, str]]:
+    """(CSS selector, role) pairs for the turn DOM hints, for use in a browser."""
+    selectors = [(f'[{name}="{value}"]', role) for (name, value), role in TURN_ATTRIBUTES.items()]
+    selectors += [(f'.{name}', role) for name, role in TURN_CLASSES.items()]
+    selectors += list(TURN_TAGS.items())
+    return selectors
+
+
+def _turn_role(tag: str, attrs: Optional[Dict[str, Optional[str]]]) -> Optional[str]:
+    """Role of a turn element by platform DOM hints, or None."""
+    if tag in TURN_TAGS:
+        return TURN_TAGS[tag]
+    if not attrs:
+        return None
+    for name in ('data-message-author-role', 'data-testid'):
+        value = attrs.get(name)
+        if value and (name, value) in TURN_ATTRIBUTES:
+            return TURN_ATTRIBUTES[(name, value)]
+    for name in (attrs.get('class') or '').split():
+        if name in TURN_CLASSES:
+            return TURN_CLASSES[name]
+    return None
+
+
+def _language_from_class(attrs: Optional[Dict[str, Optional[str]]]) -> str:
+    """Read the code language from a language-* or lang-* class."""
+    match = LANGUAGE_CLASS_RE.search((attrs or {}).get('class') or '')
+    return match.group(1) if match else ''
+
+
+class CleanHTMLParser(TextCollector, HTMLParser):
+    """HTML parser that extracts clean text, skipping scripts and styles (stdlib backend)."""
+
+    def __init__(self):
+        TextCollector.__init__(self)
+        HTMLParser.__init__(self)
+
+    def handle_starttag(self, tag, attrs):
+        self.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.end(tag)
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_data(self, data):
+        self.data(data)
+
+    def close(self):
+        HTMLParser.close(self)
+        self.flush()
+
+
+class _LxmlTarget:
+    """Forwards lxml parser target events to a TextCollector."""
+
+    def __init__(self, collector: TextCollector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.start(tag, dict(attrib))
+
+    def end(self, tag):
+        self.collector.end(tag)
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        self.collector.flush()
+
+    def close(self):
+        return None
+
+
+class LxmlTextParser(TextCollector):
+    """Incremental text parser on libxml2's HTML parser (lxml backend)."""
+
+    def __init__(self):
+        from lxml import etree
+
+        super().__init__()
+        self._parser = etree.HTMLParser(target=_LxmlTarget(self), remove_comments=False)
+
+    def feed(self, text: str):
+        self._parser.feed(text)
+
+    def close(self):
+        try:
+            self._parser.close()
+        except Exception:
+            # lxml raises on documents with no elements; there is no text to lose
+            pass
+        self.flush()
+
+
+class SelectolaxTextParser(TextCollector):
+    """
+    Text parser on selectolax (Lexbor engine).
+
+    selectolax can't parse incrementally, so fed text is buffered and the
+    document is parsed on close().
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer: List[str] = []
+
+    def feed(self, text: str):
+        self._buffer.append(text)
+
+    def _walk(self, node):
+        # Explicit stack, so deeply nested documents can't hit the recursion limit.
+        # A string on the stack is the tag of an element whose children are done.
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                self.end(node)
+                continue
+            if node.next is not None:
+                stack.append(node.next)
+            tag = node.tag
+            if tag == '-text':
+                self.data(node.text_content or '')
+            elif tag.startswith('-') or tag in self.skip_tags:
+                # Comments and other non-element nodes only break text
+                self.flush()
+            else:
+                self.start(tag, node.attributes)
+                stack.append(tag)
+                if node.child is not None:
+                    stack.append(node.child)
+
+    def close(self):
+        from selectolax.lexbor import LexborHTMLParser
+
+        html = ''.join(self._buffer)
+        self._buffer = []
+        if html.strip():
+            root = LexborHTMLParser(html).root
+            if root is not None:
+                self._walk(root)
+        self.flush()
+
+
+BACKENDS = {
+    'stdlib': CleanHTMLParser,
+    'lxml': LxmlTextParser,
+    'selectolax': SelectolaxTextParser,
+}
+
+
+@lru_cache(maxsize=None)
+def _importable(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+_MODULES = {'lxml': 'lxml.etree', 'selectolax': 'selectolax.lexbor', 'stdlib': 'html.parser'}
+
+
+def available_backends() -> List[str]:
+    """Backends that can be used in this environment, in preference order."""
+    return [name for name in BACKEND_ORDER if _importable(_MODULES[name])]
+
+
+def choose_backend(size_hint: Optional[int] = None) -> str:
+    """
+    Backend used when none is requested.
+
+    The first available backend in BACKEND_ORDER, except that selectolax is
+    only chosen for inputs known to be at most SELECTOLAX_MAX_BYTES.
+
+    Args:
+        size_hint: Input size in bytes, if known
+
+    Returns:
+        Backend name
+    """
+    small = size_hint is not None and size_hint <= SELECTOLAX_MAX_BYTES
+    return next(name for name in available_backends() if name != 'selectolax' or small)
+
+
+@lru_cache(maxsize=None)
+def _parser_class(backend: str, collector: type) -> type:
+    """Backend parser class whose events go to a TextCollector subclass."""
+    return type(collector.__name__ + BACKENDS[backend].__name__, (collector, BACKENDS[backend]), {})
+
+
+def create_parser(backend: Optional[str] = None, collector: Optional[type] = None, size_hint: Optional[int] = None):
+    """
+    Create a text parser with feed(text), close() and pop_chunks().
+
+    Args:
+        backend: 'lxml', 'selectolax' or 'stdlib'; chosen by choose_backend
+            if omitted or 'auto'
+        collector: TextCollector subclass that handles the parser events
+            (e.g. html_markdown.MarkdownCollector); plain text if omitted
+        size_hint: Input size in bytes, if known (see choose_backend)
+
+    Returns:
+        Parser instance
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if backend in (None, 'auto'):
+        backend = choose_backend(size_hint)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend: {backend}. Use one of: {', '.join(BACKEND_ORDER)}")
+    if not _importable(_MODULES[backend]):
+        raise ValueError(f"HTML backend '{backend}' is not installed")
+    if collector is None or collector is TextCollector:
+        return BACKENDS[backend]()
+    return _parser_class(backend, collector)()
+
+
+def html_to_text(html: str, backend: Optional[str] = None) -> str:
+    """
+    Extract clean text from an HTML string.
+
+    Args:
+        html: HTML document
+        backend: Parser backend (see create_parser)
+
+    Returns:
+        Text chunks joined by newlines
+    """
+    parser = create_parser(backend, size_hint=len(html))
+    parser.feed(html)
+    parser.close()
+    return '\n'.join(parser.pop_chunks())
@@ -1,54 +1,152 @@
 """Extract content from Safari .webarchive files."""
 
+import codecs
+import mmap
 import plistlib
+import struct
 from pathlib import Path
-from html.parser import HTMLParser
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from ..timings import span
+from .bplist_reader import BPLIST_MAGIC, BinaryPlist
+from .html_extractor import READ_CHUNK_SIZE, build_turns, iter_html_blocks
 
-class CleanHTMLParser(HTMLParser):
-    """HTML parser that extracts clean text, skipping scripts and styles."""
+# Deeper subframe nesting means a malformed (possibly self-referencing) archive
+MAX_SUBFRAME_DEPTH = 32
 
-    def __init__(self):
-        super().__init__()
-        self.text_chunks: List[str] = []
-        self.skip_tags = {'script', 'style', 'noscript'}
-        self.current_tag = None
 
-    def handle_starttag(self, tag, attrs):
-        if tag in self.skip_tags:
-            self.current_tag = tag
-
-    def handle_endtag(self, tag):
-        if tag == self.current_tag:
-            self.current_tag = None
+def _codec(encoding_name: Optional[str]) -> Optional[str]:
+    """Map WebResourceTextEncodingName to a Python codec, if known."""
+    if not encoding_name:
+        return None
+    try:
+        return codecs.lookup(encoding_name).name
+    except LookupError:
+        return None
 
-    def handle_data(self, data):
-        if self.current_tag is None:
-            # Clean whitespace but preserve structure
-            cleaned = data.strip()
-            if cleaned:
-                self.text_chunks.append(cleaned)
 
-    def get_text(self) -> str:
-        """Get extracted text with normalized spacing."""
-        return '\n'.join(self.text_chunks)
+def _resources_from_bplist(plist: BinaryPlist, archive: int, depth: int = 0) -> Iterator[Tuple[Any, Optional[str]]]:
+    """
+    Walk a binary webarchive to its main and subframe HTML resources.
 
+    Only the dicts and keys on the path are decoded; subresources (images,
+    scripts, fonts) are never touched.
 
-def extract_from_webarchive(filepath: str) -> str:
+    Yields:
+        (HTML bytes as a memoryview, text encoding name or None)
     """
-    Extract text content from Safari .webarchive file.
+    main = plist.lookup(archive, 'WebMainResource')
+    if main is None:
+        if depth == 0:
+            raise ValueError("Invalid webarchive: missing WebMainResource")
+    else:
+        data_ref = plist.lookup(main, 'WebResourceData')
+        if data_ref is None:
+            if depth == 0:
+                raise ValueError("Invalid webarchive: missing WebResourceData")
+        else:
+            mime_ref = plist.lookup(main, 'WebResourceMIMEType')
+            mime = plist.string(mime_ref) if mime_ref is not None else None
+            if depth == 0 or mime in (None, 'text/html', 'application/xhtml+xml'):
+                encoding_ref = plist.lookup(main, 'WebResourceTextEncodingName')
+                encoding = plist.string(encoding_ref) if encoding_ref is not None else None
+                data = plist.data(data_ref)
+                if data is None:
+                    raise ValueError("Invalid webarchive: WebResourceData is not data")
+                yield data, encoding
+
+    subframes = plist.lookup(archive, 'WebSubframeArchives')
+    if subframes is not None:
+        _check_depth(depth)
+        for subframe in plist.array(subframes):
+            yield from _resources_from_bplist(plist, subframe, depth + 1)
+
+
+def _resources_from_dict(archive: Dict[str, Any], depth: int = 0) -> Iterator[Tuple[Any, Optional[str]]]:
+    """Same walk as _resources_from_bplist, over a plistlib-loaded (XML) webarchive."""
+    main = archive.get('WebMainResource')
+    if main is None:
+        if depth == 0:
+            raise ValueError("Invalid webarchive: missing WebMainResource")
+    elif 'WebResourceData' not in main:
+        if depth == 0:
+            raise ValueError("Invalid webarchive: missing WebResourceData")
+    elif depth == 0 or main.get('WebResourceMIMEType') in (None, 'text/html', 'application/xhtml+xml'):
+        yield main['WebResourceData'], main.get('WebResourceTextEncodingName')
 
-    Args:
-        filepath: Path to .webarchive file
+    subframes = archive.get('WebSubframeArchives', [])
+    if subframes:
+        _check_depth(depth)
+    for subframe in subframes:
+        yield from _resources_from_dict(subframe, depth + 1)
 
-    Returns:
-        Extracted plain text content
 
-    Raises:
-        FileNotFoundError: If file doesn't exist
-        ValueError: If file is not a valid webarchive
+def _check_depth(depth: int) -> None:
+    """Refuse to descend past MAX_SUBFRAME_DEPTH, so a subframe cycle can't recurse forever."""
+    if depth >= MAX_SUBFRAME_DEPTH:
+        raise ValueError(
+            f"Invalid webarchive: subframes nested more than {MAX_SUBFRAME_DEPTH} deep (malformed webarchive)"
+        )
+
+
+def _blocks(data) -> Iterator[bytes]:
+    """
+    Copy a resource out in fixed-size blocks.
+
+    Copies, not views: a view left in an exception's traceback would keep
+    the mapping from closing and hide the error behind a BufferError.
     """
+    for i in range(0, len(data), READ_CHUNK_SIZE):
+        yield bytes(data[i:i + READ_CHUNK_SIZE])
+
+
+def _resource_text(data, encoding_name: Optional[str], backend: Optional[str]) -> str:
+    """Parse one HTML resource in fixed-size slices."""
+    blocks = _blocks(data)
+    return '\n'.join(iter_html_blocks(blocks, _codec(encoding_name), backend, size_hint=len(data)))
+
+
+def _resource_turns(data, encoding_name: Optional[str], backend: Optional[str], markdown: bool) -> List[Dict[str, Any]]:
+    """Parse one HTML resource into turns."""
+    blocks = _blocks(data)
+    marks: List[Tuple[int, int, str]] = []
+    chunks = list(iter_html_blocks(blocks, _codec(encoding_name), backend, marks, markdown, len(data)))
+    return build_turns(chunks, marks, markdown)
+
+
+def _extract_texts(filepath: str, backend: Optional[str], parse: Callable = _resource_text) -> List[Any]:
+    """Parse the main frame and every HTML subframe, in order, with parse."""
+    with open(filepath, 'rb') as f:
+        if f.read(len(BPLIST_MAGIC)) != BPLIST_MAGIC:
+            # XML webarchives are rare and small; plistlib handles them
+            f.seek(0)
+            archive = plistlib.load(f)
+            if not isinstance(archive, dict):
+                raise ValueError("Invalid webarchive: not a dictionary")
+            return [parse(data, encoding, backend) for data, encoding in _resources_from_dict(archive)]
+
+        # Map the file instead of loading it: only pages holding the HTML are read
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                plist = BinaryPlist(mapped)
+            except ValueError as e:
+                raise ValueError(f"Invalid webarchive format: {e}") from e
+            texts = []
+            views = []
+            try:
+                for data, encoding in _resources_from_bplist(plist, plist.top):
+                    views.append(data)
+                    texts.append(parse(data, encoding, backend))
+            finally:
+                # Views must be released before the mapping can close
+                for view in views:
+                    view.release()
+                plist.release()
+            return texts
+
+
+def _parse_webarchive(filepath: str, backend: Optional[str], parse: Callable) -> List[Any]:
+    """Validate the path and parse each HTML frame, mapping format errors to ValueError."""
     path = Path(filepath)
 
     if not path.exists():
@@ -58,34 +156,65 @@ def extract_from_webarchive(filepath: str) -> str:
         raise ValueError(f"Not a webarchive file: {filepath}")
 
     try:
-        with open(filepath, 'rb') as f:
-            plist = plistlib.load(f)
+        with span('parse.webarchive', input_bytes=path.stat().st_size) as info:
+            frames = _extract_texts(filepath, backend, parse)
+            info['frames'] = len(frames)
+            return frames
+    except (plistlib.InvalidFileException, struct.error, IndexError) as e:
+        raise ValueError(f"Invalid webarchive format: {e}") from e
 
-        # Extract main resource HTML data
-        if 'WebMainResource' not in plist:
-            raise ValueError("Invalid webarchive: missing WebMainResource")
 
-        main_resource = plist['WebMainResource']
+def extract_from_webarchive(filepath: str, backend: Optional[str] = None) -> str:
+    """
+    Extract text content from Safari .webarchive file.
 
-        if 'WebResourceData' not in main_resource:
-            raise ValueError("Invalid webarchive: missing WebResourceData")
+    Binary webarchives are memory-mapped and only the main resource and
+    subframe HTML are decoded, so memory use scales with the HTML rather
+    than the archive. Text from subframes (iframes) follows the main page.
 
-        html_data = main_resource['WebResourceData']
+    Args:
+        filepath: Path to .webarchive file
+        backend: Parser backend; the fastest installed one if omitted
 
-        # Decode HTML (try UTF-8, fallback to latin-1)
-        try:
-            html = html_data.decode('utf-8')
-        except UnicodeDecodeError:
-            html = html_data.decode('latin-1', errors='ignore')
+    Returns:
+        Extracted plain text content
 
-        # Parse and clean HTML
-        parser = CleanHTMLParser()
-        parser.feed(html)
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file is not a valid webarchive
+    """
+    texts = _parse_webarchive(filepath, backend, _resource_text)
+    return '\n'.join(text for text in texts if text)
 
-        return parser.get_text()
 
-    except plistlib.InvalidFileException as e:
-        raise ValueError(f"Invalid webarchive format: {e}") from e
+def extract_turns_from_webarchive(
+    filepath: str,
+    backend: Optional[str] = None,
+    markdown: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Extract the conversation in a webarchive as turns (see turns.py).
+
+    Turns from subframes follow those of the main page.
+
+    Args:
+        filepath: Path to .webarchive file
+        backend: Parser backend; the fastest installed one if omitted
+        markdown: Turn text as Markdown instead of plain text
+
+    Returns:
+        List of turns in order
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file is not a valid webarchive
+    """
+    def parse(data, encoding_name, backend):
+        return _resource_turns(data, encoding_name, backend, markdown)
+
+    frames = _parse_webarchive(filepath, backend, parse)
+    turns = [turn for frame in frames for turn in frame]
+    return [dict(turn, position=position) for position, turn in enumerate(turns)]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+"""Front matter block shared by structured notes and --raw output."""
+
+from datetime import datetime
+from typing import List, Optional
+
+
+def build_front_matter(language: str, source: str, tags: Optional[List[str]] = None) -> str:
+    """
+    Build the front matter block added to generated documents.
+
+    Args:
+        language: Language code ('en' or 'zh')
+        source: Original source URL or filename
+        tags: Optional tag list
+
+    Returns:
+        Front matter including the trailing blank line
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    tag_list = ', '.join(tags or [])
+    if language == "zh":
+        return f"""---
+技术标签: [{tag_list}]
+日期: {today}
+来源: {source or 'Unknown'}
+---
+
+"""
+    return f"""---
+tags: [{tag_list}]
+date: {today}
+source: {source or 'Unknown'}
+---
+
+"""
@@ -0,0 +1,363 @@
+"""Incremental re-conversion of conversations that continued (--update).
+
+After a conversation is structurized, a conversion record (its turns and
+the output path) is stored for its source in RECORDS_DIR. When the source
+is converted again with --update, the new extraction is compared turn by
+turn with the recorded turns. If it only adds turns at the end, just those
+turns and a short context from the existing document are sent to the
+model, and the result's sections are appended to the existing file.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import normalize_url
+from .chunking import SECTION_NAMES, _parse_front_matter, _parse_tags, _split_sections
+from .cli import extract_content, save_markdown
+from .config import CONFIG_DIR
+from .preprocess import preprocess_text
+from .structurizer import structurize_content, structurize_new_turns
+from .timings import span
+from .turns import split_text_turns, turns_to_text
+
+
+# One JSON record per converted source. Not a cache: records are never
+# evicted or expired, and cache settings (--no-cache) don't affect them
+RECORDS_DIR = CONFIG_DIR / "conversions"
+
+# Why an update converted the whole conversation (stats['reason'])
+FULL_REASONS = {
+    'no_record': "no earlier conversion to extend",
+    'language_changed': "the earlier conversion was in another language",
+    'output_missing': "the earlier Markdown file is gone",
+    'history_changed': "earlier turns were edited or removed",
+}
+
+# Longest excerpt of the previous last turn included as context
+CONTEXT_TURN_CHARS = 1000
+
+# Longest summary included as context
+CONTEXT_SUMMARY_CHARS = 1500
+
+
+def _record_key(input_path: str) -> str:
+    """Conversion record key: the normalized URL, or the resolved file path."""
+    if input_path.startswith('http'):
+        return f"conversion:url:{normalize_url(input_path)}"
+    return f"conversion:file:{Path(input_path).expanduser().resolve()}"
+
+
+def _record_path(input_path: str, config: Dict[str, Any]) -> Path:
+    """File holding the conversion record of a source (records_dir config key, else RECORDS_DIR)."""
+    directory = Path(config.get('records_dir') or RECORDS_DIR).expanduser()
+    return directory / f"{hashlib.sha256(_record_key(input_path).encode('utf-8')).hexdigest()}.json"
+
+
+def load_record(input_path: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Load the conversion record of a source.
+
+    Args:
+        input_path: URL or file path
+        config: Configuration dict (records_dir)
+
+    Returns:
+        Dict with 'turns' (see conversation_turns), 'output' and
+        'language', or None if the source has not been converted
+    """
+    try:
+        record = json.loads(_record_path(input_path, config).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return record if record.get('key') == _record_key(input_path) else None
+
+
+def record_conversion(
+    input_path: str,
+    text: str,
+    output_path: Path,
+    config: Dict[str, Any],
+    turns: Optional[List[str]] = None
+):
+    """
+    Remember what was converted for a source, so --update can send only new turns.
+
+    Args:
+        input_path: URL or file path
+        text: Extracted text that was structurized
+        output_path: Where the Markdown was saved
+        config: Configuration dict
+        turns: The conversation's turns, if already split (see conversation_turns)
+    """
+    path = _record_path(input_path, config)
+    record = {
+        'key': _record_key(input_path),
+        'turns': turns if turns is not None else conversation_turns(input_path, text, config),
+        'output': str(Path(output_path).resolve()),
+        'language': config.get('language', 'en'),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(record, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError:
+        # A read-only or full config directory must not fail the conversion
+        pass
+
+
+def _normalize(turn: str) -> str:
+    return ' '.join(turn.split())
+
+
+def _file_turns(input_path: str) -> Optional[List[Dict[str, Any]]]:
+    """Turns of a local export from its extractor, or None if it can't be read."""
+    suffix = Path(input_path).suffix.lower()
+    try:
+        if suffix == '.webarchive':
+            from .extractors.webarchive_extractor import extract_turns_from_webarchive
+
+            return extract_turns_from_webarchive(input_path)
+        if suffix in ['.mhtml', '.mht']:
+            from .extractors.mhtml_extractor import extract_turns_from_mhtml
+
+            return extract_turns_from_mhtml(input_path)
+        if suffix in ['.html', '.htm', '.xhtml']:
+            from .extractors.html_extractor import extract_turns_from_html
+
+            return extract_turns_from_html(input_path)
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def conversation_turns(input_path: str, text: str, config: Dict[str, Any]) -> List[str]:
+    """
+    Split a conversation into the turns --update compares.
+
+    Local exports are split by their extractor, at platform DOM hints or
+    else at speaker labels, so exports whose text has no labels still have
+    turns. URLs (whose extracted text carries labels) are split with
+    turns.split_text_turns. Both keep fenced code inside its turn.
+
+    Args:
+        input_path: URL or file path
+        text: Extracted text of the conversation
+        config: Configuration dict (preprocess, boilerplate)
+
+    Returns:
+        Each turn's text under its speaker label, in order
+    """
+    turns = None if input_path.startswith('http') else _file_turns(input_path)
+    if turns and config.get('preprocess', True):
+        # Match the preprocessed text that is sent to the model
+        source = Path(input_path).name
+        turns = [dict(turn, text=preprocess_text(turn['text'], source, config)) for turn in turns]
+    if not turns:
+        turns = split_text_turns(text)
+    return [turns_to_text([turn]) for turn in turns if turn['text']]
+
+
+def find_new_turns(old_turns: List[str], new_turns: List[str]) -> Optional[List[str]]:
+    """
+    Find the turns new_turns adds after the end of old_turns.
+
+    Turns are compared ignoring whitespace differences.
+
+    Args:
+        old_turns: Turns of the previous conversion (see conversation_turns)
+        new_turns: Turns of the new extraction
+
+    Returns:
+        New turns in order (empty if nothing changed), or None if earlier
+        turns were edited or removed and the whole conversation must be
+        converted again
+    """
+    if len(new_turns) < len(old_turns):
+        return None
+    for old, new in zip(old_turns, new_turns):
+        if _normalize(old) != _normalize(new):
+            return None
+    return new_turns[len(old_turns):]
+
+
+def build_context(markdown: str, last_turn: str, language: str) -> str:
+    """
+    Summarize an existing document for the update prompt.
+
+    Args:
+        markdown: The existing document
+        last_turn: Last turn that document was made from
+        language: Output language code
+
+    Returns:
+        Title, summary, section outline and an excerpt of the last turn
+    """
+    names = SECTION_NAMES.get(language, SECTION_NAMES['en'])
+    _, body = _parse_front_matter(markdown.strip())
+    title, sections = _split_sections(body)
+    summary = next((content for heading, content in sections if heading == names['summary']), '')
+    outline = [heading for heading, _ in sections if heading and heading not in (names['summary'], names['topics'])]
+
+    if len(summary) > CONTEXT_SUMMARY_CHARS:
+        summary = summary[:CONTEXT_SUMMARY_CHARS].rstrip() + '…'
+    last_turn = last_turn.strip()
+    if len(last_turn) > CONTEXT_TURN_CHARS:
+        last_turn = '…' + last_turn[-CONTEXT_TURN_CHARS:].lstrip()
+
+    lines = [f"# {title}"] if title else []
+    if summary:
+        lines += ['', f"## {names['summary']}", summary]
+    if outline:
+        lines += [''] + [f"- {heading}" for heading in outline]
+    if last_turn:
+        lines += ['', '---', last_turn]
+    return '\n'.join(lines).strip()
+
+
+def append_update(existing: str, part: str, language: str) -> str:
+    """
+    Add the document for new turns to an existing document.
+
+    The existing text is kept byte for byte except for two insertions: new
+    tags are added to its tags line, and the new summary is added as a
+    paragraph at the end of its summary section. The part's other sections
+    are appended at the end; its title and key topics are dropped.
+
+    Args:
+        existing: The existing document
+        part: Document structurized from the new turns
+        language: Output language code
+
+    Returns:
+        Updated document
+    """
+    names = SECTION_NAMES.get(language, SECTION_NAMES['en'])
+    part_fields, part_body = _parse_front_matter(part.strip())
+    _, part_sections = _split_sections(part_body)
+    new_tags = _parse_tags(part_fields.get(names['tags']) or part_fields.get('tags'))
+    summary = '\n\n'.join(content for heading, content in part_sections if heading == names['summary'] and content)
+
+    lines = existing.rstrip('\n').split('\n')
+    body_start = 0
+    if lines and lines[0].strip() == '---':
+        end = next((i for i in range(1, len(lines)) if lines[i].strip() == '---'), None)
+        if end is not None:
+            body_start = end + 1
+            for i in range(1, end):
+                key, _, value = lines[i].partition(':')
+                if key.strip() in (names['tags'], 'tags'):
+                    tags = _parse_tags(value.strip())
+                    added = [tag for tag in new_tags if tag not in tags]
+                    if added:
+                        lines[i] = f"{key}: [{', '.join(tags + added)}]"
+                    break
+
+    if summary:
+        heading = f"## {names['summary']}"
+        start = next((i for i in range(body_start, len(lines)) if lines[i].strip() == heading), None)
+        if start is not None:
+            end = next((i for i in range(start + 1, len(lines)) if lines[i].startswith('## ')), len(lines))
+            while end > start + 1 and not lines[end - 1].strip():
+                end -= 1
+            lines[end:end] = ['', summary]
+
+    for heading, content in part_sections:
+        if heading in (names['summary'], names['topics']) or not (heading or content):
+            continue
+        lines.append('')
+        if heading:
+            lines.append(f"## {heading}")
+        lines.append(content)
+    return '\n'.join(lines) + '\n'
+
+
+def update_conversion(
+    input_path: str,
+    config: Dict[str, Any],
+    custom_output: Optional[str] = None,
+    quiet: bool = False,
+    stats: Optional[Dict[str, Any]] = None
+) -> Tuple[Path, str]:
+    """
+    Re-convert a source, structurizing only the turns added since last time.
+
+    The source is always re-extracted. With a conversion record whose
+    Markdown still exists and whose turns are a prefix of the new ones,
+    only the new turns are sent and the result is appended to that file
+    (see append_update).
+    Otherwise (see FULL_REASONS) the whole conversation is structurized
+    and the file is overwritten.
+
+    Args:
+        input_path: URL or file path
+        config: Configuration dict with API credentials
+        custom_output: File to update instead of the recorded output
+        quiet: Suppress progress output
+        stats: Optional dict filled with 'mode' ('incremental', 'full' or
+            'unchanged'), 'new_turns', 'total_chars', 'sent_chars' (characters
+            of conversation sent), 'context_chars' (characters of the existing
+            document sent as context) and, for 'full', 'reason' (a key of
+            FULL_REASONS)
+
+    Returns:
+        Tuple of (output path, mode)
+    """
+    stats = stats if stats is not None else {}
+    record = load_record(input_path, config)
+    # A re-shared link must not be answered from the extraction cache
+    text, source = extract_content(input_path, dict(config, cache_refresh=True), quiet=quiet)
+    language = config.get('language', 'en')
+
+    target = Path(custom_output).expanduser() if custom_output else None
+    if target is not None and not target.suffix:
+        target = target.with_suffix('.md')
+    if target is None and record is not None:
+        target = Path(record['output'])
+
+    current_turns = conversation_turns(input_path, text, config)
+    new_turns = None
+    old_turns = record.get('turns') if record is not None else None
+    if old_turns is None:
+        reason = 'no_record'
+    elif record.get('language') != language:
+        reason = 'language_changed'
+    elif target is None or not target.exists():
+        reason = 'output_missing'
+    else:
+        new_turns = find_new_turns(old_turns, current_turns)
+        reason = 'history_changed'
+
+    stats.update(total_chars=len(text), new_turns=len(new_turns or []), context_chars=0)
+    with span('update', source=source, total_chars=len(text)) as info:
+        if new_turns == []:
+            mode, output_path, markdown = 'unchanged', target, None
+        elif new_turns:
+            mode = 'incremental'
+            existing = target.read_text(encoding='utf-8')
+            tail = '\n\n'.join(turn.strip() for turn in new_turns)
+            context = build_context(existing, old_turns[-1] if old_turns else '', language)
+            part = structurize_new_turns(tail, context, config, source)
+            markdown = append_update(existing, part, language)
+            stats.update(sent_chars=len(tail), context_chars=len(context))
+            output_path = target
+        else:
+            mode = 'full'
+            markdown = structurize_content(text, config, source)
+            stats.update(sent_chars=len(text), reason=reason)
+            output_path = target
+        info.update(mode=mode, input_chars=stats.get('sent_chars', 0) + stats['context_chars'])
+
+    if markdown is not None:
+        if output_path is None:
+            output_path = save_markdown(input_path, markdown, config)
+        else:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(markdown, encoding='utf-8')
+        record_conversion(input_path, text, output_path, config, current_turns)
+
+    stats['mode'] = mode
+    return output_path, mode
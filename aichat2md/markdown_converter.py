@@ -0,0 +1,127 @@
+"""Convert conversations to Markdown locally, without an API call (--raw)."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .frontmatter import build_front_matter
+from .timings import span
+
+
+ROLE_HEADINGS = {
+    'en': {'user': 'User', 'assistant': 'Assistant'},
+    'zh': {'user': '用户', 'assistant': '助手'},
+}
+UNTITLED = {'en': 'Conversation', 'zh': '对话'}
+
+# Longest title taken from the first user message
+TITLE_MAX_CHARS = 80
+
+
+def extract_markdown_turns(input_path: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Extract a conversation as turns whose text is Markdown.
+
+    Share pages with an embedded conversation need no browser (their
+    messages are already Markdown); other URLs are rendered and converted
+    from the page HTML.
+
+    Args:
+        input_path: URL or file path
+        config: Configuration dict (fast_path, browser pool settings)
+
+    Returns:
+        List of turns in order
+
+    Raises:
+        ValueError: If the input format is unsupported
+    """
+    # Extractors are imported per input type so local files never load Playwright or requests
+    if input_path.startswith('http'):
+        if config.get('fast_path', True):
+            from .extractors.share_page_extractor import extract_turns_from_share_page
+
+            turns = extract_turns_from_share_page(input_path)
+            if turns:
+                return turns
+        from .extractors.html_extractor import html_to_turns
+        from .extractors.playwright_extractor import extract_html_from_url, get_shared_pool
+
+        return html_to_turns(extract_html_from_url(input_path, pool=get_shared_pool(config)), markdown=True)
+
+    suffix = Path(input_path).suffix.lower()
+    if suffix == '.webarchive':
+        from .extractors.webarchive_extractor import extract_turns_from_webarchive
+
+        return extract_turns_from_webarchive(input_path, markdown=True)
+    if suffix in ['.mhtml', '.mht']:
+        from .extractors.mhtml_extractor import extract_turns_from_mhtml
+
+        return extract_turns_from_mhtml(input_path, markdown=True)
+    if suffix in ['.html', '.htm', '.xhtml']:
+        from .extractors.html_extractor import extract_turns_from_html
+
+        return extract_turns_from_html(input_path, markdown=True)
+    raise ValueError(f"Unsupported file format: {input_path}. Use .webarchive, .html, .mhtml, or .mht")
+
+
+def _title(turns: List[Dict[str, Any]], language: str) -> str:
+    """First line of the first user message, else a generic title."""
+    for turn in turns:
+        if turn['role'] == 'user':
+            line = turn['text'].strip().split('\n')[0].lstrip('#>*-\\ ').strip()
+            if line and not line.startswith('```'):
+                return line if len(line) <= TITLE_MAX_CHARS else line[:TITLE_MAX_CHARS - 1].rstrip() + '…'
+    return UNTITLED.get(language, UNTITLED['en'])
+
+
+def render_markdown(
+    turns: List[Dict[str, Any]],
+    language: str = 'en',
+    source: str = '',
+    title: Optional[str] = None
+) -> str:
+    """
+    Render turns as a Markdown transcript.
+
+    The document starts with the same front matter structurize_content
+    adds, then a title and one section per speaker turn. Turns without a
+    known role are included without a heading.
+
+    Args:
+        turns: Turns with Markdown text
+        language: Output language code ('en' or 'zh')
+        source: Original source URL or filename
+        title: Document title; taken from the first user message if omitted
+
+    Returns:
+        Markdown document
+    """
+    headings = ROLE_HEADINGS.get(language, ROLE_HEADINGS['en'])
+    parts = [f"# {title or _title(turns, language)}"]
+    for turn in turns:
+        if turn['role'] in headings:
+            parts.append(f"## {headings[turn['role']]}")
+        parts.append(turn['text'])
+    return build_front_matter(language, source) + '\n\n'.join(parts) + '\n'
+
+
+def convert_to_markdown(input_path: str, config: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Convert a URL or exported file to Markdown with no API call.
+
+    The turns are rendered as extracted: boilerplate preprocessing is only
+    applied to text sent to the API, so nothing the user wrote is dropped.
+
+    Args:
+        input_path: URL or file path
+        config: Configuration dict
+
+    Returns:
+        Tuple of (markdown, source_identifier)
+    """
+    source = input_path if input_path.startswith('http') else Path(input_path).name
+    with span('convert.raw', source=source) as info:
+        turns = extract_markdown_turns(input_path, config)
+        markdown = render_markdown(turns, config.get('language', 'en'), source)
+        info['output_chars'] = len(markdown)
+    return markdown, source
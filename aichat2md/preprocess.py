@@ -0,0 +1,240 @@
+"""Strip platform UI boilerplate from extracted text before it is sent to the API."""
+
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .tokens import estimate_tokens
+
+
+# Per-platform boilerplate:
+#   lines:     UI strings removed when they make up a whole line (case-insensitive);
+#              speaker labels like "ChatGPT" are kept as turn markers
+#   controls:  short button labels ("Share", "Edit") that are also ordinary words;
+#              removed only next to other UI lines, i.e. inside a toolbar or menu,
+#              so a one-word message such as "Edit" survives
+#   patterns:  regexes removed when they match a whole line
+#   signature: text that identifies an export from this platform
+# Extra lines, controls and patterns can be added per platform via the
+# "boilerplate" key in config.json.
+BOILERPLATE_PROFILES = {
+    'chatgpt': {
+        'lines': [
+            'Open sidebar', 'No file chosen', 'Report conversation', 'Is this conversation helpful so far?',
+            'Get smarter responses, upload files and images, and more.',
+            'ChatGPT can make mistakes. Check important info.',
+            'ChatGPT can make mistakes. Check important info. See Cookie Preferences.',
+        ],
+        'controls': ['Attach', 'Search', 'Voice', 'Reason'],
+        'patterns': [
+            r"This conversation may reflect the link creator.s personalized data.*",
+            r"By messaging ChatGPT, you agree to our Terms.*",
+            r"Shared conversation.*",
+        ],
+        'signature': 'ChatGPT can make mistakes',
+    },
+    'gemini': {
+        'lines': [
+            'Show drafts', 'Export to Docs', 'Draft an email', 'Opens in a new window',
+            'volume_up', 'content_copy', 'more_vert', 'thumb_up', 'thumb_down',
+            'expand_more', 'expand_less', 'Created with Gemini',
+            'Google Privacy Policy Opens in a new window',
+            'Google Terms of Service Opens in a new window',
+            'Your privacy & Gemini Apps Opens in a new window',
+        ],
+        'controls': ['share', 'edit', 'refresh'],
+        'patterns': [
+            r"Gemini may display inaccurate info.*",
+            r"Published \w+ \d{1,2}, \d{4}.*",
+        ],
+        'signature': 'Gemini may display inaccurate info',
+    },
+    'doubao': {
+        'lines': ['下载电脑版', '打开豆包', '继续对话'],
+        'controls': ['登录', '复制', '分享', '重新生成', '编辑', '新对话', '朗读', '点赞', '点踩', '更多'],
+        'patterns': [
+            r"内容由\s*(豆包\s*)?AI\s*生成.*",
+            r"由豆包\s*AI\s*生成.*",
+        ],
+        'signature': '豆包',
+    },
+    'claude': {
+        'lines': [
+            'Start your own conversation',
+            'Claude can make mistakes. Please double-check responses.',
+            'Claude can make mistakes. Please double-check cited sources.',
+        ],
+        'controls': ['Retry', 'Report'],
+        'patterns': [
+            r"This is a copy of a chat between Claude and .*",
+            r"Content may include unverified or unsafe content.*",
+            r"Shared snapshot may contain attachments.*",
+        ],
+        'signature': 'Claude can make mistakes',
+    },
+    'default': {
+        'lines': ['Copy code', 'Skip to content', 'Terms of use', 'Privacy policy', 'Cookie preferences'],
+        'controls': ['Copy', 'Copied!', 'Share', 'Edit', 'Log in', 'Sign up', 'Sign in'],
+        'patterns': [],
+        'signature': None,
+    },
+}
+
+PLATFORM_HOSTS = {
+    'chatgpt': ('chatgpt.com', 'chat.openai.com'),
+    'gemini': ('gemini.google.com', 'g.co'),
+    'doubao': ('doubao.com',),
+    'claude': ('claude.ai',),
+}
+
+# Consecutive repeats of lines at least this long are collapsed
+MIN_DUPLICATE_LENGTH = 4
+
+
+def detect_platform(text: str, source: str = "") -> str:
+    """
+    Detect which platform an export came from.
+
+    Args:
+        text: Extracted text
+        source: Original source URL or filename
+
+    Returns:
+        Platform name, or 'default' if unknown
+    """
+    if source.startswith('http'):
+        host = urlsplit(source).netloc.lower()
+        for platform, hosts in PLATFORM_HOSTS.items():
+            if any(host == h or host.endswith('.' + h) for h in hosts):
+                return platform
+
+    for platform, profile in BOILERPLATE_PROFILES.items():
+        if profile['signature'] and profile['signature'] in text:
+            return platform
+    return 'default'
+
+
+def _compile_filters(platform: str, overrides: Optional[Dict[str, Any]] = None):
+    """Build (line set, control set, combined pattern) for platform plus the default profile."""
+    lines = set()
+    controls = set()
+    patterns: List[str] = []
+    names = ['default'] if platform == 'default' else ['default', platform]
+    for name in names:
+        profile = BOILERPLATE_PROFILES.get(name, {})
+        extra = (overrides or {}).get(name, {})
+        lines.update(line.casefold() for line in profile.get('lines', []) + extra.get('lines', []))
+        controls.update(line.casefold() for line in profile.get('controls', []) + extra.get('controls', []))
+        patterns.extend(profile.get('patterns', []) + extra.get('patterns', []))
+    combined = re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE) if patterns else None
+    return lines, controls, combined
+
+
+def _classify(lines: List[str], ui_lines, controls, pattern) -> List[Optional[str]]:
+    """
+    Label each line 'ui', 'control', 'text' or None (blank).
+
+    Fence delimiters and fenced code count as text. A control keeps its
+    label only when the nearest non-blank line before or after it is UI
+    too; otherwise it is part of the conversation and becomes text.
+    """
+    kinds: List[Optional[str]] = []
+    in_fence = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_fence = not in_fence
+            kinds.append('text')
+        elif in_fence:
+            kinds.append('text')
+        elif not stripped:
+            kinds.append(None)
+        elif stripped.casefold() in ui_lines or (pattern and pattern.fullmatch(stripped)):
+            kinds.append('ui')
+        elif stripped.casefold() in controls:
+            kinds.append('control')
+        else:
+            kinds.append('text')
+
+    def neighbour(i: int, step: int) -> Optional[str]:
+        i += step
+        while 0 <= i < len(kinds) and kinds[i] is None:
+            i += step
+        return kinds[i] if 0 <= i < len(kinds) else None
+
+    chrome = ('ui', 'control')
+    return [
+        'text' if kind == 'control' and neighbour(i, -1) not in chrome and neighbour(i, 1) not in chrome else kind
+        for i, kind in enumerate(kinds)
+    ]
+
+
+def preprocess_text(
+    text: str,
+    source: str = "",
+    config: Optional[Dict[str, Any]] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Remove UI boilerplate and redundant whitespace from extracted text.
+
+    Drops lines that are platform UI strings or disclaimers (short button
+    labels only where they sit among other UI lines), collapses
+    consecutive duplicate lines and runs of blank lines, and strips
+    trailing whitespace. Leading indentation and everything inside ```
+    fences is left untouched.
+
+    Args:
+        text: Extracted conversation text
+        source: Original source URL or filename
+        config: Configuration dict (boilerplate overrides)
+        stats: Optional dict filled with 'platform', 'chars_before',
+            'chars_after', 'lines_removed' and 'tokens_saved'
+
+    Returns:
+        Cleaned text
+    """
+    platform = detect_platform(text, source)
+    ui_lines, controls, pattern = _compile_filters(platform, (config or {}).get('boilerplate'))
+    lines = text.split('\n')
+    kinds = _classify(lines, ui_lines, controls, pattern)
+
+    kept: List[str] = []
+    removed = 0
+    in_fence = False
+    previous = None
+
+    for line, kind in zip(lines, kinds):
+        stripped = line.strip()
+
+        if stripped.startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence:
+            line = line.rstrip()
+            if kind in ('ui', 'control'):
+                removed += 1
+                continue
+            if not stripped:
+                if kept and not kept[-1]:
+                    continue
+            elif (
+                line == previous and len(stripped) >= MIN_DUPLICATE_LENGTH
+                and not line[0].isspace()
+            ):
+                removed += 1
+                continue
+
+        kept.append(line)
+        if stripped:
+            previous = line
+
+    cleaned = '\n'.join(kept).strip('\n')
+
+    if stats is not None:
+        stats['platform'] = platform
+        stats['chars_before'] = len(text)
+        stats['chars_after'] = len(cleaned)
+        stats['lines_removed'] = removed
+        stats['tokens_saved'] = max(0, estimate_tokens(text) - estimate_tokens(cleaned))
+
+    return cleaned
@@ -0,0 +1,150 @@
+"""Per-provider request and token budgets for API calls."""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .config import API_PRESETS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a fixed rate.
+
+    acquire() reserves its amount immediately, even if that drives the level
+    negative, and returns how long the caller must wait before sending. That
+    makes concurrent callers queue up in arrival order instead of polling,
+    and lets the same bucket serve both threads and coroutines.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take amount from the bucket.
+
+        Args:
+            amount: Units to consume (requests or tokens)
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.refill_per_second)
+            self._updated = now
+            self._level -= amount
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.refill_per_second
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budget for one provider.
+
+    Either limit may be None to leave it unenforced.
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.waited = 0.0
+        self._requests = TokenBucket(rpm, rpm / 60) if rpm else None
+        self._tokens = TokenBucket(tpm, tpm / 60) if tpm else None
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(tokens))
+        if delay:
+            with self._lock:
+                self.waited += delay
+        return delay
+
+    def acquire(self, tokens: int):
+        """
+        Block until one request of the given token cost fits the budget.
+
+        Args:
+            tokens: Estimated tokens for the request (prompt plus max_tokens)
+        """
+        delay = self._reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int):
+        """Async version of acquire() that yields to the event loop while waiting."""
+        # Only imported here: the CLI never runs an event loop for API calls
+        import asyncio
+
+        delay = self._reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _normalize_base_url(url: str) -> str:
+    url = (url or '').rstrip('/')
+    return url[:-3] if url.endswith('/v1') else url
+
+
+def detect_provider(config: Dict[str, Any]) -> str:
+    """
+    Match the configured API base URL against API_PRESETS.
+
+    Returns:
+        Preset name, or 'custom' for unknown endpoints
+    """
+    base_url = _normalize_base_url(config.get('api_base_url', ''))
+    for name, preset in API_PRESETS.items():
+        if preset['api_base_url'] and _normalize_base_url(preset['api_base_url']) == base_url:
+            return name
+    return 'custom'
+
+
+def get_rate_limits(config: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Resolve (rpm, tpm) for the configured provider.
+
+    Defaults come from API_PRESETS and can be overridden per provider with
+    config['rate_limits'], e.g. {"openai": {"rpm": 5000, "tpm": 2000000}}.
+    """
+    provider = detect_provider(config)
+    limits = {
+        'rpm': API_PRESETS[provider].get('rpm'),
+        'tpm': API_PRESETS[provider].get('tpm'),
+    }
+    limits.update((config.get('rate_limits') or {}).get(provider, {}))
+    return limits['rpm'], limits['tpm']
+
+
+_limiters: Dict[Tuple[str, Optional[int], Optional[int]], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config: Dict[str, Any]) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for the configured provider.
+
+    All threads and coroutines calling the same endpoint share one budget.
+
+    Args:
+        config: Configuration dict (api_base_url, rate_limits)
+
+    Returns:
+        Shared RateLimiter
+    """
+    rpm, tpm = get_rate_limits(config)
+    key = (_normalize_base_url(config.get('api_base_url', '')), rpm, tpm)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rpm, tpm)
+        return _limiters[key]
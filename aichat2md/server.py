@@ -0,0 +1,443 @@
+"""Local conversion daemon (aichat2md serve) and the client the CLI uses to reach it.
+
+The daemon keeps the loaded config, prompt files, the pooled API session
+and a warm Chromium across jobs. It listens on localhost only and writes
+its address and a random access token to STATE_FILE (readable only by the
+user); every request but /health must carry that token.
+
+Endpoints (JSON in and out):
+    GET  /health      daemon version, pid and job counts
+    POST /jobs        {"input": URL or absolute path, "options": {config
+                      overrides}, "wait": bool}; uploads send "filename" and
+                      "content_base64" instead of "input". Returns the job,
+                      finished if wait is true.
+    GET  /jobs/<id>   job status, with markdown once done
+
+A job is {id, status ('queued', 'running', 'done' or 'failed'), input,
+source, markdown, text (the extracted text that was structurized; None for
+raw jobs), error, error_type, seconds}.
+"""
+
+import argparse
+import base64
+import json
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import __version__
+from .config import CONFIG_DIR, load_config
+
+
+STATE_FILE = CONFIG_DIR / "serve.json"
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Config keys a job may override (the CLI's per-run flags)
+JOB_OPTIONS = {'language', 'model', 'raw', 'cache', 'cache_refresh', 'preprocess', 'code_passthrough'}
+
+# Finished jobs kept for GET /jobs/<id>; older ones are dropped
+MAX_FINISHED_JOBS = 200
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+# How long the CLI waits for /health before running the job itself
+HEALTH_TIMEOUT_SECONDS = 0.5
+
+# Errors re-raised with the same type by the client, so the CLI reports them as usual
+CLIENT_ERRORS = {'FileNotFoundError': FileNotFoundError, 'ValueError': ValueError, 'TimeoutError': TimeoutError}
+
+
+class ConversionServer:
+    """
+    HTTP daemon that runs conversion jobs on a thread pool.
+
+    Args:
+        config: Configuration dict shared by all jobs
+        host: Interface to bind (localhost by default)
+        port: Port to bind; 0 picks a free one
+        workers: Maximum concurrent jobs
+        state_file: Where to publish the address and token for clients
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 4,
+        state_file: Path = STATE_FILE
+    ):
+        from http.server import ThreadingHTTPServer
+        import secrets
+
+        self.config = config
+        self.token = secrets.token_urlsafe(32)
+        self.state_file = Path(state_file)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
+        self._finished = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='aichat2md-job')
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def warm(self, browser: bool = True):
+        """Load prompts, open the API session and (optionally) launch Chromium now."""
+        from .structurizer import get_client, load_system_prompt
+
+        for language in ('en', 'zh'):
+            load_system_prompt(language)
+        get_client(self.config)
+        if browser:
+            from .extractors.playwright_extractor import get_shared_pool
+
+            try:
+                get_shared_pool(self.config).start()
+            except Exception as e:
+                # Share pages and local files still work; URL jobs retry the launch
+                print(f"⚠️  Browser not started: {e}")
+
+    def submit(
+        self,
+        input_path: str,
+        options: Optional[Dict[str, Any]] = None,
+        upload: Optional[Tuple[str, bytes]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue a conversion job.
+
+        Args:
+            input_path: URL or absolute file path (ignored for uploads)
+            options: Config overrides; keys outside JOB_OPTIONS are rejected
+            upload: (filename, content) of an uploaded export
+
+        Returns:
+            The job dict (still queued)
+
+        Raises:
+            ValueError: If an option or upload is invalid
+        """
+        options = options or {}
+        unknown = set(options) - JOB_OPTIONS
+        if unknown:
+            raise ValueError(f"Unsupported job options: {', '.join(sorted(unknown))}")
+
+        upload_dir = None
+        if upload is not None:
+            from .cli import SUPPORTED_SUFFIXES
+
+            filename = Path(upload[0]).name
+            if Path(filename).suffix.lower() not in SUPPORTED_SUFFIXES:
+                raise ValueError(f"Unsupported file format: {filename}")
+            upload_dir = tempfile.mkdtemp(prefix='aichat2md-upload-')
+            input_path = str(Path(upload_dir) / filename)
+            Path(input_path).write_bytes(upload[1])
+        elif not input_path.startswith('http') and not Path(input_path).is_absolute():
+            raise ValueError("File inputs must be absolute paths")
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'input': upload[0] if upload is not None else input_path,
+            'source': None,
+            'markdown': None,
+            'text': None,
+            'error': None,
+            'error_type': None,
+            'seconds': None,
+        }
+        with self._jobs_lock:
+            self.jobs[job['id']] = job
+        job['future'] = self._executor.submit(self._run_job, job, input_path, options, upload_dir)
+        return job
+
+    def _run_job(self, job: Dict[str, Any], input_path: str, options: Dict[str, Any], upload_dir: Optional[str]):
+        from .cli import extract_content
+
+        config = dict(self.config, **options)
+        job['status'] = 'running'
+        start = time.time()
+        try:
+            if config.get('raw'):
+                from .markdown_converter import convert_to_markdown
+
+                markdown, source = convert_to_markdown(input_path, config)
+            else:
+                from .structurizer import structurize_content
+
+                if not config.get('api_key'):
+                    raise ValueError("API key not configured. Please run: aichat2md --setup")
+                raw_text, source = extract_content(input_path, config, quiet=True)
+                markdown = structurize_content(raw_text, config, source)
+                # The client saves the file, so it records the conversion for --update
+                job['text'] = raw_text
+            job.update(status='done', source=source, markdown=markdown)
+        except Exception as e:
+            job.update(status='failed', error=str(e) or e.__class__.__name__, error_type=e.__class__.__name__)
+        finally:
+            job['seconds'] = round(time.time() - start, 2)
+            if upload_dir is not None:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+            self._forget_old_jobs(job['id'])
+
+    def _forget_old_jobs(self, job_id: str):
+        with self._jobs_lock:
+            self._finished.append(job_id)
+            while len(self._finished) > MAX_FINISHED_JOBS:
+                self.jobs.pop(self._finished.pop(0), None)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def health(self) -> Dict[str, Any]:
+        with self._jobs_lock:
+            statuses = [job['status'] for job in self.jobs.values()]
+        return {
+            'status': 'ok',
+            'version': __version__,
+            'pid': os.getpid(),
+            'jobs': {status: statuses.count(status) for status in ('queued', 'running', 'done', 'failed')},
+        }
+
+    def write_state(self):
+        """Publish address, pid and token for clients (mode 600)."""
+        host, port = self.address
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.state_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'host': host, 'port': port, 'pid': os.getpid(), 'token': self.token}, f)
+
+    def serve_forever(self):
+        """Serve until shutdown() or SIGTERM/Ctrl-C, then clean up."""
+        self.write_state()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stop serve_forever (call from another thread)."""
+        self.httpd.shutdown()
+
+    def close(self):
+        self.httpd.server_close()
+        self._executor.shutdown(wait=False)
+        try:
+            state = json.loads(self.state_file.read_text(encoding='utf-8'))
+            if state.get('pid') == os.getpid() and state.get('port') == self.address[1]:
+                self.state_file.unlink()
+        except (OSError, ValueError):
+            pass
+
+
+def _public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in job.items() if key != 'future'}
+
+
+def _make_handler(server: ConversionServer):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = f'aichat2md/{__version__}'
+
+        def _send(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            import hmac
+
+            expected = f'Bearer {server.token}'
+            if hmac.compare_digest(self.headers.get('Authorization', ''), expected):
+                return True
+            self._send(401, {'error': 'Missing or invalid token'})
+            return False
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, server.health())
+                return
+            if not self._authorized():
+                return
+            if self.path.startswith('/jobs/'):
+                job = server.get_job(self.path[len('/jobs/'):])
+                if job is None:
+                    self._send(404, {'error': 'Unknown job'})
+                else:
+                    self._send(200, _public_job(job))
+                return
+            self._send(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            if self.path != '/jobs':
+                self._send(404, {'error': 'Not found'})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_UPLOAD_BYTES * 4 // 3 + 4096:
+                self._send(413, {'error': 'Request too large'})
+                return
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(body, dict):
+                    raise ValueError("Job must be a JSON object")
+                upload = None
+                if 'content_base64' in body:
+                    upload = (body.get('filename') or 'upload.html', base64.b64decode(body['content_base64']))
+                elif not body.get('input'):
+                    raise ValueError("Job needs 'input' or 'content_base64'")
+                job = server.submit(body.get('input', ''), body.get('options'), upload)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            if body.get('wait'):
+                job['future'].result()
+            self._send(200 if job['status'] in ('done', 'failed') else 202, _public_job(job))
+
+        def log_message(self, format, *args):
+            # One line per request, without the default timestamp noise
+            print(f"{self.command} {self.path} → {args[1] if len(args) > 1 else ''}")
+
+    return Handler
+
+
+def read_state(state_file: Path = STATE_FILE) -> Optional[Dict[str, Any]]:
+    """Read the running daemon's address and token, or None."""
+    try:
+        return json.loads(Path(state_file).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _request(daemon: Dict[str, Any], method: str, path: str, body: Optional[Dict[str, Any]] = None,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send a JSON request to the daemon and decode the JSON reply."""
+    import urllib.error
+    import urllib.request
+
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = urllib.request.Request(
+        f"http://{daemon['host']}:{daemon['port']}{path}",
+        data=data,
+        method=method,
+        headers={'Authorization': f"Bearer {daemon.get('token', '')}", 'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get('error')
+        except ValueError:
+            message = None
+        raise RuntimeError(f"Daemon request failed: {e.code} {message or e.reason}") from e
+
+
+def find_daemon(state_file: Path = STATE_FILE) -> Optional[Dict[str, Any]]:
+    """
+    Find a running daemon.
+
+    Costs one stat() when none was started; a stale state file (daemon
+    killed) is detected by the /health check.
+
+    Returns:
+        Daemon state (host, port, pid, token), or None
+    """
+    if not Path(state_file).exists():
+        return None
+    daemon = read_state(state_file)
+    if not daemon or not daemon.get('port'):
+        return None
+    try:
+        _request(daemon, 'GET', '/health', timeout=HEALTH_TIMEOUT_SECONDS)
+    except Exception:
+        return None
+    return daemon
+
+
+def convert_with_daemon(
+    daemon: Dict[str, Any],
+    input_path: str,
+    options: Optional[Dict[str, Any]] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> Tuple[str, str]:
+    """
+    Run a conversion on the daemon and wait for it.
+
+    Args:
+        daemon: Daemon state from find_daemon
+        input_path: URL or file path (made absolute, the daemon reads it directly)
+        options: Config overrides (see JOB_OPTIONS)
+        stats: Optional dict filled with 'text' (the extracted text that was
+            structurized, None for raw jobs) and 'seconds'
+
+    Returns:
+        Tuple of (markdown, source_identifier)
+
+    Raises:
+        FileNotFoundError, ValueError, TimeoutError: As raised by the job
+        RuntimeError: For other job failures or daemon errors
+    """
+    if not input_path.startswith('http'):
+        input_path = str(Path(input_path).expanduser().resolve())
+    job = _request(daemon, 'POST', '/jobs', {'input': input_path, 'options': options or {}, 'wait': True})
+    if job['status'] != 'done':
+        raise CLIENT_ERRORS.get(job.get('error_type'), RuntimeError)(job.get('error') or 'Daemon job failed')
+    if stats is not None:
+        stats.update(text=job.get('text'), seconds=job.get('seconds'))
+    return job['markdown'], job['source']
+
+
+def serve_main(argv=None):
+    """Entry point for `aichat2md serve`."""
+    parser = argparse.ArgumentParser(
+        prog='aichat2md serve',
+        description='Run a local daemon that keeps the browser, API session and config warm'
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Interface to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, default=4, metavar='N', help='Concurrent jobs (default: 4)')
+    parser.add_argument('--no-browser', action='store_true', help='Launch Chromium on the first URL job instead of now')
+    args = parser.parse_args(argv)
+
+    running = find_daemon()
+    if running is not None:
+        print(f"✗ A daemon is already running (pid {running.get('pid')}, port {running['port']})")
+        raise SystemExit(1)
+
+    config = load_config(require_api_key=False)
+    server = ConversionServer(config, args.host, args.port, args.workers)
+    server.warm(browser=not args.no_browser)
+
+    # SIGTERM stops the server like Ctrl-C; shutdown() must not run on the serving thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+
+    host, port = server.address
+    print(f"✓ aichat2md {__version__} serving on http://{host}:{port} (pid {os.getpid()})")
+    print(f"  Token in {server.state_file}; aichat2md commands now use this daemon")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        from .extractors.playwright_extractor import get_shared_pool
+
+        get_shared_pool(config).close()
+        print("✓ Daemon stopped")
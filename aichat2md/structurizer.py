@@ -1,14 +1,214 @@
 """AI structurization using OpenAI-compatible APIs."""
 
+import asyncio
+import json
+import random
+import threading
+import time
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
 
+from .cache import get_response_cache, response_cache_key
+from .chunking import split_into_chunks, merge_chunk_markdown
+from .codeblocks import (
+    PLACEHOLDER_INSTRUCTIONS, CodeBlockRestorer, has_placeholders, protect_code_blocks, restore_code_blocks
+)
+from .frontmatter import build_front_matter
+from .rate_limit import get_rate_limiter, get_rate_limits
+from .timings import bind, span
+from .tokens import choose_max_tokens, count_tokens, request_timeout
 
+
+# Instruction appended to the system prompt for each chunk of a long conversation
+CHUNK_INSTRUCTIONS = {
+    'en': "\n\nThis input is part {index} of {total} of one long conversation. "
+          "Structure only this part, following the same output format.",
+    'zh': "\n\n本次输入是一段长对话的第 {index}/{total} 部分。"
+          "只整理这一部分，并遵循相同的输出格式。"
+}
+
+
+# Instruction appended to the system prompt when only new turns are sent (--update)
+UPDATE_INSTRUCTIONS = {
+    'en': "\n\nThis input contains only the newest turns of a conversation whose earlier part "
+          "has already been structured. Structure only these new turns, following the same output "
+          "format, and do not repeat what the existing document already covers. "
+          "The existing document, for context:\n\n{context}",
+    'zh': "\n\n本次输入只包含一段对话中新增的轮次，之前的部分已经整理成文档。"
+          "只整理这些新增轮次，遵循相同的输出格式，不要重复现有文档已有的内容。"
+          "现有文档的上下文：\n\n{context}"
+}
+
+
+# Status codes worth retrying: rate limits and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Pooled connections of the shared session, and so the most requests in flight
+API_POOL_SIZE = 16
+
+
+class LLMClient:
+    """
+    Reusable HTTP client for OpenAI-compatible APIs.
+
+    Holds a pooled keep-alive requests.Session, so repeated calls skip the
+    TCP and TLS handshake. 429, 5xx and connection errors are retried with
+    jittered exponential backoff; a Retry-After header takes precedence over
+    the computed delay. Retrying stops after max_retries attempts or once
+    max_retry_seconds of waiting would be exceeded, and the last response
+    (or error) is returned to the caller.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        max_retry_seconds: float = 120.0,
+        pool_size: int = API_POOL_SIZE
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_seconds = max_retry_seconds
+        self.retries = 0
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        """Parse a Retry-After header (seconds or HTTP date)."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        POST with retries.
+
+        Args:
+            url: Endpoint URL
+            **kwargs: Passed to requests.Session.post (headers, json, timeout, stream)
+
+        Returns:
+            The first non-retryable response, or the last one once retries
+            are exhausted
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt fails
+                without a response (read timeouts are never retried)
+        """
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, **kwargs)
+            except requests.exceptions.ConnectionError:
+                delay = self._backoff(attempt)
+                if attempt >= self.max_retries or waited + delay > self.max_retry_seconds:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if attempt >= self.max_retries or waited + delay > self.max_retry_seconds:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            waited += delay
+            attempt += 1
+            self.retries += 1
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+_api_executor: Optional[ThreadPoolExecutor] = None
+_api_executor_lock = threading.Lock()
+
+
+def get_client(config: Optional[Dict[str, Any]] = None) -> LLMClient:
+    """
+    Get the process-wide API client, creating it on first use.
+
+    Args:
+        config: Configuration dict (api_max_retries, api_retry_max_seconds;
+            only used when creating the client)
+
+    Returns:
+        Shared LLMClient
+    """
+    global _client
+    config = config or {}
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(
+                max_retries=config.get('api_max_retries', 5),
+                max_retry_seconds=config.get('api_retry_max_seconds', 120)
+            )
+        return _client
+
+
+def get_api_executor(config: Optional[Dict[str, Any]] = None) -> ThreadPoolExecutor:
+    """
+    Get the threads that send API requests for the async functions.
+
+    The pooled session is synchronous, so coroutines hand each request to
+    this executor once the rate limiter lets them go. It has one thread per
+    pooled connection, capped at the provider's requests-per-minute limit,
+    so awaited requests neither wait on the event loop's default executor
+    nor open connections the session can't reuse.
+
+    Args:
+        config: Configuration dict (only used when creating the executor)
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    global _api_executor
+    with _api_executor_lock:
+        if _api_executor is None:
+            rpm, _ = get_rate_limits(config or {})
+            _api_executor = ThreadPoolExecutor(
+                max_workers=min(API_POOL_SIZE, rpm) if rpm else API_POOL_SIZE,
+                thread_name_prefix='aichat2md-api'
+            )
+        return _api_executor
+
+
+@lru_cache(maxsize=None)
 def load_system_prompt(language: str) -> str:
     """
-    Load system prompt for the specified language.
+    Load system prompt for the specified language (read once per process).
 
     Args:
         language: Language code ('en' or 'zh')
@@ -27,118 +227,602 @@ def load_system_prompt(language: str) -> str:
     return prompt_file.read_text(encoding='utf-8')
 
 
-def structurize_content(
-    raw_text: str,
-    config: Dict[str, Any],
-    source: str = ""
-) -> str:
-    """
-    Structurize raw text into Markdown using OpenAI-compatible API.
-
-    Args:
-        raw_text: Raw extracted text from AI conversation
-        config: Configuration dict with API credentials
-        source: Original source URL or filename
+def _get_api_url(config: Dict[str, Any]) -> str:
+    """Construct API URL (ensure /v1/chat/completions endpoint)."""
+    api_base = config["api_base_url"].rstrip('/')
+    if not api_base.endswith('/v1'):
+        return f"{api_base}/v1/chat/completions"
+    return f"{api_base}/chat/completions"
 
-    Returns:
-        Structured Markdown content
 
-    Raises:
-        requests.exceptions.HTTPError: If API call fails
-        ValueError: If response is invalid
-    """
-    # Load system prompt based on language
-    language = config.get("language", "en")
+def _build_system_prompt(language: str, source: str, placeholders: bool = False) -> str:
+    """Load system prompt and append source info and placeholder rules if needed."""
     system_prompt = load_system_prompt(language)
 
-    # Append source info to prompt if available
     if source:
         if language == "zh":
             system_prompt += f"\n\n原始来源: {source}"
         else:
             system_prompt += f"\n\nOriginal source: {source}"
 
-    # Construct API URL (ensure /v1/chat/completions endpoint)
-    api_base = config["api_base_url"].rstrip('/')
-    if not api_base.endswith('/v1'):
-        api_url = f"{api_base}/v1/chat/completions"
-    else:
-        api_url = f"{api_base}/chat/completions"
+    if placeholders:
+        system_prompt += PLACEHOLDER_INSTRUCTIONS.get(language, PLACEHOLDER_INSTRUCTIONS['en'])
+
+    return system_prompt
+
+
+def _protect_code(raw_text: str, config: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Swap long code blocks for placeholders unless code_passthrough is off."""
+    if not config.get('code_passthrough', True):
+        return raw_text, []
+    return protect_code_blocks(raw_text, config.get('code_passthrough_min_chars', 200))
+
+
+def _build_request(raw_text: str, system_prompt: str, config: Dict[str, Any]):
+    """Build (api_url, headers, payload) for a /chat/completions request."""
+    api_url = _get_api_url(config)
 
     headers = {
         'Authorization': f'Bearer {config["api_key"]}',
         'Content-Type': 'application/json'
     }
 
+    model = config.get('model', 'deepseek-chat')
     payload = {
-        'model': config.get('model', 'deepseek-chat'),
+        'model': model,
         'messages': [
             {'role': 'system', 'content': system_prompt},
             {'role': 'user', 'content': raw_text}
         ],
-        'max_tokens': config.get('max_tokens', 4000),
+        'max_tokens': choose_max_tokens(count_tokens(raw_text, model), config),
         'temperature': config.get('temperature', 0.7)
     }
 
-    try:
-        # Dynamic timeout based on content size: 60s base + 1s per 100 chars, max 600s
-        estimated_timeout = min(60 + len(raw_text) // 100, 600)
-        response = requests.post(api_url, headers=headers, json=payload, timeout=estimated_timeout)
-        response.raise_for_status()
+    return api_url, headers, payload
+
+
+def _translate_request_error(e: requests.exceptions.RequestException) -> Exception:
+    """Map a requests exception to the error reported to users."""
+    if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+        if e.response.status_code == 401:
+            return requests.exceptions.HTTPError(
+                "API authentication failed. Check your API key"
+            )
+        elif e.response.status_code == 429:
+            return requests.exceptions.HTTPError(
+                "Rate limit exceeded after retrying. Please wait and try again"
+            )
+        error_msg = f"API request failed: {e.response.status_code}"
+        try:
+            error_detail = e.response.json()
+            error_msg += f" - {error_detail}"
+        except:
+            error_msg += f" - {e.response.text[:200]}"
+        return requests.exceptions.HTTPError(error_msg)
+
+    if isinstance(e, requests.exceptions.Timeout):
+        return TimeoutError(
+            "API request timed out. The conversation might be too long"
+        )
+
+    return RuntimeError(f"Network error: {e}")
+
+
+def _cache_lookup(config: Dict[str, Any], api_url: str, payload: Dict[str, Any], stats: Optional[Dict[str, Any]]):
+    """Look up a response; returns (cache, key, cached markdown or None)."""
+    cache = get_response_cache(config)
+    cache_key = response_cache_key(api_url, payload) if cache is not None else None
+    markdown = None
+    if cache is not None and not config.get('cache_refresh'):
+        with span('cache.lookup') as info:
+            markdown = cache.get(cache_key)
+            info['hit'] = markdown is not None
+    if stats is not None:
+        stats['cache_hit'] = markdown is not None
+    return cache, cache_key, markdown
+
+
+def _cache_store(cache, cache_key: str, markdown: str):
+    """Store a response, ignoring cache directory errors."""
+    if cache is not None:
+        try:
+            cache.put(cache_key, markdown)
+        except OSError:
+            # A read-only or full cache directory must not fail the conversion
+            pass
+
+
+def _prompt_tokens(payload: Dict[str, Any]) -> int:
+    """Count the tokens in a request's messages."""
+    prompt = ''.join(message['content'] for message in payload['messages'])
+    return count_tokens(prompt, payload.get('model'))
+
+
+def _request_tokens(payload: Dict[str, Any]) -> int:
+    """Estimate tokens a request counts against TPM limits (prompt plus max_tokens)."""
+    return _prompt_tokens(payload) + payload.get('max_tokens', 0)
+
+
+def _record_usage(info: Dict[str, Any], usage: Optional[Dict[str, Any]]):
+    """Copy the API's token usage into a timing span."""
+    for key in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+        if usage and usage.get(key) is not None:
+            info[key] = usage[key]
+
+
+def _acquire_rate_limit(config: Dict[str, Any], payload: Dict[str, Any]):
+    """Block until the provider's rate limit budget allows the request."""
+    with span('api.rate_limit_wait'):
+        get_rate_limiter(config).acquire(_request_tokens(payload))
+
+
+def _send_completion(api_url: str, headers: Dict[str, str], payload: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """
+    POST a /chat/completions request and return the message content.
+
+    Raises:
+        requests.exceptions.HTTPError: If API call fails
+        ValueError: If response is invalid
+    """
+    with span('api.request', max_tokens=payload['max_tokens']) as info:
+        try:
+            # Long enough to generate max_tokens at the provider's output rate
+            timeout = request_timeout(_prompt_tokens(payload), payload['max_tokens'], config)
+            response = get_client(config).post(api_url, headers=headers, json=payload, timeout=timeout)
+            response.raise_for_status()
+
+            result = response.json()
+
+        except requests.exceptions.RequestException as e:
+            raise _translate_request_error(e) from e
+
+        _record_usage(info, result.get('usage'))
+
+    if 'choices' not in result or len(result['choices']) == 0:
+        raise ValueError("Invalid API response: missing choices")
+
+    return result['choices'][0]['message']['content']
+
+
+def _request_completion(
+    raw_text: str,
+    system_prompt: str,
+    config: Dict[str, Any],
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Send one /chat/completions request, answering from the response cache when possible.
+
+    Blocks until the provider's rate limit budget allows the request.
+
+    Returns:
+        Message content from the API
+
+    Raises:
+        requests.exceptions.HTTPError: If API call fails
+        ValueError: If response is invalid
+    """
+    api_url, headers, payload = _build_request(raw_text, system_prompt, config)
+
+    cache, cache_key, markdown = _cache_lookup(config, api_url, payload, stats)
+    if markdown is not None:
+        return markdown
+
+    _acquire_rate_limit(config, payload)
+    markdown = _send_completion(api_url, headers, payload, config)
+
+    _cache_store(cache, cache_key, markdown)
+
+    return markdown
+
+
+async def _arequest_completion(
+    raw_text: str,
+    system_prompt: str,
+    config: Dict[str, Any],
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """Async version of _request_completion; waits for the rate limit without blocking the loop."""
+    api_url, headers, payload = _build_request(raw_text, system_prompt, config)
+
+    cache, cache_key, markdown = _cache_lookup(config, api_url, payload, stats)
+    if markdown is not None:
+        return markdown
+
+    with span('api.rate_limit_wait'):
+        await get_rate_limiter(config).acquire_async(_request_tokens(payload))
+    # The pooled session is synchronous; run it on the API threads
+    loop = asyncio.get_running_loop()
+    markdown = await loop.run_in_executor(
+        get_api_executor(config), bind(_send_completion), api_url, headers, payload, config
+    )
+
+    _cache_store(cache, cache_key, markdown)
+
+    return markdown
 
-        result = response.json()
 
-        if 'choices' not in result or len(result['choices']) == 0:
-            raise ValueError("Invalid API response: missing choices")
+def _iter_sse_content(response) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Parse server-sent events from a streaming completion.
+
+    Yields:
+        (content delta, usage dict or None) per event
+    """
+    # chunk_size=None yields data as soon as it arrives instead of buffering 512 bytes
+    for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        delta = ''
+        choices = event.get('choices') or []
+        if choices:
+            delta = (choices[0].get('delta') or {}).get('content') or ''
+        yield delta, event.get('usage')
+
+
+def stream_structurize(
+    raw_text: str,
+    config: Dict[str, Any],
+    out: TextIO,
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Structurize with a streaming request, writing Markdown to out as it arrives.
+
+    Whatever was received before an error or timeout has already been
+    written to out. Front matter is prepended if the model doesn't produce
+    it, and code block placeholders are replaced as their lines complete.
+    Long input that needs chunking is structurized normally and written in
+    one piece.
+
+    Args:
+        raw_text: Raw extracted text from AI conversation
+        config: Configuration dict with API credentials
+        out: Text stream to write to (flushed after every delta)
+        source: Original source URL or filename
+        stats: Optional dict filled with 'cache_hit', 'ttft' (seconds),
+            'output_tokens' (the provider's usage count when it reports one,
+            else counted with count_tokens) and 'tokens_per_second'
+
+    Returns:
+        Complete structured Markdown content
 
-        markdown = result['choices'][0]['message']['content']
+    Raises:
+        requests.exceptions.HTTPError: If API call fails
+        TimeoutError: If the stream stalls (partial output is kept)
+    """
+    text, blocks = _protect_code(raw_text, config)
+    if count_tokens(text, config.get('model')) > config.get('chunk_threshold_tokens', 12000):
+        markdown = structurize_long_content(raw_text, config, source, stats)
+        out.write(markdown)
+        out.flush()
+        return markdown
 
-        # Ensure front matter has date and source if not already present
+    language = config.get("language", "en")
+    system_prompt = _build_system_prompt(language, source, bool(blocks))
+    api_url, headers, payload = _build_request(text, system_prompt, config)
+
+    cache, cache_key, markdown = _cache_lookup(config, api_url, payload, stats)
+    if markdown is not None:
+        markdown = restore_code_blocks(markdown, blocks, language)
         if not markdown.startswith('---'):
-            # Add front matter if missing
-            today = datetime.now().strftime('%Y-%m-%d')
-            if language == "zh":
-                front_matter = f"""---
-技术标签: []
-日期: {today}
-来源: {source or 'Unknown'}
----
-
-"""
-            else:
-                front_matter = f"""---
-tags: []
-date: {today}
-source: {source or 'Unknown'}
----
+            markdown = build_front_matter(language, source) + markdown
+        out.write(markdown)
+        out.flush()
+        return markdown
+
+    pieces: List[str] = []
+    restorer = CodeBlockRestorer(blocks, language)
+    # Hold back the first characters until we know whether front matter is present
+    pending = ''
+    started = False
+    complete = False
+    output_tokens = 0
+    usage = None
+    start = time.time()
+    first_token_at = None
+
+    _acquire_rate_limit(config, payload)
+
+    with span('api.stream', max_tokens=payload['max_tokens']) as info:
+        try:
+            # Read timeout applies between received bytes, so steady streams never time out
+            timeout = request_timeout(_prompt_tokens(payload), payload['max_tokens'], config)
+            stream_payload = dict(payload, stream=True)
+            if config.get('stream_usage', True):
+                # Ask for a final usage event, so tokens/s uses the provider's own token count
+                stream_payload['stream_options'] = {'include_usage': True}
+            response = get_client(config).post(
+                api_url,
+                headers=headers,
+                json=stream_payload,
+                timeout=timeout,
+                stream=True
+            )
+            response.raise_for_status()
+            # SSE is UTF-8 by spec; requests would guess ISO-8859-1 without a charset
+            response.encoding = 'utf-8'
+
+            for delta, event_usage in _iter_sse_content(response):
+                if event_usage:
+                    usage = event_usage
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.time()
+                pieces.append(delta)
+
+                if started:
+                    out.write(restorer.feed(delta))
+                else:
+                    pending += delta
+                    if len(pending.lstrip()) < 3:
+                        continue
+                    if not pending.lstrip().startswith('---'):
+                        out.write(build_front_matter(language, source))
+                    out.write(restorer.feed(pending))
+                    started = True
+                out.flush()
+            complete = True
+
+        except requests.exceptions.RequestException as e:
+            if pieces:
+                output_tokens = count_tokens(''.join(pieces), config.get('model'))
+                raise TimeoutError(
+                    f"API stream interrupted after ~{output_tokens} tokens; partial output was kept"
+                ) from e
+            raise _translate_request_error(e) from e
+
+        finally:
+            if not started and pending:
+                out.write(restorer.feed(pending))
+            # Unreferenced code blocks are only appended to a complete answer
+            out.write(restorer.close(append_missing=complete and bool(pieces)))
+            out.flush()
+            if stats is not None:
+                end = time.time()
+                if usage and usage.get('completion_tokens'):
+                    output_tokens = usage['completion_tokens']
+                else:
+                    # SSE events carry any number of tokens each, so count the text itself
+                    output_tokens = count_tokens(''.join(pieces), config.get('model'))
+                stats['output_tokens'] = output_tokens
+                stats['ttft'] = round(first_token_at - start, 2) if first_token_at else None
+                generation = end - first_token_at if first_token_at else 0
+                stats['tokens_per_second'] = round(output_tokens / generation, 1) if generation > 0 else None
+            _record_usage(info, usage)
+            info['ttft_seconds'] = round(first_token_at - start, 3) if first_token_at else None
+
+    markdown = ''.join(pieces)
+    if not markdown.strip():
+        raise ValueError("Invalid API response: empty stream")
+
+    _cache_store(cache, cache_key, markdown)
 
-"""
-            markdown = front_matter + markdown
+    markdown = restore_code_blocks(markdown, blocks, language)
+    if not markdown.startswith('---'):
+        markdown = build_front_matter(language, source) + markdown
 
+    return markdown
+
+
+def structurize_long_content(
+    raw_text: str,
+    config: Dict[str, Any],
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None,
+    extra_instructions: str = ""
+) -> str:
+    """
+    Structurize a long conversation chunk by chunk and merge the results.
+
+    The text is split at turn boundaries into chunks of at most
+    chunk_max_tokens, which are structurized in parallel (up to
+    chunk_concurrency requests at once) and merged locally into one
+    document with a single front matter block.
+
+    Args:
+        raw_text: Raw extracted text from AI conversation
+        config: Configuration dict with API credentials
+        source: Original source URL or filename
+        stats: Optional dict filled with 'cache_hit' and 'chunks'
+        extra_instructions: Appended to every chunk's system prompt
+
+    Returns:
+        Structured Markdown content
+    """
+    language = config.get("language", "en")
+    text, blocks = _protect_code(raw_text, config)
+    chunks = split_into_chunks(text, config.get('chunk_max_tokens', 6000), config.get('model'))
+    instruction = CHUNK_INSTRUCTIONS.get(language, CHUNK_INSTRUCTIONS['en'])
+    chunk_stats = [{} for _ in chunks]
+
+    def structurize_chunk(index: int) -> str:
+        prompt = _build_system_prompt(language, source, has_placeholders(chunks[index]))
+        prompt += instruction.format(index=index + 1, total=len(chunks)) + extra_instructions
+        with span('structurize.chunk', index=index, input_chars=len(chunks[index])) as info:
+            markdown = _request_completion(chunks[index], prompt, config, chunk_stats[index])
+            info['output_chars'] = len(markdown)
         return markdown
 
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401:
-            raise requests.exceptions.HTTPError(
-                "API authentication failed. Check your API key"
-            ) from e
-        elif e.response.status_code == 429:
-            raise requests.exceptions.HTTPError(
-                "Rate limit exceeded. Please wait and try again"
-            ) from e
+    with ThreadPoolExecutor(max_workers=max(1, config.get('chunk_concurrency', 4))) as executor:
+        parts = list(executor.map(bind(structurize_chunk), range(len(chunks))))
+
+    if stats is not None:
+        stats['chunks'] = len(chunks)
+        stats['cache_hit'] = all(chunk.get('cache_hit') for chunk in chunk_stats)
+
+    markdown = merge_chunk_markdown(parts, language, lambda tags: build_front_matter(language, source, tags))
+    return restore_code_blocks(markdown, blocks, language)
+
+
+def structurize_content(
+    raw_text: str,
+    config: Dict[str, Any],
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Structurize raw text into Markdown using OpenAI-compatible API.
+
+    Identical requests are answered from the on-disk response cache.
+    Long code blocks are sent as placeholders and put back byte-for-byte
+    afterwards (see codeblocks.py), so the model never retypes them.
+    Conversations above chunk_threshold_tokens are split and processed by
+    structurize_long_content.
+
+    Args:
+        raw_text: Raw extracted text from AI conversation
+        config: Configuration dict with API credentials
+        source: Original source URL or filename
+        stats: Optional dict filled with 'cache_hit' (and 'chunks' for long input)
+
+    Returns:
+        Structured Markdown content
+
+    Raises:
+        requests.exceptions.HTTPError: If API call fails
+        ValueError: If response is invalid
+    """
+    with span('structurize', input_chars=len(raw_text)) as info:
+        text, blocks = _protect_code(raw_text, config)
+        if count_tokens(text, config.get('model')) > config.get('chunk_threshold_tokens', 12000):
+            markdown = structurize_long_content(raw_text, config, source, stats)
         else:
-            error_msg = f"API request failed: {e.response.status_code}"
-            try:
-                error_detail = e.response.json()
-                error_msg += f" - {error_detail}"
-            except:
-                error_msg += f" - {e.response.text[:200]}"
-            raise requests.exceptions.HTTPError(error_msg) from e
-
-    except requests.exceptions.Timeout:
-        raise TimeoutError(
-            "API request timed out. The conversation might be too long"
-        )
+            # Load system prompt based on language
+            language = config.get("language", "en")
+            system_prompt = _build_system_prompt(language, source, bool(blocks))
+
+            markdown = _request_completion(text, system_prompt, config, stats)
+            markdown = restore_code_blocks(markdown, blocks, language)
+
+            # Ensure front matter has date and source if not already present
+            if not markdown.startswith('---'):
+                markdown = build_front_matter(language, source) + markdown
+        info['output_chars'] = len(markdown)
+
+    return markdown
+
+
+def structurize_new_turns(
+    raw_text: str,
+    context: str,
+    config: Dict[str, Any],
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Structurize the new turns of a conversation that was converted before.
+
+    Only raw_text (the new turns) and a short context are sent, so the
+    request is sized by what changed rather than by the whole history.
+    The result is a document for the new part alone, to be merged into the
+    existing one (see incremental.update_conversion).
+
+    Args:
+        raw_text: Extracted text of the new turns
+        context: Title, summary and outline of the existing document
+        config: Configuration dict with API credentials
+        source: Original source URL or filename
+        stats: Optional dict filled with 'cache_hit' (and 'chunks' for long input)
+
+    Returns:
+        Structured Markdown for the new turns
+    """
+    language = config.get("language", "en")
+    instruction = UPDATE_INSTRUCTIONS.get(language, UPDATE_INSTRUCTIONS['en']).format(context=context)
+    with span('structurize.update', input_chars=len(raw_text)) as info:
+        text, blocks = _protect_code(raw_text, config)
+        if count_tokens(text, config.get('model')) > config.get('chunk_threshold_tokens', 12000):
+            markdown = structurize_long_content(raw_text, config, source, stats, instruction)
+        else:
+            system_prompt = _build_system_prompt(language, source, bool(blocks)) + instruction
+            markdown = _request_completion(text, system_prompt, config, stats)
+            markdown = restore_code_blocks(markdown, blocks, language)
+        info['output_chars'] = len(markdown)
+    return markdown
+
+
+async def astructurize_long_content(
+    raw_text: str,
+    config: Dict[str, Any],
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """Async version of structurize_long_content."""
+    language = config.get("language", "en")
+    text, blocks = _protect_code(raw_text, config)
+    chunks = split_into_chunks(text, config.get('chunk_max_tokens', 6000), config.get('model'))
+    instruction = CHUNK_INSTRUCTIONS.get(language, CHUNK_INSTRUCTIONS['en'])
+    chunk_stats = [{} for _ in chunks]
+    semaphore = asyncio.Semaphore(max(1, config.get('chunk_concurrency', 4)))
+
+    async def structurize_chunk(index: int) -> str:
+        prompt = _build_system_prompt(language, source, has_placeholders(chunks[index]))
+        prompt += instruction.format(index=index + 1, total=len(chunks))
+        async with semaphore:
+            with span('structurize.chunk', index=index, input_chars=len(chunks[index])) as info:
+                markdown = await _arequest_completion(chunks[index], prompt, config, chunk_stats[index])
+                info['output_chars'] = len(markdown)
+            return markdown
+
+    parts = await asyncio.gather(*(structurize_chunk(index) for index in range(len(chunks))))
+
+    if stats is not None:
+        stats['chunks'] = len(chunks)
+        stats['cache_hit'] = all(chunk.get('cache_hit') for chunk in chunk_stats)
+
+    markdown = merge_chunk_markdown(list(parts), language, lambda tags: build_front_matter(language, source, tags))
+    return restore_code_blocks(markdown, blocks, language)
+
+
+async def astructurize_content(
+    raw_text: str,
+    config: Dict[str, Any],
+    source: str = "",
+    stats: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Async version of structurize_content.
+
+    Requests wait for the provider's requests-per-minute and
+    tokens-per-minute budget (see rate_limit.get_rate_limiter), so many
+    conversions can be awaited concurrently without tipping into 429s.
+
+    Args:
+        raw_text: Raw extracted text from AI conversation
+        config: Configuration dict with API credentials
+        source: Original source URL or filename
+        stats: Optional dict filled with 'cache_hit' (and 'chunks' for long input)
+
+    Returns:
+        Structured Markdown content
+
+    Raises:
+        requests.exceptions.HTTPError: If API call fails
+        ValueError: If response is invalid
+    """
+    with span('structurize', input_chars=len(raw_text)) as info:
+        text, blocks = _protect_code(raw_text, config)
+        if count_tokens(text, config.get('model')) > config.get('chunk_threshold_tokens', 12000):
+            markdown = await astructurize_long_content(raw_text, config, source, stats)
+        else:
+            language = config.get("language", "en")
+            system_prompt = _build_system_prompt(language, source, bool(blocks))
+
+            markdown = await _arequest_completion(text, system_prompt, config, stats)
+            markdown = restore_code_blocks(markdown, blocks, language)
+
+            if not markdown.startswith('---'):
+                markdown = build_front_matter(language, source) + markdown
+        info['output_chars'] = len(markdown)
 
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"Network error: {e}") from e
+    return markdown
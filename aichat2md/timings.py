@@ -0,0 +1,306 @@
+"""Stage timing and resource instrumentation (--timings / --trace).
+
+Code wraps each stage in a span:
+
+    with span('parse.html', input_bytes=size) as info:
+        text = ...
+        info['output_chars'] = len(text)
+
+Spans nest (a span opened inside another records it as parent) and carry
+their duration, the process's peak RSS when they ended, and any fields the
+stage adds (sizes, token usage). Finished spans are kept for a summary
+table and, with a trace file, written immediately as JSON lines.
+
+Recording is off by default; span() then returns a shared no-op context
+whose info dict discards writes, so instrumented code costs a function
+call per stage.
+"""
+
+import contextvars
+import itertools
+import json
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then omitted
+    resource = None
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('aichat2md_span', default=None)
+_span_ids = itertools.count(1)
+
+_recorder: Optional['TraceRecorder'] = None
+
+
+class _DiscardDict(dict):
+    """Info dict of a disabled span; writes are dropped."""
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def setdefault(self, key, default=None):
+        return default
+
+
+class _NullSpan:
+    """Shared context manager used while recording is disabled."""
+
+    _info = _DiscardDict()
+
+    def __enter__(self) -> Dict[str, Any]:
+        return self._info
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TraceRecorder:
+    """
+    Collects finished spans, optionally appending them to a JSON lines file.
+
+    Each line is one span: name, id, parent, depth, thread, start (Unix
+    time), seconds, peak_rss_mb, error (exception class name or null) and
+    the stage's own fields.
+    """
+
+    def __init__(self, trace_path: Optional[str] = None):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+
+    def record(self, record: Dict[str, Any]):
+        with self._lock:
+            self.spans.append(record)
+            if self._trace_file is not None:
+                self._trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                self._trace_file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+
+class _Span:
+    """Context manager that times one stage and records it on exit."""
+
+    def __init__(self, recorder: TraceRecorder, name: str, fields: Dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.info = fields
+        self.id = next(_span_ids)
+        self.depth = 0
+        self._token = None
+
+    def __enter__(self) -> Dict[str, Any]:
+        parent = _current_span.get()
+        self.parent = parent.id if parent is not None else None
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self._token = _current_span.set(self)
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self.info
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        record = {
+            'name': self.name,
+            'id': self.id,
+            'parent': self.parent,
+            'depth': self.depth,
+            'thread': threading.current_thread().name,
+            'start': round(self._wall, 3),
+            'seconds': round(seconds, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'error': exc_type.__name__ if exc_type is not None else None,
+        }
+        record.update(self.info)
+        self.recorder.record(record)
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def enable(trace_path: Optional[str] = None) -> TraceRecorder:
+    """
+    Start recording spans for this process.
+
+    Args:
+        trace_path: Optional file to append spans to as JSON lines
+
+    Returns:
+        The active recorder
+    """
+    global _recorder
+    disable()
+    _recorder = TraceRecorder(trace_path)
+    return _recorder
+
+
+def disable() -> List[Dict[str, Any]]:
+    """Stop recording and return the spans recorded so far."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is None:
+        return []
+    recorder.close()
+    return recorder.spans
+
+
+def is_enabled() -> bool:
+    """Check whether spans are being recorded."""
+    return _recorder is not None
+
+
+def get_spans() -> List[Dict[str, Any]]:
+    """Spans finished so far, in the order they ended."""
+    return list(_recorder.spans) if _recorder is not None else []
+
+
+def span(name: str, **fields):
+    """
+    Time a stage.
+
+    Args:
+        name: Stage name, dotted by area (e.g. 'browser.goto', 'api.request')
+        **fields: Initial fields such as input sizes
+
+    Returns:
+        Context manager yielding the span's info dict, to which the stage
+        can add fields (output sizes, token usage) before it ends
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, fields)
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    Wrap fn so spans it opens on another thread nest under the current span.
+
+    Thread pools don't inherit context variables; submit bind(fn) instead
+    of fn. Returns fn unchanged while recording is disabled.
+    """
+    if _recorder is None:
+        return fn
+    parent = _current_span.get()
+
+    def run(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+
+    return run
+
+
+def bind_coroutine(coro):
+    """Like bind(), for a coroutine run on another thread's event loop."""
+    if _recorder is None:
+        return coro
+    parent = _current_span.get()
+
+    async def run():
+        # A task has its own context copy, so this doesn't leak into the loop
+        _current_span.set(parent)
+        return await coro
+
+    return run()
+
+
+# Fields shown in the table, with their column headings
+TABLE_FIELDS = [
+    ('input_chars', 'in chars'),
+    ('output_chars', 'out chars'),
+    ('prompt_tokens', 'prompt tok'),
+    ('completion_tokens', 'compl tok'),
+]
+
+
+def _format_row(label: str, seconds: float, record: Dict[str, Any], calls: Optional[int] = None) -> List[str]:
+    cells = [label] + ([] if calls is None else [str(calls)]) + [f"{seconds:.2f}"]
+    for key, _ in TABLE_FIELDS:
+        value = record.get(key)
+        cells.append('' if value is None else str(value))
+    rss = record.get('peak_rss_mb')
+    cells.append('' if rss is None else f"{rss:.0f}")
+    return cells
+
+
+def format_table(spans: List[Dict[str, Any]], aggregate: bool = False) -> str:
+    """
+    Render spans as a text table.
+
+    Args:
+        spans: Recorded spans (see get_spans)
+        aggregate: One row per stage name with call count, total seconds
+            and summed sizes (for batches), instead of one row per span
+            indented under its parent
+
+    Returns:
+        Table text, or '' if there are no spans
+    """
+    if not spans:
+        return ''
+    headings = ['stage'] + (['calls'] if aggregate else []) + ['seconds']
+    headings += [title for _, title in TABLE_FIELDS] + ['peak MB']
+
+    rows = []
+    if aggregate:
+        groups: Dict[str, Dict[str, Any]] = {}
+        for record in sorted(spans, key=lambda record: record['start']):
+            group = groups.setdefault(record['name'], {'calls': 0, 'seconds': 0.0, 'peak_rss_mb': None})
+            group['calls'] += 1
+            group['seconds'] += record['seconds']
+            for key, _ in TABLE_FIELDS:
+                if record.get(key) is not None:
+                    group[key] = group.get(key, 0) + record[key]
+            if record.get('peak_rss_mb') is not None:
+                group['peak_rss_mb'] = max(group['peak_rss_mb'] or 0, record['peak_rss_mb'])
+        for name, group in groups.items():
+            rows.append(_format_row(name, group['seconds'], group, group['calls']))
+    else:
+        children: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        ids = {record['id'] for record in spans}
+        for record in sorted(spans, key=lambda record: record['start']):
+            parent = record['parent'] if record['parent'] in ids else None
+            children.setdefault(parent, []).append(record)
+
+        def walk(parent: Optional[int], depth: int):
+            for record in children.get(parent, []):
+                label = '  ' * depth + record['name'] + (' ✗' if record['error'] else '')
+                rows.append(_format_row(label, record['seconds'], record))
+                walk(record['id'], depth + 1)
+
+        walk(None, 0)
+
+    widths = [max(len(row[column]) for row in rows + [headings]) for column in range(len(headings))]
+    lines = []
+    for row in [headings] + rows:
+        first = row[0].ljust(widths[0])
+        rest = [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+        lines.append('  '.join([first] + rest).rstrip())
+    lines.insert(1, '-' * len(lines[0]))
+    return '\n'.join(lines)
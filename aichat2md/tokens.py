@@ -0,0 +1,169 @@
+"""Token counting and request sizing (max_tokens, timeouts, ETAs)."""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from .config import API_PRESETS
+from .rate_limit import detect_provider
+
+
+CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+# Punctuation and symbols outside the fullwidth forms CJK_RE already counts
+SYMBOL_RE = re.compile(r'[^\w\s\uff00-\uffef]')
+
+# tiktoken encoding for models it has no mapping for (DeepSeek, Llama, ...);
+# modern BPE vocabularies are close enough for sizing
+DEFAULT_ENCODING = 'o200k_base'
+
+# Timing model: fixed latency, prompt processing, then generation at the
+# provider's output rate (API_PRESETS tokens_per_second)
+BASE_LATENCY_SECONDS = 5
+PREFILL_TOKENS_PER_SECOND = 2000
+DEFAULT_TOKENS_PER_SECOND = 25
+
+# Structured notes run at about half the length of the conversation
+OUTPUT_RATIO = 0.5
+OUTPUT_OVERHEAD_TOKENS = 512
+MIN_MAX_TOKENS = 1024
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+MIN_TIMEOUT = 30
+MAX_TIMEOUT = 600
+# Headroom over the worst-case estimate before a request is abandoned
+TIMEOUT_MARGIN = 1.5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count without a tokenizer.
+
+    CJK characters are about one token each. Other text is about four
+    characters per token, but punctuation and symbols (dense in code)
+    mostly tokenize on their own, so they count half a token each.
+    """
+    cjk = len(CJK_RE.findall(text))
+    symbols = len(SYMBOL_RE.findall(text))
+    return cjk + (len(text) - cjk - symbols) // 4 + symbols // 2 + 1
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """tiktoken encoding for model, or None if tiktoken or its data is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        # Encodings are downloaded on first use; offline, fall back for good
+        return None
+
+
+def has_exact_tokenizer(model: Optional[str] = None) -> bool:
+    """Check whether count_tokens uses a real tokenizer."""
+    return _get_encoding(model or '') is not None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens, exactly with tiktoken if installed, else by estimate_tokens.
+
+    Args:
+        text: Text to count
+        model: Model name, used to pick the tiktoken encoding
+
+    Returns:
+        Token count
+    """
+    encoding = _get_encoding(model or '')
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode_ordinary(text))
+
+
+def get_output_profile(config: Dict[str, Any]):
+    """
+    Resolve (max output tokens, output tokens per second) for the provider.
+
+    Defaults come from API_PRESETS and can be overridden with the
+    max_tokens_limit and tokens_per_second config keys.
+    """
+    preset = API_PRESETS[detect_provider(config)]
+    limit = config.get('max_tokens_limit') or preset.get('max_output_tokens') or DEFAULT_MAX_OUTPUT_TOKENS
+    speed = config.get('tokens_per_second') or preset.get('tokens_per_second') or DEFAULT_TOKENS_PER_SECOND
+    return limit, speed
+
+
+def choose_max_tokens(input_tokens: int, config: Dict[str, Any]) -> int:
+    """
+    Pick max_tokens for a request.
+
+    A number in config['max_tokens'] is used as-is. With "auto" (the
+    default) the budget scales with the input, so short chats don't reserve
+    (and wait on) a large budget and long ones aren't cut off.
+
+    Args:
+        input_tokens: Tokens in the conversation text
+        config: Configuration dict
+
+    Returns:
+        max_tokens value for the request
+    """
+    configured = config.get('max_tokens', 'auto')
+    if configured not in (None, 'auto'):
+        return int(configured)
+    limit, _ = get_output_profile(config)
+    wanted = int(input_tokens * OUTPUT_RATIO) + OUTPUT_OVERHEAD_TOKENS
+    return min(limit, max(MIN_MAX_TOKENS, wanted))
+
+
+def estimate_seconds(input_tokens: int, output_tokens: int, config: Dict[str, Any]) -> float:
+    """Expected duration of a request generating output_tokens."""
+    _, speed = get_output_profile(config)
+    return BASE_LATENCY_SECONDS + input_tokens / PREFILL_TOKENS_PER_SECOND + output_tokens / speed
+
+
+def request_timeout(input_tokens: int, max_tokens: int, config: Dict[str, Any]) -> int:
+    """
+    Timeout for a request that may generate up to max_tokens.
+
+    Args:
+        input_tokens: Tokens in the prompt
+        max_tokens: Requested output budget
+        config: Configuration dict
+
+    Returns:
+        Seconds, between MIN_TIMEOUT and MAX_TIMEOUT
+    """
+    worst_case = estimate_seconds(input_tokens, max_tokens, config) * TIMEOUT_MARGIN
+    return int(min(MAX_TIMEOUT, max(MIN_TIMEOUT, math.ceil(worst_case))))
+
+
+def estimate_duration(text: str, config: Dict[str, Any]) -> int:
+    """
+    Expected seconds to structurize text, for progress messages.
+
+    Accounts for chunking: chunks run chunk_concurrency at a time.
+
+    Args:
+        text: Conversation text
+        config: Configuration dict
+
+    Returns:
+        Estimated seconds
+    """
+    tokens = count_tokens(text, config.get('model'))
+    if tokens > config.get('chunk_threshold_tokens', 12000):
+        chunk_tokens = config.get('chunk_max_tokens', 6000)
+        chunks = math.ceil(tokens / chunk_tokens)
+        rounds = math.ceil(chunks / max(1, config.get('chunk_concurrency', 4)))
+    else:
+        chunk_tokens, rounds = tokens, 1
+    expected_output = min(choose_max_tokens(chunk_tokens, config), int(chunk_tokens * OUTPUT_RATIO))
+    return math.ceil(rounds * estimate_seconds(chunk_tokens, expected_output, config))
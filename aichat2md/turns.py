@@ -0,0 +1,101 @@
+"""Conversation turns: the structured view of an extracted conversation.
+
+A turn is a dict:
+    role:        'user', 'assistant' or 'unknown'
+    text:        the turn's text, code included as ``` fenced blocks
+    code_blocks: the fenced code blocks in text, in order
+    position:    index of the turn in the conversation (0-based)
+
+Extractors build turns from platform DOM hints where they can, and from
+speaker labels in the flat text otherwise.
+"""
+
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .chunking import TURN_MARKER_RE
+from .codeblocks import protect_code_blocks
+
+
+# Speaker labels (as matched by TURN_MARKER_RE) that name the user
+USER_LABELS = {'user', 'you', 'you said', '用户'}
+
+ROLE_LABELS = {'user': 'User', 'assistant': 'Assistant'}
+
+
+def make_turn(role: str, text: str, position: int) -> Dict[str, Any]:
+    """Build a turn dict, collecting the fenced code blocks in text."""
+    _, code_blocks = protect_code_blocks(text, min_chars=0)
+    return {'role': role, 'text': text, 'code_blocks': code_blocks, 'position': position}
+
+
+def turns_from_marks(
+    chunks: Sequence[str],
+    marks: Sequence[Tuple[int, int, str]],
+    join: Callable[[Sequence[str]], str] = '\n'.join
+) -> List[Dict[str, Any]]:
+    """
+    Build turns from text chunks and the turn marks of a text parser.
+
+    Args:
+        chunks: All text chunks of the document, in order
+        marks: (first chunk, end chunk, role) per turn element
+        join: Joins a turn's chunks into its text
+
+    Returns:
+        Turns with text, in document order
+    """
+    turns: List[Dict[str, Any]] = []
+    for start, end, role in marks:
+        text = join(chunks[start:end]).strip()
+        if text:
+            turns.append(make_turn(role, text, len(turns)))
+    return turns
+
+
+def _label_role(label: str) -> str:
+    label = label.strip().rstrip(':：').strip().casefold()
+    return 'user' if label in USER_LABELS else 'assistant'
+
+
+def split_text_turns(text: str) -> List[Dict[str, Any]]:
+    """
+    Split flat text into turns at speaker labels ("User:", "ChatGPT said:").
+
+    Text before the first label, or all of it if there are no labels,
+    becomes a single turn with role 'unknown'.
+
+    Args:
+        text: Extracted conversation text
+
+    Returns:
+        Turns in order
+    """
+    turns: List[Dict[str, Any]] = []
+    role = 'unknown'
+    lines: List[str] = []
+    in_fence = False
+
+    def close_turn():
+        body = '\n'.join(lines).strip()
+        if body:
+            turns.append(make_turn(role, body, len(turns)))
+
+    for line in text.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence and TURN_MARKER_RE.match(line.strip()):
+            close_turn()
+            role = _label_role(line)
+            lines = []
+            continue
+        lines.append(line)
+    close_turn()
+    return turns
+
+
+def turns_to_text(turns: List[Dict[str, Any]]) -> str:
+    """Render turns as plain text with speaker labels (the flat view)."""
+    return '\n\n'.join(
+        f"{ROLE_LABELS[turn['role']]}:\n{turn['text']}" if turn['role'] in ROLE_LABELS else turn['text']
+        for turn in turns
+    )
@@ -0,0 +1,353 @@
+"""Watch a folder and convert exports as they appear (--watch)."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cli import SUPPORTED_SUFFIXES, _reject_claude_share_link, extract_content, save_markdown
+from .config import CONFIG_DIR
+from .incremental import record_conversion
+from .markdown_converter import convert_to_markdown
+from .structurizer import structurize_content
+
+
+# Content hashes of files already converted, kept across restarts
+INDEX_FILE = CONFIG_DIR / "watch-index.json"
+
+# Oldest entries are dropped beyond this many
+MAX_INDEX_ENTRIES = 5000
+
+# How often pending files are checked for being ready
+TICK_SECONDS = 0.2
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WatchIndex:
+    """
+    Content hashes of converted files, stored as JSON.
+
+    Keyed by hash, so a file that is renamed, moved back in, or saved
+    again with the same content is not converted twice. Files that were
+    already in the folder when it was first watched are kept separately by
+    path, size and mtime (see seed), so they are left alone until they change.
+    """
+
+    def __init__(self, path: Path = INDEX_FILE):
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            self.entries: Dict[str, Dict[str, Any]] = data['files']
+            self.seen: Dict[str, List[int]] = data.get('seen', {})
+            self.is_new = False
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self.entries = {}
+            self.seen = {}
+            self.is_new = True
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self.entries
+
+    def output_for(self, input_path: str) -> Optional[str]:
+        """Output written by the latest conversion of input_path, if it still exists."""
+        with self._lock:
+            matches = [entry for entry in self.entries.values() if entry['path'] == input_path]
+        matches.sort(key=lambda entry: entry['converted'])
+        if matches and Path(matches[-1]['output']).exists():
+            return matches[-1]['output']
+        return None
+
+    def is_seeded(self, input_path: str, signature: Optional[Tuple[int, int]]) -> bool:
+        """Whether input_path was present when the index was seeded and hasn't changed since."""
+        with self._lock:
+            entry = self.seen.get(input_path)
+        return entry is not None and signature is not None and tuple(entry) == signature
+
+    def seed(self, signatures: Dict[str, Tuple[int, int]]):
+        """Remember files already present (path -> (size, mtime)) without converting them, and save."""
+        with self._lock:
+            self.seen.update({path: list(signature) for path, signature in signatures.items()})
+            self.is_new = False
+            self._save()
+
+    def add(self, digest: str, input_path: str, output: str):
+        """Record a conversion and save the index."""
+        with self._lock:
+            self.entries[digest] = {'path': input_path, 'output': output, 'converted': time.time()}
+            self.seen.pop(input_path, None)
+            if len(self.entries) > MAX_INDEX_ENTRIES:
+                oldest = sorted(self.entries, key=lambda key: self.entries[key]['converted'])
+                for key in oldest[:len(self.entries) - MAX_INDEX_ENTRIES]:
+                    del self.entries[key]
+            self._save()
+
+    def _save(self):
+        raw = json.dumps({'version': 1, 'files': self.entries, 'seen': self.seen}, indent=2, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(raw, encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """(size, mtime) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FolderWatcher:
+    """
+    Convert supported exports in a directory as they are added or changed.
+
+    Filesystem events come from watchdog when it is installed and polling
+    otherwise. A file is converted once it has had no events and kept the
+    same size and mtime for the debounce interval, so downloads still being
+    written are left alone. Conversions run in a pool of `workers` threads;
+    files beyond that wait in the pending set.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        config: Dict[str, Any],
+        workers: int = 2,
+        index: Optional[WatchIndex] = None,
+        use_events: bool = True
+    ):
+        self.directory = Path(directory).expanduser()
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Watch directory not found: {directory}")
+        self.config = config
+        self.workers = max(1, workers)
+        self.index = index if index is not None else WatchIndex()
+        self.debounce = float(config.get('watch_debounce_seconds', 2))
+        self.poll_interval = float(config.get('watch_poll_seconds', 1))
+        self.use_events = use_events
+        self.counts = {'converted': 0, 'failed': 0, 'unchanged': 0}
+
+        # path -> (time of last change, signature then)
+        self._pending: Dict[str, Tuple[float, Optional[Tuple[int, int]]]] = {}
+        self._running = set()
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        # Output paths are chosen by probing for conflicts, so writes must not interleave
+        self._save_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = threading.Event()
+        self._observer = None
+
+    def notify(self, path: str):
+        """Note that path was created or modified; conversion is debounced."""
+        path = str(path)
+        name = os.path.basename(path)
+        if name.startswith('.') or Path(name).suffix.lower() not in SUPPORTED_SUFFIXES:
+            return
+        signature = _signature(path)
+        if self.index.is_seeded(path, signature):
+            return
+        with self._lock:
+            self._pending[path] = (time.monotonic(), signature)
+
+    def _seed_index(self):
+        """Record the supported files already in the folder as seen, without converting them."""
+        signatures = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.name.startswith('.') or Path(entry.name).suffix.lower() not in SUPPORTED_SUFFIXES:
+                continue
+            signature = _signature(entry.path)
+            if signature is not None:
+                signatures[entry.path] = signature
+        self.index.seed(signatures)
+
+    def scan(self):
+        """Poll the directory, notifying files whose size or mtime changed."""
+        seen = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            seen[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            if self._snapshot.get(entry.path) != seen[entry.path]:
+                self.notify(entry.path)
+        self._snapshot = seen
+
+    def _take_ready(self):
+        """Pop pending files that have settled, up to the free worker slots."""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, (changed, signature) in list(self._pending.items()):
+                if len(self._running) + len(ready) >= self.workers:
+                    break
+                if path in self._running or now - changed < self.debounce:
+                    continue
+                current = _signature(path)
+                if current is None:
+                    # Deleted or renamed away before it settled
+                    del self._pending[path]
+                elif current != signature or current[0] == 0:
+                    # Still being written
+                    self._pending[path] = (now, current)
+                else:
+                    del self._pending[path]
+                    ready.append(path)
+            self._running.update(ready)
+        return ready
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _convert(self, path: str):
+        try:
+            digest = file_hash(path)
+            if digest in self.index:
+                self._count('unchanged')
+                return
+            if self.config.get('raw'):
+                _reject_claude_share_link(path, quiet=True)
+                markdown, _ = convert_to_markdown(path, self.config)
+            else:
+                raw_text, source = extract_content(path, self.config, quiet=True)
+                markdown = structurize_content(raw_text, self.config, source)
+
+            with self._save_lock:
+                # A changed export replaces its earlier output instead of adding name-1.md
+                previous = self.index.output_for(path)
+                if previous:
+                    output_path = Path(previous)
+                    output_path.write_text(markdown, encoding='utf-8')
+                else:
+                    output_path = save_markdown(path, markdown, self.config)
+            self.index.add(digest, path, str(output_path))
+            if not self.config.get('raw'):
+                # Lets a later --update on this export send only new turns
+                record_conversion(path, raw_text, output_path, self.config)
+            self._count('converted')
+            print(f"✓ {path} → {output_path}")
+        except Exception as e:
+            # Not indexed, so the file is retried when it changes or on restart
+            self._count('failed')
+            print(f"✗ {path}: {str(e) or e.__class__.__name__}")
+        finally:
+            with self._lock:
+                self._running.discard(path)
+
+    def _start_observer(self):
+        """Start a watchdog observer, or return None to fall back to polling."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    watcher.notify(getattr(event, 'dest_path', '') or event.src_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.directory), recursive=False)
+        try:
+            observer.start()
+        except OSError:
+            # e.g. the inotify watch limit is reached
+            return None
+        return observer
+
+    def run(self):
+        """Watch until stop() is called, converting files as they settle."""
+        if self.index.is_new:
+            # First start: what is already in the folder is history, not new exports
+            self._seed_index()
+        if self.use_events:
+            self._observer = self._start_observer()
+        # Catch up on files added or changed while not watching; indexed and seeded ones are skipped
+        self.scan()
+        self._started.set()
+        next_scan = time.monotonic() + self.poll_interval
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while not self._stop.is_set():
+                    if self._observer is None and time.monotonic() >= next_scan:
+                        self.scan()
+                        next_scan = time.monotonic() + self.poll_interval
+                    for path in self._take_ready():
+                        pool.submit(self._convert, path)
+                    self._stop.wait(TICK_SECONDS)
+            finally:
+                if self._observer is not None:
+                    self._observer.stop()
+                    self._observer.join()
+
+    def stop(self):
+        """Stop watching; conversions already started are finished."""
+        self._stop.set()
+
+    @property
+    def mode(self) -> str:
+        return 'events' if self._observer is not None else 'polling'
+
+
+def watch_folder(directory: str, config: Dict[str, Any], workers: int = 2) -> Dict[str, int]:
+    """
+    Convert exports in directory as they appear, until interrupted.
+
+    Args:
+        directory: Folder to watch (not recursive)
+        config: Configuration dict
+        workers: Maximum concurrent conversions
+
+    Returns:
+        Counts of converted, failed and unchanged files
+
+    Raises:
+        FileNotFoundError: If directory doesn't exist
+    """
+    watcher = FolderWatcher(directory, config, workers)
+    thread = threading.Thread(target=watcher.run, name='aichat2md-watch', daemon=True)
+    thread.start()
+    while not watcher._started.wait(timeout=0.1) and thread.is_alive():
+        pass
+    print(f"👀 Watching {watcher.directory} ({watcher.mode}, {watcher.workers} workers); Ctrl+C to stop")
+    try:
+        while thread.is_alive():
+            thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("\n⏹  Stopping, finishing conversions in progress...")
+        watcher.stop()
+        thread.join()
+    counts = watcher.counts
+    print(f"Watch summary: {counts['converted']} converted, {counts['failed']} failed, {counts['unchanged']} already converted")
+    return counts
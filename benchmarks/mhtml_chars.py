@@ -0,0 +1,42 @@
+"""Compare characters sent to the API for MHTML files: plain HTML parsing vs MHTML decoding.
+
+Usage:
+    python benchmarks/mhtml_chars.py [file.mhtml ...]
+
+Defaults to the test fixture when no files are given.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aichat2md.extractors.html_extractor import extract_from_html  # noqa: E402
+from aichat2md.extractors.mhtml_extractor import extract_from_mhtml  # noqa: E402
+from aichat2md.tokens import estimate_tokens  # noqa: E402
+
+
+DEFAULT_FILES = [Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "mhtml" / "chat.mhtml"]
+
+
+def measure(extract, path):
+    start = time.perf_counter()
+    text = extract(str(path))
+    return len(text), estimate_tokens(text), time.perf_counter() - start
+
+
+def main():
+    files = [Path(arg) for arg in sys.argv[1:]] or DEFAULT_FILES
+    print(f"{'file':<32} {'size':>10} {'before chars':>13} {'after chars':>12} {'tokens saved':>13} {'before s':>9} {'after s':>8}")
+    for path in files:
+        before_chars, before_tokens, before_seconds = measure(extract_from_html, path)
+        after_chars, after_tokens, after_seconds = measure(extract_from_mhtml, path)
+        print(
+            f"{path.name[:32]:<32} {path.stat().st_size:>10} {before_chars:>13} {after_chars:>12} "
+            f"{before_tokens - after_tokens:>13} {before_seconds:>9.3f} {after_seconds:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measure what request blocking saves on real share pages.
+
+Usage:
+    python benchmarks/resource_blocking.py <url> [<url> ...] [--runs N]
+
+Each URL is loaded with the platform's blocking profile and with an empty
+profile (nothing aborted, everything counted). Aborted requests never
+transfer anything, so their size can't be seen during a blocked load; the
+bytes saved are the difference between the two runs. Sizes come from
+Content-Length headers, so responses sent without one are not counted.
+Needs network access and `playwright install chromium`.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aichat2md.extractors.playwright_extractor import BrowserPool, extract_from_url  # noqa: E402
+from aichat2md.extractors.resource_blocking import BLOCKING_PROFILES  # noqa: E402
+
+
+# Overrides that turn every platform's profile into a pass-through
+NO_BLOCKING = {platform: {'resource_types': [], 'url_patterns': []} for platform in BLOCKING_PROFILES}
+
+
+def measure(pool: BrowserPool, url: str, runs: int):
+    """Median load seconds, loaded bytes and blocked requests over runs."""
+    seconds, loaded, blocked = [], [], []
+    for _ in range(runs):
+        stats = {}
+        start = time.perf_counter()
+        extract_from_url(url, pool=pool, stats=stats)
+        seconds.append(time.perf_counter() - start)
+        loaded.append(stats.get('loaded_bytes', 0))
+        blocked.append(stats.get('blocked_requests', 0))
+    return statistics.median(seconds), int(statistics.median(loaded)), int(statistics.median(blocked))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'url':<48} {'blocked':>7} {'KB (off)':>9} {'KB (on)':>8} {'KB saved':>9} {'s (off)':>8} {'s (on)':>7}")
+    with BrowserPool(resource_blocking=NO_BLOCKING) as baseline, BrowserPool() as blocking:
+        for url in args.urls:
+            off_seconds, off_bytes, _ = measure(baseline, url, args.runs)
+            on_seconds, on_bytes, blocked = measure(blocking, url, args.runs)
+            print(
+                f"{url[:48]:<48} {blocked:>7} {off_bytes // 1024:>9} {on_bytes // 1024:>8} "
+                f"{(off_bytes - on_bytes) // 1024:>9} {off_seconds:>8.2f} {on_seconds:>7.2f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
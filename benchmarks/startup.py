@@ -0,0 +1,99 @@
+"""Measure CLI startup: import time of aichat2md.cli and wall time of --version.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--max-ms MS]
+
+Each run is a fresh interpreter. Exits with status 1 if the median import
+time exceeds --max-ms (default 150), if a heavy dependency is imported
+at startup, or if an offline --raw conversion loads requests or the
+structurizer, so it can run in CI as a regression check.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that only the code paths needing them may import
+HEAVY_MODULES = ['playwright', 'requests', 'yaspin', 'asyncio', 'aichat2md.structurizer']
+
+CHECK_MODULES = (
+    "import sys, aichat2md.cli; "
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+# Modules an offline --raw conversion must not need
+RAW_HEAVY_MODULES = ['playwright', 'requests', 'aichat2md.structurizer']
+RAW_FIXTURE = ROOT / "tests" / "fixtures" / "turns" / "chatgpt.html"
+
+CHECK_RAW_MODULES = (
+    "import sys; from aichat2md.markdown_converter import convert_to_markdown; "
+    f"convert_to_markdown({str(RAW_FIXTURE)!r}, {{'language': 'en'}}); "
+    f"print(','.join(m for m in {RAW_HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def import_ms() -> float:
+    """Cumulative import time of aichat2md.cli in ms, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import aichat2md.cli"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "aichat2md.cli":
+            return int(parts[1]) / 1000
+    raise RuntimeError("aichat2md.cli not found in -X importtime output")
+
+
+def version_ms() -> float:
+    """Wall time of `aichat2md --version` in a fresh interpreter, in ms."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import sys; sys.argv = ['aichat2md', '--version']; "
+                               "from aichat2md.cli import main; main()"],
+        cwd=ROOT, capture_output=True, check=False
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    imports = [import_ms() for _ in range(args.runs)]
+    versions = [version_ms() for _ in range(args.runs)]
+    loaded = subprocess.run(
+        [sys.executable, "-c", CHECK_MODULES], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    raw_loaded = subprocess.run(
+        [sys.executable, "-c", CHECK_RAW_MODULES], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    print(f"{'':<24} {'median':>8} {'min':>8} {'max':>8}")
+    for label, samples in [("import aichat2md.cli", imports), ("aichat2md --version", versions)]:
+        print(f"{label:<24} {statistics.median(samples):>6.1f}ms {min(samples):>6.1f}ms {max(samples):>6.1f}ms")
+    print(f"heavy modules at startup: {loaded or 'none'}")
+    print(f"heavy modules after --raw conversion: {raw_loaded or 'none'}")
+
+    failed = False
+    if statistics.median(imports) > args.max_ms:
+        print(f"✗ import time above {args.max_ms:.0f}ms")
+        failed = True
+    if loaded:
+        print(f"✗ imported at startup: {loaded}")
+        failed = True
+    if raw_loaded:
+        print(f"✗ imported by --raw conversion: {raw_loaded}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
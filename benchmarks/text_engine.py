@@ -0,0 +1,52 @@
+"""Time HTML-to-text extraction with each installed parser backend.
+
+Usage:
+    python benchmarks/text_engine.py [file.html ...]
+
+Generates a synthetic 50,000-message export when no files are given.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aichat2md.extractors.html_extractor import extract_from_html  # noqa: E402
+from aichat2md.extractors.text_engine import available_backends  # noqa: E402
+
+
+def synthetic_export(directory: Path, messages: int = 50000) -> Path:
+    path = directory / "synthetic.html"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><body>")
+        for i in range(messages):
+            f.write(
+                f'<div class="message"><img src="avatar.png"><p>message <b>{i}</b> &amp; more</p>'
+                f"<script>track({i});</script></div>"
+            )
+        f.write("</body></html>")
+    return path
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(arg) for arg in sys.argv[1:]] or [synthetic_export(Path(tmp))]
+        backends = available_backends()
+        print(f"{'file':<32} {'size':>10} " + " ".join(f"{name:>11}" for name in backends) + "  same text")
+        for path in files:
+            timings, texts = [], set()
+            for backend in backends:
+                start = time.perf_counter()
+                texts.add(extract_from_html(str(path), backend))
+                timings.append(time.perf_counter() - start)
+            print(
+                f"{path.name[:32]:<32} {path.stat().st_size:>10} "
+                + " ".join(f"{seconds:>10.2f}s" for seconds in timings)
+                + f"  {len(texts) == 1}"
+            )
+
+
+if __name__ == "__main__":
+    main()
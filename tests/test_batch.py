@@ -0,0 +1,77 @@
+"""Tests for batch conversion."""
+
+import json
+import threading
+
+import pytest
+from aichat2md import batch
+from aichat2md.batch import collect_inputs, run_batch, write_summary
+
+
+def test_collect_inputs_expands_directory(tmp_path):
+    """Test directories expand to supported exports only."""
+    (tmp_path / "a.html").write_text("<p>a</p>")
+    (tmp_path / "b.webarchive").write_bytes(b"")
+    (tmp_path / "notes.md").write_text("# output")
+
+    result = collect_inputs([str(tmp_path)])
+    assert [p.split("/")[-1] for p in result] == ["a.html", "b.webarchive"]
+
+
+def test_collect_inputs_list_file_dedupes(tmp_path):
+    """Test list file entries are merged, comments skipped, duplicates removed."""
+    list_file = tmp_path / "links.txt"
+    list_file.write_text("# backlog\nhttps://chatgpt.com/share/1\n\nhttps://chatgpt.com/share/2\n")
+
+    result = collect_inputs(["https://chatgpt.com/share/1"], str(list_file))
+    assert result == ["https://chatgpt.com/share/1", "https://chatgpt.com/share/2"]
+
+
+def test_run_batch_overlaps_stages(tmp_path, monkeypatch):
+    """Test extraction continues while earlier items are being structurized."""
+    release = threading.Event()
+    extracted = []
+
+    def fake_extract(input_path, config=None, quiet=False):
+        extracted.append(input_path)
+        if len(extracted) == 3:
+            release.set()
+        return f"text of {input_path}", input_path
+
+    def fake_structurize(raw_text, config, source=""):
+        # Blocks until every item has been extracted
+        assert release.wait(timeout=5)
+        return f"# {source}\n"
+
+    monkeypatch.setattr(batch, "extract_content", fake_extract)
+    monkeypatch.setattr(batch, "structurize_content", fake_structurize)
+
+    inputs = [str(tmp_path / f"{name}.html") for name in ("a", "b", "c")]
+    results = run_batch(inputs, {"output_dir": str(tmp_path), "records_dir": str(tmp_path / "records")}, extract_workers=1, structurize_workers=1)
+
+    assert [r["status"] for r in results] == ["ok", "ok", "ok"]
+    assert [r["input"] for r in results] == inputs
+    assert (tmp_path / "a.md").read_text() == f"# {inputs[0]}\n"
+
+
+def test_run_batch_records_failures(tmp_path, monkeypatch):
+    """Test a failing item is reported without stopping the batch."""
+    def fake_extract(input_path, config=None, quiet=False):
+        if "bad" in input_path:
+            raise ValueError("broken export")
+        return "text", input_path
+
+    monkeypatch.setattr(batch, "extract_content", fake_extract)
+    monkeypatch.setattr(batch, "structurize_content", lambda raw_text, config, source="": "# ok\n")
+
+    inputs = [str(tmp_path / "bad.html"), str(tmp_path / "good.html")]
+    results = run_batch(inputs, {"output_dir": str(tmp_path), "records_dir": str(tmp_path / "records")})
+
+    assert results[0]["status"] == "failed"
+    assert results[0]["stage"] == "extract"
+    assert results[0]["error"] == "broken export"
+    assert results[1]["status"] == "ok"
+
+    summary = tmp_path / "summary.json"
+    write_summary(results, str(summary))
+    assert json.loads(summary.read_text())[0]["input"] == inputs[0]
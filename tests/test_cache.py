@@ -0,0 +1,100 @@
+"""Tests for on-disk caches."""
+
+import os
+import time
+
+import pytest
+from aichat2md import cli
+from aichat2md.cache import DiskCache, extraction_cache_key, normalize_url
+from aichat2md.extractors import html_extractor
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    """Test values survive a roundtrip with and without compression."""
+    for compress in (True, False):
+        cache = DiskCache(tmp_path / str(compress), compress=compress)
+        cache.put("key", "值 value")
+        assert cache.get("key") == "值 value"
+        assert cache.get("other") is None
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_disk_cache_ttl(tmp_path):
+    """Test expired entries are treated as misses."""
+    cache = DiskCache(tmp_path, ttl=60)
+    cache.put("key", "value")
+    cache.ttl = -1
+    assert cache.get("key") is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """Test eviction removes the oldest-accessed entries first."""
+    cache = DiskCache(tmp_path, max_bytes=10 ** 6, compress=False)
+    cache.put("old", "a" * 400)
+    cache.put("recent", "b" * 400)
+
+    # Make "old" the most recently used entry
+    past = time.time() - 100
+    os.utime(cache._path("recent"), (past, past))
+    assert cache.get("old") is not None
+
+    cache.max_bytes = 1000
+    cache.put("new", "c" * 400)
+
+    assert cache.get("recent") is None
+    assert cache.get("old") is not None
+    assert cache.get("new") is not None
+
+
+def test_disk_cache_scans_only_when_needed(tmp_path, monkeypatch):
+    """Test puts track the size instead of scanning the directory every time."""
+    cache = DiskCache(tmp_path, max_bytes=10 ** 6, compress=False)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for i in range(20):
+        cache.put(f"key{i}", "x" * 100)
+    assert len(scans) == 1
+
+    cache.max_bytes = cache._size + 50
+    cache.put("big", "y" * 200)
+    assert len(scans) == 2 and cache._size <= cache.max_bytes
+
+
+def test_normalize_url():
+    """Test equivalent share links normalize to the same key."""
+    a = normalize_url("HTTPS://ChatGPT.com/share/abc/?utm_source=x#top")
+    b = normalize_url("https://chatgpt.com/share/abc")
+    assert a == b
+
+
+def test_file_key_changes_with_content(tmp_path):
+    """Test file keys change when the file is modified."""
+    path = tmp_path / "chat.html"
+    path.write_text("<p>one</p>")
+    first = extraction_cache_key(str(path))
+    path.write_text("<p>two</p>")
+    assert extraction_cache_key(str(path)) != first
+
+
+def test_extract_content_uses_cache(tmp_path, monkeypatch):
+    """Test a second extraction is served from cache unless refreshed."""
+    calls = []
+
+    def fake_extract(filepath):
+        calls.append(filepath)
+        return "extracted text"
+
+    monkeypatch.setattr(html_extractor, "extract_from_html", fake_extract)
+    path = tmp_path / "chat.html"
+    path.write_text("<p>hi</p>")
+    config = {"cache_dir": str(tmp_path / "cache")}
+
+    assert cli.extract_content(str(path), config, quiet=True) == ("extracted text", "chat.html")
+    assert cli.extract_content(str(path), config, quiet=True) == ("extracted text", "chat.html")
+    assert len(calls) == 1
+
+    cli.extract_content(str(path), dict(config, cache_refresh=True), quiet=True)
+    cli.extract_content(str(path), dict(config, cache=False), quiet=True)
+    assert len(calls) == 3
@@ -0,0 +1,76 @@
+"""Tests for long conversation chunking."""
+
+import pytest
+from aichat2md import chunking
+from aichat2md.chunking import merge_chunk_markdown, split_into_chunks, split_turns
+from aichat2md.tokens import estimate_tokens
+
+
+def test_split_turns_at_markers():
+    """Test turns split at speaker marker lines."""
+    text = "You said:\nHi\nChatGPT said:\nHello\n\nthere\nYou said:\nBye"
+    turns = split_turns(text)
+    assert turns == ["You said:\nHi", "ChatGPT said:\nHello\n\nthere", "You said:\nBye"]
+
+
+def test_split_turns_falls_back_to_paragraphs():
+    """Test unmarked text splits on blank lines."""
+    assert split_turns("one\n\ntwo\n\n\nthree") == ["one", "two", "three"]
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    """Test Chinese text is not underestimated."""
+    assert estimate_tokens("你好" * 100) > estimate_tokens("ab" * 100)
+
+
+def test_split_into_chunks_respects_budget_and_order():
+    """Test chunks stay within budget and preserve turn order."""
+    turns = [f"User:\nquestion {i} " + "word " * 50 for i in range(20)]
+    text = "\n".join(turns)
+    chunks = split_into_chunks(text, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    joined = "\n".join(chunks)
+    assert [joined.index(f"question {i} ") for i in range(20)] == sorted(joined.index(f"question {i} ") for i in range(20))
+
+
+def test_split_into_chunks_splits_oversized_turn():
+    """Test a single turn larger than the budget is still split."""
+    text = "User:\n" + "\n".join("line " * 30 for _ in range(20))
+    chunks = split_into_chunks(text, max_tokens=100)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+
+
+def test_split_into_chunks_uses_count_tokens(monkeypatch):
+    """Test chunks are sized with the model's counter, like the chunking threshold."""
+    models = set()
+
+    def fake_count(text, model=None):
+        models.add(model)
+        return len(text.split())
+
+    monkeypatch.setattr(chunking, "count_tokens", fake_count)
+    text = "\n".join(f"User:\n{'word ' * 30}" for _ in range(4))
+    chunks = split_into_chunks(text, max_tokens=70, model="gpt-4o-mini")
+    assert len(chunks) == 2 and models == {"gpt-4o-mini"}
+
+
+def test_merge_chunk_markdown():
+    """Test chunk outputs merge into one document with one front matter block."""
+    parts = [
+        "---\ntags: [Python, API]\ndate: 2026-01-01\nsource: x\n---\n\n# First Title\n\n"
+        "## Summary\nPart one.\n\n## Key Topics\n- Lists\n\n## Lists\nSlicing.\n\n"
+        "## Code Examples\n```python\nitems[::-1]\n```\n",
+        "---\ntags: [Python, Testing]\n---\n\n# Second Title\n\n"
+        "## Summary\nPart two.\n\n## Key Topics\n- Lists\n- Tests\n\n## Tests\nUse pytest.\n",
+    ]
+    merged = merge_chunk_markdown(parts, "en", lambda tags: f"---\ntags: [{', '.join(tags)}]\n---\n\n")
+
+    assert merged.count("---\n") == 2
+    assert merged.startswith("---\ntags: [Python, API, Testing]\n---")
+    assert "# First Title" in merged and "# Second Title" not in merged
+    assert "Part one.\n\nPart two." in merged
+    assert merged.count("- Lists") == 1
+    assert merged.index("## Lists") < merged.index("## Tests") < merged.index("## Code Examples")
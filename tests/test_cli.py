@@ -1,6 +1,11 @@
 """Tests for CLI interface."""
 
+import subprocess
+import sys
+
 import pytest
+from aichat2md import cli
+from aichat2md.extractors import html_extractor
 from aichat2md.cli import sanitize_filename, generate_filename_from_markdown
 
 
@@ -46,3 +51,56 @@ def test_generate_filename_no_title():
     markdown = "Just some content without a title"
     result = generate_filename_from_markdown(markdown)
     assert "untitled" in result
+
+
+def test_extract_content_preprocesses_unless_disabled(tmp_path, monkeypatch):
+    """Test boilerplate is stripped after extraction and --no-preprocess skips it."""
+    monkeypatch.setattr(html_extractor, "extract_from_html", lambda filepath: "Copy code\nHello\nCopy\nShare")
+    path = tmp_path / "chat.html"
+    path.write_text("<p>hi</p>")
+    config = {"cache": False}
+
+    assert cli.extract_content(str(path), config, quiet=True)[0] == "Hello"
+    assert cli.extract_content(str(path), dict(config, preprocess=False), quiet=True)[0] == "Copy code\nHello\nCopy\nShare"
+
+
+def test_startup_skips_heavy_imports():
+    """Test importing the CLI doesn't load Playwright, requests or yaspin."""
+    code = (
+        "import sys, aichat2md.cli; "
+        "print([m for m in ('playwright', 'requests', 'yaspin', 'aichat2md.structurizer') if m in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_watch_rejects_update(monkeypatch, capsys):
+    """Test --watch with --update is refused instead of ignoring --update."""
+    monkeypatch.setattr("sys.argv", ["aichat2md", "--watch", "--update"])
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert "--update" in capsys.readouterr().out
+
+
+def test_update_prints_why_everything_was_converted(monkeypatch, capsys, tmp_path):
+    """Test --update names the reason for a full conversion and keeps context out of the sent count."""
+    from aichat2md import incremental
+
+    results = [
+        ("full", {"reason": "language_changed", "sent_chars": 99, "total_chars": 99}),
+        ("incremental", {"new_turns": 1, "sent_chars": 40, "context_chars": 75, "total_chars": 99}),
+    ]
+
+    def fake_update(input_path, config, output=None, stats=None):
+        mode, values = results.pop(0)
+        stats.update(values)
+        return tmp_path / "chat.md", mode
+
+    monkeypatch.setattr(cli, "load_config", lambda require_api_key=True: {})
+    monkeypatch.setattr(incremental, "update_conversion", fake_update)
+    monkeypatch.setattr("sys.argv", ["aichat2md", "chat.html", "--update"])
+    cli.main()
+    cli.main()
+    out = capsys.readouterr().out
+    assert "(the earlier conversion was in another language)" in out
+    assert "sent 40 of 99 chars, plus 75 chars of context" in out
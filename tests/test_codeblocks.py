@@ -0,0 +1,43 @@
+"""Tests for code block passthrough."""
+
+from aichat2md.codeblocks import CodeBlockRestorer, protect_code_blocks, restore_code_blocks
+
+
+LONG = "```js\n" + "const x = 1;   \n" * 20 + "```"
+SHORT = "```\nls\n```"
+
+
+def test_protect_replaces_only_long_blocks():
+    """Test blocks under min_chars stay in the text."""
+    text, blocks = protect_code_blocks(f"Intro\n{LONG}\nMiddle\n{SHORT}\nEnd")
+    assert text == f"Intro\n[CODE_BLOCK_1]\nMiddle\n{SHORT}\nEnd"
+    assert blocks == [LONG]
+
+
+def test_protect_leaves_unclosed_fence():
+    """Test an unclosed fence is left untouched."""
+    text = "Intro\n```\n" + "x\n" * 300
+    assert protect_code_blocks(text) == (text, [])
+
+
+def test_restore_handles_model_fences_and_inline_placeholders():
+    """Test placeholders wrapped in a fence or inline are replaced byte-for-byte."""
+    blocks = [LONG, LONG.replace("js", "py")]
+    markdown = "## Code\n\n```js\n[CODE_BLOCK_1]\n```\n\nSee `[CODE_BLOCK_2]` here\n"
+    restored = restore_code_blocks(markdown, blocks)
+    assert restored == f"## Code\n\n{LONG}\n\nSee\n{blocks[1]}\nhere\n"
+
+
+def test_restore_keeps_model_code_and_appends_missing_blocks():
+    """Test the model's own code passes through and unreferenced blocks are appended."""
+    markdown = "# Title\n\n```\n[not a placeholder]\n```\n"
+    restored = restore_code_blocks(markdown, [LONG], "zh")
+    assert restored == f"{markdown}\n## 代码示例\n\n{LONG}\n"
+
+
+def test_streaming_matches_batch():
+    """Test feeding one character at a time gives the same result."""
+    markdown = "# T\n```\n[CODE_BLOCK_1]\n```\ntext [CODE_BLOCK_1] more"
+    restorer = CodeBlockRestorer([LONG])
+    streamed = ''.join(restorer.feed(c) for c in markdown) + restorer.close()
+    assert streamed == restore_code_blocks(markdown, [LONG])
@@ -1,7 +1,10 @@
 """Tests for configuration management."""
 
+import json
+
 import pytest
-from aichat2md.config import validate_config, API_PRESETS, DEFAULT_CONFIG
+from aichat2md import config as config_module
+from aichat2md.config import load_config, validate_config, API_PRESETS, DEFAULT_CONFIG
 
 
 def test_default_config_structure():
@@ -48,3 +51,15 @@ def test_openai_preset():
     preset = API_PRESETS["openai"]
     assert "openai.com" in preset["api_base_url"]
     assert "gpt" in preset["model"].lower()
+
+
+def test_legacy_max_tokens_becomes_auto(tmp_path, monkeypatch):
+    """Test the fixed max_tokens older --setup runs wrote is treated as "auto"."""
+    config_file = tmp_path / "config.json"
+    monkeypatch.setattr(config_module, "CONFIG_FILE", config_file)
+
+    config_file.write_text(json.dumps({"api_key": "k", "max_tokens": 4000}), encoding="utf-8")
+    assert load_config()["max_tokens"] == "auto"
+
+    config_file.write_text(json.dumps({"api_key": "k", "max_tokens": 2000}), encoding="utf-8")
+    assert load_config()["max_tokens"] == 2000
@@ -0,0 +1,33 @@
+"""Tests for streaming HTML extraction."""
+
+from aichat2md.extractors import html_extractor
+from aichat2md.extractors.html_extractor import detect_encoding, extract_from_html, iter_html_text
+
+
+def test_text_split_across_reads_stays_whole(tmp_path, monkeypatch):
+    """Test a text node spanning read blocks is emitted as one chunk."""
+    monkeypatch.setattr(html_extractor, "READ_CHUNK_SIZE", 7)
+    path = tmp_path / "chat.html"
+    path.write_text("<p>Hello streaming world</p><script>var x = 1;</script><p>中文内容</p>", encoding="utf-8")
+
+    assert list(iter_html_text(str(path))) == ["Hello streaming world", "中文内容"]
+
+
+def test_detect_encoding():
+    """Test BOM, meta charset and UTF-8 trial decode detection."""
+    assert detect_encoding(b"\xef\xbb\xbf<html>") == "utf-8-sig"
+    assert detect_encoding(b'<meta charset="GBK"><p>') == "gbk"
+    assert detect_encoding(b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">') == "shift_jis"
+    assert detect_encoding(b"<p>caf\xc3") == "utf-8"
+    assert detect_encoding(b"<p>caf\xe9</p>") == "latin-1"
+
+
+def test_extract_declared_charset(tmp_path):
+    """Test non-UTF-8 files are decoded in a single pass."""
+    path = tmp_path / "chat.htm"
+    path.write_bytes('<meta charset="gbk"><p>你好</p>'.encode("gbk"))
+    assert extract_from_html(str(path)) == "你好"
+
+    latin = tmp_path / "latin.html"
+    latin.write_bytes(b"<p>caf\xe9</p>")
+    assert extract_from_html(str(latin)) == "café"
@@ -0,0 +1,183 @@
+"""Tests for incremental re-conversion (--update)."""
+
+import pytest
+from aichat2md import incremental, structurizer
+from aichat2md.incremental import append_update, conversation_turns, find_new_turns, load_record, record_conversion, update_conversion
+
+
+URL = "https://chatgpt.com/share/abc"
+
+FIRST = "User:\nHow do I sort a dict by value?\n\nAssistant:\nUse sorted(d.items(), key=lambda kv: kv[1])."
+SECOND = FIRST + "\n\nUser:\nAnd in reverse?\n\nAssistant:\nPass reverse=True."
+
+EXISTING = """---
+tags: [Python]
+date: 2024-01-01
+source: https://chatgpt.com/share/abc
+---
+
+# Sorting Dicts in Python
+
+## Summary
+Sorting a dict by its values.
+
+## Key Topics
+- sorted()
+
+## Sorting by Value
+Use sorted with a key function.
+"""
+
+TAIL_DOC = """---
+tags: [Python, Sorting]
+---
+
+# Reverse Order
+
+## Summary
+Reversing the order.
+
+## Key Topics
+- reverse=True
+
+## Reverse Sorting
+Pass reverse=True to sorted.
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {"cache_dir": str(tmp_path / "cache"), "records_dir": str(tmp_path / "records"), "language": "en",
+            "output_dir": str(tmp_path), "api_key": "k", "api_base_url": "https://api.example.com"}
+
+
+def test_find_new_turns():
+    """Test only appended turns count as new; edited history needs a full conversion."""
+    first = conversation_turns(URL, FIRST, {})
+    second = conversation_turns(URL, SECOND, {})
+    assert find_new_turns(first, second) == ["User:\nAnd in reverse?", "Assistant:\nPass reverse=True."]
+    assert find_new_turns(first, conversation_turns(URL, FIRST.replace("\n\n", "\n\n\n"), {})) == []
+    edited = FIRST.replace("value", "key") + "\n\nUser:\nMore?"
+    assert find_new_turns(second, conversation_turns(URL, edited, {})) is None
+
+
+def test_labels_inside_code_do_not_split_turns():
+    """Test a speaker label inside fenced code stays part of its turn."""
+    text = "User:\nWhat does this print?\n```\nUser:\nprint(1)\n```\n\nAssistant:\n1"
+    assert conversation_turns(URL, text, {}) == [
+        "User:\nWhat does this print?\n```\nUser:\nprint(1)\n```", "Assistant:\n1"
+    ]
+
+
+def test_update_sends_only_new_turns_and_merges(tmp_path, config, monkeypatch):
+    """Test an update sends the new tail with context and merges it into the earlier file."""
+    output = tmp_path / "2024-01-01-Sorting Dicts in Python.md"
+    output.write_text(EXISTING, encoding="utf-8")
+    record_conversion(URL, FIRST, output, config)
+
+    requests = []
+
+    def fake_request(text, system_prompt, config, stats=None):
+        requests.append((text, system_prompt))
+        return TAIL_DOC
+
+    monkeypatch.setattr(incremental, "extract_content", lambda path, config, quiet=False: (SECOND, path))
+    monkeypatch.setattr(structurizer, "_request_completion", fake_request)
+
+    stats = {}
+    assert update_conversion(URL + "?utm_source=x", config, stats=stats) == (output, "incremental")
+    assert stats["new_turns"] == 2
+
+    (text, prompt), = requests
+    assert text == "User:\nAnd in reverse?\n\nAssistant:\nPass reverse=True."
+    assert stats["sent_chars"] == len(text) <= stats["total_chars"] == len(SECOND)
+    assert 0 < stats["context_chars"] < len(prompt)
+    assert "Use sorted(d.items()" not in text
+    assert "# Sorting Dicts in Python" in prompt and "- Sorting by Value" in prompt
+
+    # The existing document is untouched apart from the tags and summary insertions
+    merged = output.read_text(encoding="utf-8")
+    assert merged == (
+        EXISTING.replace("tags: [Python]", "tags: [Python, Sorting]")
+        .replace("Sorting a dict by its values.\n", "Sorting a dict by its values.\n\nReversing the order.\n")
+        + "\n## Reverse Sorting\nPass reverse=True to sorted.\n"
+    )
+
+    # The record now covers the new turns, so a second update has nothing to send
+    assert update_conversion(URL, config) == (output, "unchanged")
+    assert len(requests) == 1
+
+
+def test_update_without_record_converts_everything(tmp_path, config, monkeypatch):
+    """Test the first update, or one after history changed, structurizes the whole conversation."""
+    monkeypatch.setattr(incremental, "extract_content", lambda path, config, quiet=False: (FIRST, path))
+    monkeypatch.setattr(incremental, "structurize_content", lambda text, config, source="": EXISTING)
+
+    stats = {}
+    output_path, mode = update_conversion(URL, config, stats=stats)
+    assert mode == "full" and output_path.parent == tmp_path
+    assert output_path.read_text(encoding="utf-8") == EXISTING
+    assert stats["reason"] == "no_record" and stats["sent_chars"] == len(FIRST)
+
+    edited = FIRST.replace("value", "key")
+    monkeypatch.setattr(incremental, "extract_content", lambda path, config, quiet=False: (edited, path))
+    assert update_conversion(URL, config, stats=stats) == (output_path, "full")
+    assert stats["reason"] == "history_changed"
+    assert sorted(p.name for p in tmp_path.glob("*.md")) == [output_path.name]
+
+    assert update_conversion(URL, dict(config, language="zh"), stats=stats) == (output_path, "full")
+    assert stats["reason"] == "language_changed"
+
+    output_path.unlink()
+    assert update_conversion(URL, dict(config, language="zh"), stats=stats) == (output_path, "full")
+    assert stats["reason"] == "output_missing"
+
+
+def test_records_ignore_cache_settings(tmp_path, config):
+    """Test records survive with caching off and outside the cache directory."""
+    output = tmp_path / "chat.md"
+    record_conversion(URL, FIRST, output, dict(config, cache=False, cache_max_mb=0))
+    assert not (tmp_path / "cache").exists()
+
+    record = load_record(URL + "#frag", dict(config, cache=False))
+    assert record["turns"] == conversation_turns(URL, FIRST, {}) and record["output"] == str(output.resolve())
+    assert load_record("https://chatgpt.com/share/other", config) is None
+
+
+def _mhtml(html):
+    return (
+        "MIME-Version: 1.0\r\nContent-Type: multipart/related; type=\"text/html\"; boundary=\"B\"\r\n\r\n"
+        f"--B\r\nContent-Type: text/html; charset=utf-8\r\n\r\n{html}\r\n--B--\r\n"
+    )
+
+
+def _turn(role, text):
+    return f"<div data-message-author-role='{role}'><p>{text}</p><p>Second paragraph of {text}</p></div>"
+
+
+@pytest.mark.parametrize("suffix, wrap", [(".html", lambda html: html), (".mhtml", _mhtml)])
+def test_update_unlabelled_export_sends_only_new_turns(tmp_path, config, monkeypatch, suffix, wrap):
+    """Test an export whose text has no speaker labels is compared by its DOM turns."""
+    turns = [_turn("user", "How do I sort a dict by value?"), _turn("assistant", "Use sorted with a key.")]
+    path = tmp_path / f"chat{suffix}"
+    path.write_text(wrap("".join(turns)), encoding="utf-8")
+    monkeypatch.setattr(incremental, "structurize_content", lambda text, config, source="": EXISTING)
+    output_path, mode = update_conversion(str(path), config)
+    assert mode == "full"
+
+    sent = []
+    monkeypatch.setattr(incremental, "structurize_new_turns", lambda text, context, config, source: sent.append(text) or TAIL_DOC)
+    turns += [_turn("user", "And in reverse?"), _turn("assistant", "Pass reverse=True.")]
+    path.write_text(wrap("".join(turns)), encoding="utf-8")
+    assert update_conversion(str(path), config) == (output_path, "incremental")
+    assert sent == [
+        "User:\nAnd in reverse?\nSecond paragraph of And in reverse?\n\n"
+        "Assistant:\nPass reverse=True.\nSecond paragraph of Pass reverse=True."
+    ]
+
+
+def test_append_update_preserves_existing_body():
+    """Test an update appends sections without reordering or rewriting the existing document."""
+    existing = EXISTING + "\n## Code Examples\n```python\n## not a heading\n```\n\nHand-written note.\n"
+    part = "---\ntags: [Python]\n---\n\n# Other\n\n## Key Topics\n- x\n\n## Code Examples\n```python\nx = 1\n```\n"
+    assert append_update(existing, part, "en") == existing + "\n## Code Examples\n```python\nx = 1\n```\n"
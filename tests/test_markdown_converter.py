@@ -0,0 +1,102 @@
+"""Tests for local (--raw) Markdown conversion."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from aichat2md import cli, config as config_module, structurizer
+from aichat2md.extractors.html_markdown import MarkdownCollector, join_blocks
+from aichat2md.extractors.text_engine import BACKEND_ORDER, create_parser
+from aichat2md.markdown_converter import convert_to_markdown
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "turns"
+
+HTML = (
+    "<h2>Plan</h2><p>Use <b>bold</b>, <code>code</code> and <a href='https://x.dev'>a link</a>.</p>"
+    "<ul><li>one<ul><li>nested</li></ul></li><li>two</li></ul><ol><li>first</li></ol>"
+    "<table><tr><th>Name</th><th>Pipe</th></tr><tr><td>a</td><td>x|y</td></tr></table>"
+    "<blockquote><p>quoted</p></blockquote><p># not a heading</p>"
+)
+
+EXPECTED = """## Plan
+
+Use **bold**, `code` and [a link](https://x.dev).
+
+- one
+  - nested
+- two
+
+1. first
+
+| Name | Pipe |
+| --- | --- |
+| a | x\\|y |
+
+> quoted
+
+\\# not a heading"""
+
+
+@pytest.mark.parametrize("backend", BACKEND_ORDER)
+def test_markdown_collector(backend):
+    """Test HTML structure becomes the same Markdown on every backend."""
+    pytest.importorskip({"lxml": "lxml.etree", "selectolax": "selectolax.lexbor", "stdlib": "html.parser"}[backend])
+    parser = create_parser(backend, MarkdownCollector)
+    parser.feed(HTML)
+    parser.close()
+    assert join_blocks(parser.pop_chunks()) == EXPECTED
+
+
+def test_convert_html_export():
+    """Test an export becomes front matter, a title and one section per turn."""
+    markdown, source = convert_to_markdown(str(FIXTURES / "chatgpt.html"), {"language": "en"})
+
+    assert source == "chatgpt.html"
+    assert markdown.startswith("---\ntags: []\n")
+    assert "# How do I sort a dict by value?\n\n## User\n\nHow do I sort a dict by value?\n\n## Assistant\n" in markdown
+    assert "```python\nsorted(d.items(), key=lambda kv: kv[1])\n```" in markdown
+    assert markdown.endswith("## User\n\n谢谢！\n")
+    assert "Open sidebar" not in markdown
+
+
+def test_raw_keeps_turn_text_verbatim(tmp_path):
+    """Test --raw renders turns as extracted, without boilerplate filtering."""
+    path = tmp_path / "chat.html"
+    path.write_text(
+        "<div data-message-author-role='user'><p>Edit</p></div>"
+        "<div data-message-author-role='assistant'><p>Share</p><p>Copy</p></div>",
+        encoding="utf-8",
+    )
+    markdown, _ = convert_to_markdown(str(path), {"language": "en"})
+    assert markdown.endswith("## User\n\nEdit\n\n## Assistant\n\nShare\n\nCopy\n")
+
+
+def test_raw_cli_needs_no_api_key(tmp_path, monkeypatch, capsys):
+    """Test --raw runs without a config file and never calls the API."""
+    monkeypatch.setattr(config_module, "CONFIG_FILE", tmp_path / "missing.json")
+    monkeypatch.setattr(structurizer, "structurize_content", lambda *args: pytest.fail("API called"))
+    monkeypatch.setattr("sys.argv", ["aichat2md", str(FIXTURES / "chatgpt.html"), "--raw", "-o", "-"])
+
+    cli.main()
+
+    assert "## Assistant" in capsys.readouterr().out
+
+
+def test_raw_conversion_skips_api_imports(tmp_path):
+    """Test a --raw conversion never loads requests or the structurizer."""
+    code = (
+        "import sys\n"
+        f"sys.argv = ['aichat2md', {str(FIXTURES / 'chatgpt.html')!r}, '--raw', '--no-daemon', '-o', '-']\n"
+        "from aichat2md.cli import main\n"
+        "try:\n"
+        "    main()\n"
+        "finally:\n"
+        "    print([m for m in ('requests', 'aichat2md.structurizer') if m in sys.modules], file=sys.stderr)\n"
+    )
+    env = dict(os.environ, HOME=str(tmp_path))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert "## Assistant" in result.stdout
+    assert result.stderr.strip().splitlines()[-1] == "[]"
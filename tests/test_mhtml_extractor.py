@@ -0,0 +1,25 @@
+"""Tests for MHTML extraction."""
+
+from pathlib import Path
+
+from aichat2md.extractors.mhtml_extractor import extract_from_mhtml
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "mhtml" / "chat.mhtml"
+
+
+def test_extracts_only_root_html():
+    """Test the MIME envelope, images and subframes stay out of the text."""
+    text = extract_from_mhtml(str(FIXTURE))
+
+    assert text.startswith("Shared chat\nHow do I reverse a list in Python? 我想知道。")
+    assert "soft line break somewhere." in text
+    for leaked in ("MultipartBoundary", "Content-Type", "=3D", "=\n", "AAECAwQF", "Advertisement frame"):
+        assert leaked not in text
+
+
+def test_plain_html_with_mhtml_suffix(tmp_path):
+    """Test a file without a MIME envelope is parsed as HTML."""
+    path = tmp_path / "chat.mhtml"
+    path.write_text("<html><body><p>Hello</p>\n\n<p>World</p></body></html>", encoding="utf-8")
+    assert extract_from_mhtml(str(path)) == "Hello\nWorld"
@@ -0,0 +1,249 @@
+"""Tests for the Playwright URL extractor (no real browser needed)."""
+
+import asyncio
+
+import pytest
+from aichat2md.extractors import playwright_extractor
+from aichat2md.extractors.platforms import detect_platform
+from aichat2md.extractors.readiness import get_readiness_profile, wait_until_ready
+from aichat2md.extractors.resource_blocking import ResourceBlocker, get_blocking_profile
+from aichat2md.extractors.playwright_extractor import (
+    BrowserPool,
+    _get_context_options,
+    _get_wait_strategy,
+    _make_route_handler,
+)
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.routes = []
+        self.init_scripts = []
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    def on(self, event, handler):
+        return None
+
+    async def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.context.browser.visited.append((url, wait_until))
+
+    async def wait_for_selector(self, selector, timeout=None):
+        return None
+
+    async def wait_for_timeout(self, ms):
+        self.context.browser.slept.append(ms)
+
+    async def evaluate(self, script, arg=None):
+        return True
+
+    async def inner_text(self, selector):
+        browser = self.context.browser
+        browser.active += 1
+        browser.peak = max(browser.peak, browser.active)
+        await asyncio.sleep(0.01)
+        browser.active -= 1
+        return f"  text from {self.context.browser.visited[-1][0]}  "
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.visited = []
+        self.active = 0
+        self.peak = 0
+        self.launches = 0
+        self.slept = []
+
+    async def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        return None
+
+
+class FakeChromium:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def launch(self, **kwargs):
+        self.browser.launches += 1
+        return self.browser
+
+
+class FakePlaywright:
+    def __init__(self, browser):
+        self.chromium = FakeChromium(browser)
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        return None
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    browser = FakeBrowser()
+    monkeypatch.setattr(playwright_extractor, "async_playwright", lambda: FakePlaywright(browser))
+    return browser
+
+
+def testdetect_platform():
+    """Test platform detection from share URLs."""
+    assert detect_platform("https://gemini.google.com/share/x") == "gemini"
+    assert detect_platform("https://www.doubao.com/thread/x") == "doubao"
+    assert detect_platform("https://claude.ai/share/x") == "claude"
+    assert detect_platform("https://chatgpt.com/share/x") == "chatgpt"
+
+
+def test_platform_setup_helpers():
+    """Test per-platform context options and wait strategy."""
+    assert "user_agent" in _get_context_options("claude")
+    assert _get_context_options("gemini") == {}
+    assert _get_wait_strategy("gemini") == "load"
+    assert _get_wait_strategy("default") == "networkidle"
+
+
+def test_browser_pool_reuses_browser(fake_browser):
+    """Test one launch serves many URLs, each in its own closed context."""
+    with BrowserPool(max_pages=2, block_resources=False) as pool:
+        first = pool.extract("https://chatgpt.com/share/1")
+        second = pool.extract("https://claude.ai/share/2")
+
+    assert first == "text from https://chatgpt.com/share/1"
+    assert second == "text from https://claude.ai/share/2"
+    assert fake_browser.launches == 1
+    assert all(context.closed for context in fake_browser.contexts)
+    # Claude stealth setup is applied to its context only
+    assert fake_browser.contexts[0].pages[0].routes == []
+    assert fake_browser.contexts[1].pages[0].routes == ["**/*"]
+
+
+def test_browser_pool_limits_concurrent_pages(fake_browser):
+    """Test concurrent extractions never exceed max_pages."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with BrowserPool(max_pages=2) as pool:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            urls = [f"https://chatgpt.com/share/{i}" for i in range(6)]
+            results = list(executor.map(pool.extract, urls))
+
+    assert len(results) == 6
+    assert fake_browser.peak <= 2
+
+
+def test_browser_pool_skips_fixed_sleep_when_ready(fake_browser):
+    """Test a settled page is extracted without the fallback sleep."""
+    with BrowserPool() as pool:
+        pool.extract("https://gemini.google.com/share/1")
+
+    assert fake_browser.slept == []
+
+
+def test_readiness_profile_overrides():
+    """Test config overrides are merged over platform defaults."""
+    profile = get_readiness_profile("chatgpt", {"chatgpt": {"quiet_ms": 50}})
+    assert profile["quiet_ms"] == 50
+    assert profile["selector"] == "[data-message-author-role]"
+    assert get_readiness_profile("unknown")["selector"] == "main"
+
+
+def test_wait_until_ready_falls_back_to_sleep():
+    """Test the fixed sleep is used when the selector never appears."""
+    class MissingSelectorPage:
+        slept = []
+
+        async def wait_for_selector(self, selector, timeout=None):
+            raise playwright_extractor.PlaywrightTimeoutError("timeout")
+
+        async def wait_for_timeout(self, ms):
+            self.slept.append(ms)
+
+    page = MissingSelectorPage()
+    mode = asyncio.run(wait_until_ready(page, get_readiness_profile("doubao"), fallback_ms=3000))
+    assert mode == "fallback"
+    assert page.slept == [3000]
+
+
+def test_resource_blocker_profile():
+    """Test media and telemetry are blocked while documents and scripts pass."""
+    blocker = ResourceBlocker(get_blocking_profile("gemini"))
+
+    assert blocker.should_block("image", "https://gemini.google.com/logo.png")
+    assert blocker.should_block("xhr", "https://play.google.com/log?format=json")
+    assert not blocker.should_block("document", "https://gemini.google.com/share/1")
+    assert not blocker.should_block("stylesheet", "https://gemini.google.com/app.css")
+
+    stats = blocker.stats()
+    assert stats["blocked_requests"] == 2
+    assert stats["blocked_by_type"] == {"image": 1, "xhr": 1}
+    assert stats["allowed_requests"] == 2
+
+
+def test_blocking_profile_overrides():
+    """Test config can change resource types for one platform."""
+    profile = get_blocking_profile("doubao", {"doubao": {"resource_types": ["image"]}})
+    assert profile["resource_types"] == ["image"]
+    assert "mcs.zijieapi.com" in profile["url_patterns"]
+
+
+def test_route_handler_blocks_before_claude_rewrite():
+    """Test blocked requests are aborted and the rest reach the Claude handler."""
+    class FakeRequest:
+        def __init__(self, resource_type, url):
+            self.resource_type = resource_type
+            self.url = url
+
+    class FakeRoute:
+        def __init__(self, resource_type, url):
+            self.request = FakeRequest(resource_type, url)
+            self.action = None
+
+        async def abort(self):
+            self.action = "abort"
+
+        async def fallback(self):
+            self.action = "fallback"
+
+    handler = _make_route_handler("claude", ResourceBlocker(get_blocking_profile("claude")))
+    image = FakeRoute("image", "https://claude.ai/a.png")
+    script = FakeRoute("script", "https://claude.ai/app.js")
+    asyncio.run(handler(image))
+    asyncio.run(handler(script))
+
+    assert image.action == "abort"
+    assert script.action == "fallback"
+
+
+def test_browser_pool_reports_blocking_stats(fake_browser):
+    """Test per-page stats are returned and blocking routes every page."""
+    stats = {}
+    with BrowserPool() as pool:
+        pool.extract("https://chatgpt.com/share/1", stats)
+
+    assert stats["blocked_requests"] == 0
+    assert fake_browser.contexts[0].pages[0].routes == ["**/*"]
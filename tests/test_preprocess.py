@@ -0,0 +1,67 @@
+"""Tests for boilerplate preprocessing."""
+
+from pathlib import Path
+
+import pytest
+from aichat2md.preprocess import detect_platform, preprocess_text
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "preprocess"
+
+# (fixture, platform, text that must survive, UI text that must go)
+CASES = [
+    ("chatgpt", "You said:\nHow do I read a large CSV file", "    process(chunk)",
+     ["Copy code", "Voice", "ChatGPT can make mistakes", "personalized data", "By messaging ChatGPT"]),
+    ("gemini", "DNS mostly uses UDP on port 53", "Which one does DNS use?",
+     ["volume_up", "content_copy", "Published March", "Opens in a new window", "Gemini may display"]),
+    ("doubao", "豆包\n下面是一个简单的实现", "        if n % i == 0:",
+     ["复制", "重新生成", "内容由豆包", "下载电脑版", "点赞"]),
+    ("claude", "Claude:\nUse a plural noun", "users_by_id reads well",
+     ["This is a copy of a chat", "Retry", "Claude can make mistakes", "Start your own conversation"]),
+]
+
+
+@pytest.mark.parametrize("name, kept, also_kept, removed", CASES)
+def test_platform_boilerplate_removed(name, kept, also_kept, removed):
+    """Test UI strings are dropped and conversation content survives."""
+    text = (FIXTURES / f"{name}.txt").read_text(encoding="utf-8")
+    stats = {}
+    cleaned = preprocess_text(text, f"{name}.html", stats=stats)
+
+    assert stats["platform"] == name
+    assert kept in cleaned and also_kept in cleaned
+    for ui in removed:
+        assert ui not in cleaned
+    assert stats["tokens_saved"] > 0
+    assert stats["chars_after"] < stats["chars_before"]
+
+
+def test_duplicates_and_blank_lines_collapse():
+    """Test repeated lines and blank runs collapse, indented code stays."""
+    text = "Same line here\nSame line here\n\n\n\nNext\n    x = 1\n    x = 1\n}\n}"
+    assert preprocess_text(text) == "Same line here\n\nNext\n    x = 1\n    x = 1\n}\n}"
+
+
+def test_fenced_code_untouched():
+    """Test nothing inside ``` fences is filtered."""
+    text = "```\nCopy\nCopy  \n\n\n```\nCopy\nShare"
+    assert preprocess_text(text) == "```\nCopy\nCopy  \n\n\n```"
+
+
+def test_one_word_message_survives():
+    """Test button labels are only dropped among other UI lines, not as a message."""
+    text = "You said:\nEdit\nChatGPT said:\nWhat should I edit?\nCopy\nShare\nEdit"
+    assert preprocess_text(text, "chat.html") == "You said:\nEdit\nChatGPT said:\nWhat should I edit?"
+    assert preprocess_text("User:\n分享\n\n助手:\n好的", "https://www.doubao.com/thread/1") == "User:\n分享\n\n助手:\n好的"
+
+
+def test_config_adds_boilerplate():
+    """Test extra per-platform lines can come from config."""
+    config = {"boilerplate": {"default": {"lines": ["Upgrade plan"], "controls": ["Pin"], "patterns": [r"Ad: .*"]}}}
+    assert preprocess_text("Upgrade plan\nPin\nAd: buy now\nHello\nPin", config=config) == "Hello\nPin"
+
+
+def test_detect_platform_from_url():
+    """Test the source URL wins over content signatures."""
+    assert detect_platform("", "https://gemini.google.com/share/abc") == "gemini"
+    assert detect_platform("nothing recognizable") == "default"
@@ -0,0 +1,57 @@
+"""Tests for per-provider rate limiting."""
+
+import asyncio
+
+from aichat2md import rate_limit
+from aichat2md.rate_limit import RateLimiter, TokenBucket, detect_provider, get_rate_limits
+
+
+def test_token_bucket_queues_reservations():
+    """Test reservations beyond capacity wait in arrival order."""
+    bucket = TokenBucket(capacity=2, refill_per_second=1)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert 0.9 < bucket.reserve(1) <= 1.0
+    assert 1.9 < bucket.reserve(1) <= 2.0
+
+
+def test_rate_limiter_enforces_tokens_per_minute(monkeypatch):
+    """Test the token budget delays requests that exceed TPM."""
+    sleeps = []
+    monkeypatch.setattr(rate_limit.time, "sleep", sleeps.append)
+
+    limiter = RateLimiter(rpm=None, tpm=6000)
+    limiter.acquire(6000)
+    limiter.acquire(3000)
+
+    assert len(sleeps) == 1
+    assert 29 < sleeps[0] <= 30
+
+
+def test_rate_limiter_async_does_not_block_loop():
+    """Test async acquisition waits with asyncio.sleep."""
+    limiter = RateLimiter(rpm=600)
+    limiter._requests._level = 0
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(3):
+                ticks.append(1)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(limiter.acquire_async(1), ticker())
+        return ticks
+
+    assert len(asyncio.run(main())) == 3
+    assert limiter.waited > 0
+
+
+def test_rate_limits_come_from_presets_and_config():
+    """Test preset defaults and per-provider overrides."""
+    groq = {"api_base_url": "https://api.groq.com/openai/v1/"}
+    assert detect_provider(groq) == "groq"
+    assert get_rate_limits(groq) == (30, 12000)
+    assert get_rate_limits(dict(groq, rate_limits={"groq": {"tpm": 100000}})) == (30, 100000)
+    assert get_rate_limits({"api_base_url": "http://localhost:8000"}) == (None, None)
@@ -0,0 +1,100 @@
+"""Tests for the local conversion daemon and its client."""
+
+import base64
+import threading
+from pathlib import Path
+
+import pytest
+from aichat2md import cli, config as config_module, incremental, server
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "turns" / "chatgpt.html"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    conversion_server = server.ConversionServer(
+        {"cache": False, "language": "en"}, port=0, workers=2, state_file=tmp_path / "serve.json"
+    )
+    conversion_server.write_state()
+    thread = threading.Thread(target=conversion_server.serve_forever, daemon=True)
+    thread.start()
+    yield conversion_server
+    conversion_server.shutdown()
+    thread.join()
+
+
+def test_daemon_runs_jobs_for_token_holders(daemon):
+    """Test jobs need the token, run on the daemon and are kept for polling."""
+    state = server.find_daemon(daemon.state_file)
+    assert state["port"] == daemon.address[1]
+
+    markdown, source = server.convert_with_daemon(state, str(FIXTURE), {"raw": True})
+    assert source == "chatgpt.html"
+    assert "## User\n\nHow do I sort a dict by value?" in markdown
+
+    upload = {"filename": "chat.html", "content_base64": base64.b64encode(FIXTURE.read_bytes()).decode(), "wait": True,
+              "options": {"raw": True}}
+    job = server._request(state, "POST", "/jobs", upload)
+    assert job["status"] == "done" and "## Assistant" in job["markdown"]
+    assert server._request(state, "GET", f"/jobs/{job['id']}")["markdown"] == job["markdown"]
+
+    with pytest.raises(FileNotFoundError):
+        server.convert_with_daemon(state, str(FIXTURE.with_name("missing.html")), {"raw": True})
+    with pytest.raises(RuntimeError, match="401"):
+        server._request(dict(state, token="wrong"), "GET", f"/jobs/{job['id']}")
+
+
+@pytest.mark.parametrize("body", [[], "x", 1])
+def test_daemon_rejects_jobs_that_are_not_objects(daemon, body):
+    """Test a JSON body that isn't an object is a 400 with a JSON error, like malformed JSON."""
+    state = server.find_daemon(daemon.state_file)
+    with pytest.raises(RuntimeError, match="400 Job must be a JSON object"):
+        server._request(state, "POST", "/jobs", body)
+
+
+def test_daemon_cleans_up_state_file(tmp_path):
+    """Test the state file is private and removed on shutdown, so clients stop using it."""
+    conversion_server = server.ConversionServer({}, port=0, state_file=tmp_path / "serve.json")
+    conversion_server.write_state()
+    assert conversion_server.state_file.stat().st_mode & 0o777 == 0o600
+    conversion_server.close()
+    assert not conversion_server.state_file.exists()
+    assert server.find_daemon(conversion_server.state_file) is None
+
+
+def test_cli_uses_running_daemon(monkeypatch, capsys):
+    """Test a single conversion is sent to the daemon with the CLI flags as options."""
+    calls = []
+
+    def fake_convert(daemon, input_path, options, stats=None):
+        calls.append((input_path, options))
+        return "# From daemon\n", "chat.html"
+
+    monkeypatch.setattr(server, "find_daemon", lambda: {"host": "127.0.0.1", "port": 1, "pid": 7})
+    monkeypatch.setattr(server, "convert_with_daemon", fake_convert)
+    monkeypatch.setattr("sys.argv", ["aichat2md", "chat.html", "--lang", "zh", "-o", "-"])
+
+    cli.main()
+
+    assert capsys.readouterr().out == "# From daemon\n"
+    assert calls == [("chat.html", {"language": "zh"})]
+
+
+def test_cli_records_daemon_conversions(tmp_path, monkeypatch):
+    """Test a structurized daemon result is recorded, so --update can extend it."""
+    def fake_convert(daemon, input_path, options, stats=None):
+        stats.update(text="User:\nHi\n\nAssistant:\nHello", seconds=1.0)
+        return "# From daemon\n", "chat.html"
+
+    monkeypatch.setattr(config_module, "CONFIG_FILE", tmp_path / "missing.json")
+    monkeypatch.setattr(incremental, "RECORDS_DIR", tmp_path / "records")
+    monkeypatch.setattr(server, "find_daemon", lambda: {"host": "127.0.0.1", "port": 1, "pid": 7})
+    monkeypatch.setattr(server, "convert_with_daemon", fake_convert)
+    monkeypatch.setattr("sys.argv", ["aichat2md", "chat.html", "-o", str(tmp_path / "chat.md")])
+
+    cli.main()
+
+    record = incremental.load_record("chat.html", {})
+    assert record["output"] == str((tmp_path / "chat.md").resolve())
+    assert record["turns"] == ["User:\nHi", "Assistant:\nHello"]
@@ -0,0 +1,65 @@
+"""Tests for the browser-free share page extractor."""
+
+from pathlib import Path
+
+import pytest
+from aichat2md.extractors import share_page_extractor
+from aichat2md.extractors.share_page_extractor import (
+    extract_from_share_page,
+    parse_share_page,
+    turns_to_text,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "share_pages"
+
+EXPECTED_TURNS = [
+    {"role": "user", "text": "How do I reverse a list in Python?"},
+    {"role": "assistant", "text": "Use slicing:\n\n```python\nitems[::-1]\n```"},
+    {"role": "user", "text": "And in place?"},
+    {"role": "assistant", "text": "Call `items.reverse()`."},
+]
+
+
+@pytest.mark.parametrize("fixture", [
+    "chatgpt_next_data.html",
+    "chatgpt_remix.html",
+    "chatgpt_turbo_stream.html",
+])
+def test_parse_share_page_payload_formats(fixture):
+    """Test conversation is rebuilt in order along the current branch."""
+    html = (FIXTURES / fixture).read_text(encoding="utf-8")
+    assert parse_share_page(html) == EXPECTED_TURNS
+
+
+def test_parse_share_page_without_payload():
+    """Test pages without embedded data are reported as missing."""
+    html = (FIXTURES / "no_payload.html").read_text(encoding="utf-8")
+    assert parse_share_page(html) is None
+
+
+def test_turns_to_text():
+    """Test turns render with speaker labels."""
+    text = turns_to_text(EXPECTED_TURNS[:2])
+    assert text.startswith("User:\nHow do I reverse")
+    assert "\n\nAssistant:\nUse slicing:" in text
+
+
+def test_extract_from_share_page_skips_client_rendered_platforms(monkeypatch):
+    """Test Gemini/Doubao URLs go straight to the browser without a fetch."""
+    def fail_get(*args, **kwargs):
+        raise AssertionError("should not fetch")
+
+    monkeypatch.setattr(share_page_extractor.requests, "get", fail_get)
+    assert extract_from_share_page("https://gemini.google.com/share/x") is None
+
+
+def test_extract_from_share_page_falls_back_when_missing(monkeypatch):
+    """Test a page without payload returns None so callers use the browser."""
+    class FakeResponse:
+        text = (FIXTURES / "no_payload.html").read_text(encoding="utf-8")
+
+        def raise_for_status(self):
+            return None
+
+    monkeypatch.setattr(share_page_extractor.requests, "get", lambda *a, **k: FakeResponse())
+    assert extract_from_share_page("https://chatgpt.com/share/x") is None
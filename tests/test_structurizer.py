@@ -0,0 +1,288 @@
+"""Tests for AI structurization."""
+
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+from aichat2md import structurizer
+from aichat2md.structurizer import astructurize_content, stream_structurize, structurize_content
+from aichat2md.tokens import count_tokens
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise structurizer.requests.exceptions.HTTPError(response=self)
+
+    def close(self):
+        return None
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}]}
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "api_key": "sk-test",
+        "api_base_url": "https://api.example.com",
+        "model": "test-model",
+        "language": "en",
+        "cache_dir": str(tmp_path / "cache"),
+    }
+
+
+@pytest.fixture
+def posts(monkeypatch):
+    calls = []
+
+    def fake_post(session, url, headers=None, json=None, timeout=None, **kwargs):
+        calls.append(json)
+        return FakeResponse("---\ntags: []\n---\n\n# Title\n")
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    return calls
+
+
+def test_structurize_adds_front_matter(config, monkeypatch):
+    """Test front matter is added when the model omits it."""
+    monkeypatch.setattr(structurizer.requests.Session, "post", lambda *a, **k: FakeResponse("# Title\n"))
+    markdown = structurize_content("raw", dict(config, cache=False), "chat.html")
+    assert markdown.startswith("---\ntags: []\n")
+    assert "source: chat.html" in markdown
+
+
+def test_response_cache_reuses_identical_requests(config, posts):
+    """Test an identical request is answered from cache."""
+    first_stats, second_stats = {}, {}
+    first = structurize_content("raw text", config, "src", first_stats)
+    second = structurize_content("raw text", config, "src", second_stats)
+
+    assert first == second
+    assert len(posts) == 1
+    assert first_stats["cache_hit"] is False
+    assert second_stats["cache_hit"] is True
+
+
+def test_response_cache_misses_on_any_payload_change(config, posts, monkeypatch):
+    """Test model, text and prompt changes all bypass old entries."""
+    structurize_content("raw text", config, "src")
+    structurize_content("raw text", dict(config, model="other"), "src")
+    structurize_content("other text", config, "src")
+
+    monkeypatch.setattr(structurizer, "load_system_prompt", lambda language: "edited prompt")
+    structurize_content("raw text", config, "src")
+
+    assert len(posts) == 4
+
+
+def test_response_cache_refresh(config, posts):
+    """Test --refresh skips the cached response."""
+    structurize_content("raw text", config, "src")
+    structurize_content("raw text", dict(config, cache_refresh=True), "src")
+    assert len(posts) == 2
+
+
+def test_long_content_is_chunked_and_merged(config, posts):
+    """Test input above the threshold is sent as several requests and merged."""
+    raw_text = "\n".join(f"User:\nquestion {i}\nAssistant:\n" + "answer " * 40 for i in range(10))
+    stats = {}
+    markdown = structurize_content(
+        raw_text, dict(config, chunk_threshold_tokens=200, chunk_max_tokens=150), "src", stats
+    )
+
+    assert stats["chunks"] == len(posts) > 1
+    assert markdown.count("# Title") == 1
+    assert markdown.startswith("---\ntags: []")
+    assert any("part 1 of" in post["messages"][0]["content"] for post in posts)
+
+
+def test_async_structurize_runs_concurrently(config, posts):
+    """Test the async structurizer handles several conversions at once."""
+    async def main():
+        return await asyncio.gather(*(astructurize_content(f"text {i}", config, "src") for i in range(3)))
+
+    results = asyncio.run(main())
+    assert len(posts) == 3
+    assert all(markdown.startswith("---\ntags: []") for markdown in results)
+
+
+def test_async_requests_use_api_executor(config, monkeypatch):
+    """Test awaited requests run on the shared API threads, not the loop's default executor."""
+    threads = []
+
+    def fake_post(session, url, headers=None, json=None, timeout=None, **kwargs):
+        threads.append(threading.current_thread().name)
+        return FakeResponse("# Title\n")
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    asyncio.run(astructurize_content("text", config, "src"))
+    assert threads and threads[0].startswith("aichat2md-api")
+    assert structurizer.get_api_executor()._max_workers <= structurizer.API_POOL_SIZE
+
+
+def test_client_retries_rate_limits_with_retry_after(monkeypatch):
+    """Test 429s are retried, honouring Retry-After, before succeeding."""
+    responses = [
+        FakeResponse("", 429, {"Retry-After": "2"}),
+        FakeResponse("", 503),
+        FakeResponse("# Title\n"),
+    ]
+    sleeps = []
+    monkeypatch.setattr(structurizer.requests.Session, "post", lambda *a, **k: responses.pop(0))
+    monkeypatch.setattr(structurizer.time, "sleep", sleeps.append)
+
+    client = structurizer.LLMClient(backoff_base=0.5)
+    response = client.post("https://api.example.com")
+
+    assert response.status_code == 200
+    assert sleeps[0] == 2.0 and 0 <= sleeps[1] <= 1.0
+    assert client.retries == 2
+
+
+def test_client_caps_total_retry_time(monkeypatch):
+    """Test retrying stops once the total wait budget would be exceeded."""
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(1)
+        return FakeResponse("", 429, {"Retry-After": "30"})
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    monkeypatch.setattr(structurizer.time, "sleep", lambda seconds: None)
+
+    response = structurizer.LLMClient(max_retry_seconds=45).post("https://api.example.com")
+    assert response.status_code == 429
+    assert len(calls) == 2
+
+
+def test_client_retries_connection_errors(monkeypatch):
+    """Test dropped connections are retried and the last error is raised."""
+    def fake_post(*args, **kwargs):
+        raise structurizer.requests.exceptions.ConnectionError("reset")
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    sleeps = []
+    monkeypatch.setattr(structurizer.time, "sleep", sleeps.append)
+
+    with pytest.raises(structurizer.requests.exceptions.ConnectionError):
+        structurizer.LLMClient(max_retries=3).post("https://api.example.com")
+    assert len(sleeps) == 3
+
+
+class FakeStreamResponse:
+    def __init__(self, deltas, fail_after=None, usage=None):
+        self.deltas = deltas
+        self.fail_after = fail_after
+        self.usage = usage
+        self.encoding = None
+        self.status_code = 200
+
+    def raise_for_status(self):
+        return None
+
+    def iter_lines(self, chunk_size=512, decode_unicode=False):
+        for i, delta in enumerate(self.deltas):
+            if self.fail_after is not None and i == self.fail_after:
+                raise structurizer.requests.exceptions.ConnectionError("read timed out")
+            yield 'data: ' + json.dumps({"choices": [{"delta": {"content": delta}}]})
+            yield ''
+        if self.usage:
+            yield 'data: ' + json.dumps({"choices": [], "usage": self.usage})
+            yield ''
+        yield 'data: [DONE]'
+
+
+def test_stream_structurize_writes_incrementally(config, monkeypatch):
+    """Test streamed deltas are written as they arrive, with front matter added."""
+    out = io.StringIO()
+    seen = []
+
+    def fake_post(session, url, headers=None, json=None, timeout=None, stream=False):
+        assert json["stream"] is True and stream is True
+        assert json["stream_options"] == {"include_usage": True}
+        return FakeStreamResponse(["# Ti", "tle\n", "Body 中文\n"])
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    stats = {}
+    markdown = stream_structurize("raw", config, out, "src", stats)
+
+    assert out.getvalue() == markdown
+    assert markdown.startswith("---\ntags: []") and markdown.endswith("# Title\nBody 中文\n")
+    # No usage event: tokens are counted from the text, not from the three deltas
+    assert stats["output_tokens"] == count_tokens("# Title\nBody 中文\n", config.get("model"))
+    assert stats["ttft"] is not None
+
+    # The completed stream is cached for non-streaming runs too
+    monkeypatch.setattr(structurizer.requests.Session, "post", lambda *a, **k: pytest.fail("should hit cache"))
+    assert structurize_content("raw", config, "src") == markdown
+
+
+def test_stream_structurize_uses_reported_usage(config, monkeypatch):
+    """Test the provider's completion token count is used for tokens/s when sent."""
+    monkeypatch.setattr(
+        structurizer.requests.Session, "post",
+        lambda *a, **k: FakeStreamResponse(["# Title\n", "Body\n"], usage={"completion_tokens": 42})
+    )
+    stats = {}
+    stream_structurize("raw", config, io.StringIO(), "src", stats)
+    assert stats["output_tokens"] == 42
+
+
+def test_stream_structurize_keeps_partial_output(config, monkeypatch):
+    """Test output received before a stalled stream survives."""
+    out = io.StringIO()
+    monkeypatch.setattr(
+        structurizer.requests.Session, "post",
+        lambda *a, **k: FakeStreamResponse(["---\ntags: []\n---\n", "# Partial\n", "never"], fail_after=2)
+    )
+
+    with pytest.raises(TimeoutError):
+        stream_structurize("raw", config, out, "src")
+    assert out.getvalue() == "---\ntags: []\n---\n# Partial\n"
+
+
+CODE = "```python\n" + "\n".join(f"value_{i} = {i}  # keep exact spacing" for i in range(10)) + "\n```"
+
+
+def test_long_code_blocks_are_not_sent(config, monkeypatch):
+    """Test long code is replaced by a placeholder in the request and restored in the output."""
+    sent = []
+
+    def fake_post(session, url, headers=None, json=None, timeout=None, **kwargs):
+        sent.append(json)
+        return FakeResponse("# Title\n\n## Code Examples\n\n```python\n[CODE_BLOCK_1]\n```\n")
+
+    monkeypatch.setattr(structurizer.requests.Session, "post", fake_post)
+    markdown = structurize_content(f"User: show me\n{CODE}\nThanks", config, "src")
+
+    user_content = sent[0]["messages"][1]["content"]
+    assert "value_3" not in user_content and "[CODE_BLOCK_1]" in user_content
+    assert "[CODE_BLOCK_1]" in sent[0]["messages"][0]["content"]
+    assert markdown.endswith(f"## Code Examples\n\n{CODE}\n")
+
+
+def test_stream_restores_code_blocks(config, monkeypatch):
+    """Test placeholders split across stream deltas are replaced in the written output."""
+    out = io.StringIO()
+    monkeypatch.setattr(
+        structurizer.requests.Session, "post",
+        lambda *a, **k: FakeStreamResponse(["# Title\n[CODE_", "BLOCK_1]\nDone"])
+    )
+    markdown = stream_structurize(f"User: show me\n{CODE}", config, out, "src")
+
+    assert out.getvalue() == markdown
+    assert markdown.endswith(f"# Title\n{CODE}\nDone")
+
+
+def test_code_passthrough_can_be_disabled(config, posts):
+    """Test code is sent as-is when code_passthrough is off."""
+    structurize_content(CODE, dict(config, code_passthrough=False))
+    assert CODE in posts[0]["messages"][1]["content"]
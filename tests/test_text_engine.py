@@ -0,0 +1,75 @@
+"""Tests for the shared HTML-to-text engine."""
+
+import pytest
+from aichat2md.extractors import text_engine
+from aichat2md.extractors.text_engine import BACKEND_ORDER, choose_backend, create_parser, html_to_text
+
+
+DOCUMENTS = [
+    "<!DOCTYPE html><html><head><title>Chat</title><style>p { color: red }</style></head>"
+    "<body><p>Hello &amp; <b>bold</b> world</p><script>var a = '<p>';</script>"
+    "<div>Two<br>Lines</div><!-- note -->After</body></html>",
+    "<body><noscript><style>.a {}</style><p>hidden</p></noscript><p>shown</p></body>",
+    "<meta charset='utf-8'><div>中文 内容</div>\n<pre>def f():\n    return 1</pre>",
+    "<table><tr><td>a</td><td>b</td></tr></table><ul><li>one<li>two</ul>",
+    "<p>&lt;tag&gt; x&#x4e2d; &copy;</p>",
+]
+
+
+@pytest.fixture(params=BACKEND_ORDER)
+def backend(request):
+    """Each backend that is installed."""
+    module = {"lxml": "lxml.etree", "selectolax": "selectolax.lexbor", "stdlib": "html.parser"}[request.param]
+    pytest.importorskip(module)
+    return request.param
+
+
+@pytest.mark.parametrize("html", DOCUMENTS)
+def test_backends_match_stdlib(backend, html):
+    """Test every backend produces the same text as the stdlib parser."""
+    assert html_to_text(html, backend) == html_to_text(html, "stdlib")
+
+
+def test_nested_skip_tags(backend):
+    """Test text resumes only after the outermost skipped element closes."""
+    html = "<body><noscript><style>.a {}</style><p>hidden</p></noscript><p>shown</p></body>"
+    assert html_to_text(html, backend) == "shown"
+
+
+def test_pre_becomes_fenced_code(backend):
+    """Test <pre><code> keeps its whitespace, drops the toolbar and takes the language class."""
+    html = (
+        '<body><div><span>python</span><button>Copy code</button>'
+        '<pre><code class="hljs language-python">\ndef f():\n    <span>return</span> x &lt; 1\n</code></pre>'
+        '<p>After</p></div></body>'
+    )
+    assert html_to_text(html, backend) == "python\nCopy code\n```python\ndef f():\n    return x < 1\n```\nAfter"
+
+
+def test_incremental_feed(backend):
+    """Test text split across feeds comes out whole."""
+    parser = create_parser(backend)
+    for piece in ("<p>Hel", "lo wor", "ld</p><p>", "next</p>"):
+        parser.feed(piece)
+    parser.close()
+    assert parser.pop_chunks() == ["Hello world", "next"]
+
+
+def test_unknown_backend():
+    """Test unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        create_parser("regex")
+
+
+def test_deeply_nested_document(backend):
+    """Test deep nesting doesn't hit the recursion limit."""
+    html = "<div>" * 5000 + "deep" + "</div>" * 5000 + "<p>after</p>"
+    assert html_to_text(html, backend).split("\n")[-2:] == ["deep", "after"]
+
+
+def test_auto_backend_streams_large_or_unknown_inputs(monkeypatch):
+    """Test selectolax is only picked automatically for inputs known to be small."""
+    monkeypatch.setattr(text_engine, "available_backends", lambda: ["selectolax", "stdlib"])
+    assert choose_backend(1024) == "selectolax"
+    assert choose_backend(text_engine.SELECTOLAX_MAX_BYTES + 1) == "stdlib"
+    assert choose_backend() == "stdlib"
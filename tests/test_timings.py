@@ -0,0 +1,57 @@
+"""Tests for stage timing instrumentation."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from aichat2md import timings
+
+
+def test_span_is_a_no_op_when_disabled():
+    """Test spans record nothing and drop info writes while disabled."""
+    timings.disable()
+    with timings.span("extract", input_chars=10) as info:
+        info["output_chars"] = 5
+    assert info == {}
+    assert timings.get_spans() == []
+
+
+def test_spans_nest_across_threads_and_write_trace(tmp_path):
+    """Test bound worker spans nest under the caller and are written as JSON lines."""
+    trace = tmp_path / "trace.jsonl"
+    timings.enable(str(trace))
+    try:
+        with timings.span("structurize", input_chars=100) as info:
+            def work(index):
+                with timings.span("api.request") as request:
+                    request["completion_tokens"] = index
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                list(pool.map(timings.bind(work), [1, 2]))
+            info["output_chars"] = 40
+    finally:
+        spans = timings.disable()
+
+    root = spans[-1]
+    assert root["name"] == "structurize" and root["output_chars"] == 40 and root["error"] is None
+    children = [record for record in spans if record["name"] == "api.request"]
+    assert [record["parent"] for record in children] == [root["id"], root["id"]]
+    assert all(record["depth"] == 1 and record["seconds"] >= 0 for record in children)
+    assert [json.loads(line)["name"] for line in trace.read_text().splitlines()] == [s["name"] for s in spans]
+
+
+def test_format_table():
+    """Test the table indents children and aggregates by stage name."""
+    spans = [
+        {"name": "structurize", "id": 1, "parent": None, "start": 0.0, "seconds": 2.5, "error": None,
+         "input_chars": 100, "peak_rss_mb": 50.0},
+        {"name": "api.request", "id": 2, "parent": 1, "start": 0.1, "seconds": 1.0, "error": None,
+         "completion_tokens": 7, "peak_rss_mb": 51.0},
+        {"name": "api.request", "id": 3, "parent": 1, "start": 0.2, "seconds": 1.25, "error": "Timeout",
+         "completion_tokens": 3, "peak_rss_mb": 52.0},
+    ]
+    lines = timings.format_table(spans).splitlines()
+    assert lines[0].split()[:2] == ["stage", "seconds"]
+    assert lines[2].startswith("structurize") and "2.50" in lines[2]
+    assert lines[3].startswith("  api.request ") and lines[4].startswith("  api.request ✗")
+
+    aggregate = timings.format_table(spans, aggregate=True).splitlines()
+    assert aggregate[3].split() == ["api.request", "2", "2.25", "10", "52"]
@@ -0,0 +1,45 @@
+"""Tests for token counting and request sizing."""
+
+from aichat2md import tokens
+from aichat2md.tokens import choose_max_tokens, count_tokens, estimate_duration, estimate_tokens, request_timeout
+
+
+DEEPSEEK = {"api_base_url": "https://api.deepseek.com", "max_tokens": "auto"}
+GROQ = {"api_base_url": "https://api.groq.com/openai/v1", "max_tokens": "auto"}
+
+
+def test_estimate_counts_cjk_and_symbols_higher():
+    """Test CJK text and symbol-dense code estimate more tokens per character than prose."""
+    prose = estimate_tokens("the quick brown fox " * 50)
+    assert estimate_tokens("你好世界，" * 200) > 2 * prose
+    assert estimate_tokens("f(x[i]){};" * 100) > prose
+
+
+def test_count_falls_back_without_tokenizer(monkeypatch):
+    """Test count_tokens uses the heuristic when no encoding is available."""
+    monkeypatch.setattr(tokens, "_get_encoding", lambda model: None)
+    assert count_tokens("hello world", "gpt-4o-mini") == estimate_tokens("hello world")
+
+
+def test_max_tokens_scales_with_input_within_limits():
+    """Test auto max_tokens grows with the input, between the floor and the provider limit."""
+    assert choose_max_tokens(100, DEEPSEEK) == tokens.MIN_MAX_TOKENS
+    assert choose_max_tokens(10000, DEEPSEEK) == 5512
+    assert choose_max_tokens(100000, DEEPSEEK) == 8192
+    assert choose_max_tokens(100000, dict(DEEPSEEK, max_tokens_limit=6000)) == 6000
+    assert choose_max_tokens(100000, dict(DEEPSEEK, max_tokens=4000)) == 4000
+
+
+def test_timeout_follows_provider_speed():
+    """Test faster providers get shorter timeouts, clamped to the allowed range."""
+    assert request_timeout(1000, 8192, GROQ) < request_timeout(1000, 8192, DEEPSEEK)
+    assert request_timeout(10, 10, GROQ) == tokens.MIN_TIMEOUT
+    assert request_timeout(10, 10**6, DEEPSEEK) == tokens.MAX_TIMEOUT
+
+
+def test_duration_accounts_for_parallel_chunks():
+    """Test chunked input is estimated by rounds of concurrent chunks, not total length."""
+    text = "word " * 200000
+    serial = estimate_duration(text, dict(DEEPSEEK, chunk_concurrency=1))
+    parallel = estimate_duration(text, dict(DEEPSEEK, chunk_concurrency=4))
+    assert parallel * 3 < serial
@@ -0,0 +1,43 @@
+"""Tests for conversation turns."""
+
+from pathlib import Path
+
+import pytest
+from aichat2md.extractors.html_extractor import extract_turns_from_html
+from aichat2md.extractors.text_engine import BACKEND_ORDER
+from aichat2md.turns import split_text_turns, turns_to_text
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "turns"
+
+
+@pytest.mark.parametrize("backend", BACKEND_ORDER)
+def test_html_turns_from_dom_hints(backend):
+    """Test ChatGPT's author-role attributes give turns with roles and code blocks."""
+    pytest.importorskip({"lxml": "lxml.etree", "selectolax": "selectolax.lexbor", "stdlib": "html.parser"}[backend])
+    turns = extract_turns_from_html(str(FIXTURES / "chatgpt.html"), backend)
+
+    assert [turn["role"] for turn in turns] == ["user", "assistant", "user"]
+    assert [turn["position"] for turn in turns] == [0, 1, 2]
+    assert turns[0]["text"] == "How do I sort a dict by value?"
+    assert turns[1]["code_blocks"] == ["```python\nsorted(d.items(), key=lambda kv: kv[1])\n```"]
+    assert turns[1]["text"].endswith("That returns a list of pairs.\nnested marker is ignored")
+    assert turns[2]["text"] == "谢谢！"
+
+
+def test_split_text_turns_by_speaker_labels():
+    """Test flat text is split at speaker labels, ignoring labels inside code."""
+    text = "Shared chat\nYou said:\nHi\nChatGPT said:\nHello\n```\nUser:\n```"
+    turns = split_text_turns(text)
+
+    assert [(turn["role"], turn["text"]) for turn in turns] == [
+        ("unknown", "Shared chat"), ("user", "Hi"), ("assistant", "Hello\n```\nUser:\n```")
+    ]
+    assert turns[2]["code_blocks"] == ["```\nUser:\n```"]
+
+
+def test_turns_to_text_is_the_flat_view():
+    """Test turns render back to labelled text that splits into the same turns."""
+    turns = split_text_turns("User:\nHi\n\nAssistant:\nHello")
+    assert turns_to_text(turns) == "User:\nHi\n\nAssistant:\nHello"
+    assert split_text_turns(turns_to_text(turns)) == turns
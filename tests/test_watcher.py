@@ -0,0 +1,133 @@
+"""Tests for watch-folder mode."""
+
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from aichat2md import incremental, watcher as watcher_module
+from aichat2md.watcher import FolderWatcher, WatchIndex
+
+
+FIXTURE = Path(__file__).parent / "fixtures" / "turns" / "chatgpt.html"
+
+CONFIG = {"raw": True, "cache": False, "language": "en", "watch_debounce_seconds": 0.3, "watch_poll_seconds": 0.05}
+
+
+def run_until(watcher, condition, timeout=10):
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    thread.join()
+    assert condition()
+
+
+def test_watcher_converts_new_files_once_across_restarts(tmp_path):
+    """Test new exports are converted and the index skips them after a restart."""
+    watched = tmp_path / "downloads"
+    watched.mkdir()
+    index_path = tmp_path / "watch-index.json"
+    (watched / "notes.txt").write_text("not an export")
+
+    watcher = FolderWatcher(str(watched), dict(CONFIG), index=WatchIndex(index_path), use_events=False)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    shutil.copy(FIXTURE, watched / "chat.html")
+    deadline = time.time() + 10
+    while not watcher.counts["converted"] and time.time() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    thread.join()
+
+    assert watcher.counts == {"converted": 1, "failed": 0, "unchanged": 0}
+    assert "## User" in (watched / "chat.md").read_text(encoding="utf-8")
+    assert sorted(p.name for p in watched.iterdir()) == ["chat.html", "chat.md", "notes.txt"]
+
+    # Same content under another name, after a restart
+    shutil.copy(FIXTURE, watched / "chat copy.html")
+    restarted = FolderWatcher(str(watched), dict(CONFIG), index=WatchIndex(index_path), use_events=False)
+    run_until(restarted, lambda: restarted.counts["unchanged"] == 2)
+    assert restarted.counts["converted"] == 0
+    assert not (watched / "chat copy.md").exists()
+
+
+def test_watcher_replaces_output_of_changed_file(tmp_path):
+    """Test a re-saved export overwrites its earlier output instead of adding a copy."""
+    index = WatchIndex(tmp_path / "index.json")
+    index.seed({})
+    (tmp_path / "chat.html").write_bytes(FIXTURE.read_bytes())
+    watcher = FolderWatcher(str(tmp_path), dict(CONFIG), index=index, use_events=False)
+    run_until(watcher, lambda: watcher.counts["converted"] == 1)
+
+    html = FIXTURE.read_text(encoding="utf-8").replace("sort a dict by value", "sort a list by length")
+    (tmp_path / "chat.html").write_text(html, encoding="utf-8")
+    watcher = FolderWatcher(str(tmp_path), dict(CONFIG), index=index, use_events=False)
+    run_until(watcher, lambda: watcher.counts["converted"] == 1)
+
+    assert "sort a list by length" in (tmp_path / "chat.md").read_text(encoding="utf-8")
+    assert not (tmp_path / "chat-1.md").exists()
+
+
+def test_first_start_leaves_existing_files_alone(tmp_path):
+    """Test files already in the folder on the first start are seeded, not converted, until they change."""
+    shutil.copy(FIXTURE, tmp_path / "old.html")
+    (tmp_path / "old.md").write_text("hand-made", encoding="utf-8")
+    index_path = tmp_path / "index.json"
+    watcher = FolderWatcher(str(tmp_path), dict(CONFIG), index=WatchIndex(index_path), use_events=False)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    time.sleep(1)
+    watcher.stop()
+    thread.join()
+    assert watcher.counts == {"converted": 0, "failed": 0, "unchanged": 0}
+
+    # A restart against the saved index doesn't catch up on them either, but a change counts
+    watcher = FolderWatcher(str(tmp_path), dict(CONFIG), index=WatchIndex(index_path), use_events=False)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    time.sleep(1)
+    assert watcher.counts["converted"] == 0
+    html = FIXTURE.read_text(encoding="utf-8").replace("sort a dict by value", "sort a list by length")
+    (tmp_path / "old.html").write_text(html, encoding="utf-8")
+    deadline = time.time() + 10
+    while not watcher.counts["converted"] and time.time() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    thread.join()
+    assert watcher.counts["converted"] == 1
+    assert (tmp_path / "old.md").read_text(encoding="utf-8") == "hand-made"
+    assert "sort a list by length" in (tmp_path / "old-1.md").read_text(encoding="utf-8")
+
+
+def test_watcher_records_structurized_conversions(tmp_path, monkeypatch):
+    """Test watch conversions are recorded, so --update can extend them."""
+    monkeypatch.setattr(watcher_module, "extract_content", lambda path, config, quiet=False: ("User:\nHi", "chat.html"))
+    monkeypatch.setattr(watcher_module, "structurize_content", lambda text, config, source="": "# Hi\n")
+    config = dict(CONFIG, raw=False, records_dir=str(tmp_path / "records"))
+    index = WatchIndex(tmp_path / "index.json")
+    index.seed({})
+    (tmp_path / "chat.html").write_bytes(FIXTURE.read_bytes())
+    watcher = FolderWatcher(str(tmp_path), config, index=index, use_events=False)
+    run_until(watcher, lambda: watcher.counts["converted"] == 1)
+
+    record = incremental.load_record(str(tmp_path / "chat.html"), config)
+    assert record["output"] == str((tmp_path / "chat.md").resolve())
+
+
+def test_watcher_waits_for_writes_to_settle(tmp_path):
+    """Test a file still growing is not picked up until its size stops changing."""
+    watcher = FolderWatcher(str(tmp_path), dict(CONFIG, watch_debounce_seconds=0), index=WatchIndex(tmp_path / "i.json"))
+    path = tmp_path / "chat.mhtml"
+    path.write_bytes(b"MIME-Version: 1.0\r\n")
+    watcher.notify(str(path))
+    (tmp_path / "chat.mhtml.crdownload").write_bytes(b"")
+    watcher.notify(str(tmp_path / "chat.mhtml.crdownload"))
+
+    with path.open("ab") as f:
+        f.write(b"more")
+    assert watcher._take_ready() == []
+    assert watcher._take_ready() == [str(path)]
@@ -0,0 +1,130 @@
+"""Tests for webarchive extraction."""
+
+import plistlib
+import re
+
+import pytest
+from aichat2md.extractors import webarchive_extractor
+from aichat2md.extractors.bplist_reader import BinaryPlist
+from aichat2md.extractors.webarchive_extractor import extract_from_webarchive
+
+
+def make_archive(main_html, subframes=(), encoding="UTF-8"):
+    return {
+        "WebMainResource": {
+            "WebResourceData": main_html,
+            "WebResourceMIMEType": "text/html",
+            "WebResourceTextEncodingName": encoding,
+            "WebResourceURL": "https://chatgpt.com/share/abc",
+        },
+        "WebSubresources": [
+            {"WebResourceData": bytes(range(256)) * 4096, "WebResourceMIMEType": "image/png"},
+        ],
+        "WebSubframeArchives": list(subframes),
+    }
+
+
+@pytest.fixture
+def archive():
+    frame = make_archive("<p>Answer inside an iframe</p>".encode("utf-8"))
+    return make_archive(
+        "<html><body><script>ignored()</script><p>Question 你好</p></body></html>".encode("utf-8"),
+        [frame]
+    )
+
+
+def test_binary_webarchive_includes_subframes(tmp_path, archive):
+    """Test main and subframe HTML are extracted from a binary plist."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(archive, fmt=plistlib.FMT_BINARY))
+    assert extract_from_webarchive(str(path)) == "Question 你好\nAnswer inside an iframe"
+
+
+def test_xml_webarchive(tmp_path, archive):
+    """Test XML plists still go through plistlib."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(archive, fmt=plistlib.FMT_XML))
+    assert extract_from_webarchive(str(path)) == "Question 你好\nAnswer inside an iframe"
+
+
+def test_declared_text_encoding(tmp_path):
+    """Test WebResourceTextEncodingName is honoured."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(make_archive("<p>中文</p>".encode("gbk"), encoding="GBK"), fmt=plistlib.FMT_BINARY))
+    assert extract_from_webarchive(str(path)) == "中文"
+
+
+def test_binary_plist_reader_lookup():
+    """Test keys, strings, arrays and data are decoded lazily."""
+    plist = BinaryPlist(plistlib.dumps({"a": [1, "två"], "b": b"data" * 100}, fmt=plistlib.FMT_BINARY))
+    assert plist.lookup(plist.top, "missing") is None
+    items = plist.array(plist.lookup(plist.top, "a"))
+    assert plist.string(items[1]) == "två"
+    assert bytes(plist.data(plist.lookup(plist.top, "b"))) == b"data" * 100
+
+
+def test_missing_main_resource(tmp_path):
+    """Test archives without a main resource are rejected."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps({"WebSubresources": []}, fmt=plistlib.FMT_BINARY))
+    with pytest.raises(ValueError, match="WebMainResource"):
+        extract_from_webarchive(str(path))
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda raw: raw[:-10],
+    lambda raw: raw[:-8] + (len(raw) * 4).to_bytes(8, "big"),
+], ids=["truncated trailer", "bad offset table"])
+def test_corrupt_binary_plist(tmp_path, archive, corrupt):
+    """Test a damaged archive raises the format error, not a BufferError from the mapping."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(corrupt(plistlib.dumps(archive, fmt=plistlib.FMT_BINARY)))
+    with pytest.raises(ValueError, match="Invalid webarchive format"):
+        extract_from_webarchive(str(path))
+
+
+def test_cyclic_subframes(tmp_path):
+    """Test a subframe that refers back to its parent is rejected instead of recursing forever."""
+    raw = plistlib.dumps(make_archive(b"<p>a</p>", [{}]), fmt=plistlib.FMT_BINARY)
+    # Point the one-element subframe array (0xa1, followed by the empty dict 0xd0) at object 0, the top dict
+    cyclic = re.sub(rb"\xa1.\xd0", b"\xa1\x00\xd0", raw, count=1, flags=re.DOTALL)
+    assert cyclic != raw
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(cyclic)
+    with pytest.raises(ValueError, match="malformed webarchive"):
+        extract_from_webarchive(str(path))
+
+
+def test_deeply_nested_subframes(tmp_path):
+    """Test the XML walk stops at the same subframe depth."""
+    archive = make_archive(b"<p>a</p>")
+    for _ in range(webarchive_extractor.MAX_SUBFRAME_DEPTH + 1):
+        archive = make_archive(b"<p>a</p>", [archive])
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(archive))
+    with pytest.raises(ValueError, match="malformed webarchive"):
+        extract_from_webarchive(str(path))
+
+
+def test_resource_data_that_is_not_data(tmp_path):
+    """Test a WebResourceData string is rejected as an invalid archive."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(make_archive("<p>not bytes</p>"), fmt=plistlib.FMT_BINARY))
+    with pytest.raises(ValueError, match="Invalid webarchive: WebResourceData is not data"):
+        extract_from_webarchive(str(path))
+
+
+def test_parse_error_releases_mapping(tmp_path, archive):
+    """Test an error while parsing a frame propagates once every view is released."""
+    path = tmp_path / "chat.webarchive"
+    path.write_bytes(plistlib.dumps(archive, fmt=plistlib.FMT_BINARY))
+    seen = []
+
+    def parse(data, encoding, backend):
+        seen.append(bytes(data[:4]))
+        if len(seen) == 2:
+            raise RuntimeError("parser failed")
+        return ""
+
+    with pytest.raises(RuntimeError, match="parser failed"):
+        webarchive_extractor._extract_texts(str(path), None, parse)